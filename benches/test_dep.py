@@ -112,3 +112,17 @@ def test_bench_dep_modify(benchmark, lib):
             func = lambda d: d.with_repo("repo")
 
     benchmark(func, dep)
+
+
+@pytest.mark.parametrize("lib", ("pkgcraft", "pkgcraft-batch"))
+def test_bench_dep_many(benchmark, lib):
+    deps = [f"=cat/pkg-{v}-r1:2/3=[a,b,c]" for v in range(1000)]
+
+    match lib:
+        case "pkgcraft":
+            func = lambda x: [pkgcraft_dep(s) for s in x]
+        case "pkgcraft-batch":
+            func = pkgcraft_dep.parse_many
+
+    result = benchmark(func, deps)
+    assert len(result) == 1000
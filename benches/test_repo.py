@@ -101,3 +101,13 @@ def test_bench_repo_set_iter_restrict_dep(benchmark, make_ebuild_repo):
 
     assert len(pkgs) == 1
     assert str(pkgs[0].version) == "50"
+
+
+@pytest.mark.parametrize("jobs", (1, 4))
+def test_bench_ebuild_repo_iter_jobs(benchmark, jobs, ebuild_repo):
+    # create ebuilds
+    for i in range(100):
+        ebuild_repo.create_ebuild(f"cat{i % 10}/pkg-{i}")
+
+    pkgs = benchmark(lambda x: list(x.iter(jobs=jobs)), ebuild_repo)
+    assert len(pkgs) == 100
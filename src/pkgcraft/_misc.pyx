@@ -1,4 +1,5 @@
-from functools import lru_cache
+import threading
+from collections import OrderedDict, namedtuple
 from weakref import WeakValueDictionary
 
 cimport cython
@@ -98,17 +99,139 @@ class WeakInstanceCache(type):
         return instance
 
 
+PoolInfo = namedtuple("PoolInfo", ["hits", "misses", "evictions", "maxsize", "currsize"])
+
+
+class InstancePool:
+    """Bounded, thread-safe LRU pool of interned instances.
+
+    Instances are keyed on their class, source string, and EAPI identifier so
+    equivalent arguments return the same object regardless of how they were
+    passed. A single pool can be shared across multiple classes.
+
+    >>> from pkgcraft.dep import Cpv, InstancePool
+    >>> pool = InstancePool(maxsize=2)
+    >>> pool.get(Cpv, 'cat/pkg-1') is pool.get(Cpv, 'cat/pkg-1')
+    True
+    >>> pool.info()
+    PoolInfo(hits=1, misses=1, evictions=0, maxsize=2, currsize=1)
+    """
+
+    def __init__(self, maxsize=10000):
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._maxsize = self._validate_maxsize(maxsize)
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @staticmethod
+    def _validate_maxsize(maxsize):
+        if maxsize is not None:
+            maxsize = int(maxsize)
+            if maxsize < 0:
+                raise ValueError(f"invalid maxsize: {maxsize}")
+        return maxsize
+
+    def _evict(self):
+        """Drop the least recently used entries exceeding the size limit."""
+        if self._maxsize is not None:
+            while len(self._cache) > self._maxsize:
+                self._cache.popitem(last=False)
+                self._evictions += 1
+
+    @property
+    def maxsize(self):
+        """Get or set the maximum number of pooled instances, None is unbounded."""
+        return self._maxsize
+
+    @maxsize.setter
+    def maxsize(self, value):
+        value = self._validate_maxsize(value)
+        with self._lock:
+            self._maxsize = value
+            self._evict()
+
+    def get(self, cls, s, eapi=None):
+        """Get the pooled instance for the given arguments, creating it if missing.
+
+        Args:
+            cls: the class to instantiate
+            s: the string to parse
+            eapi: an EAPI constant or string identifier passed to the class if not None
+
+        Returns:
+            the interned instance
+        """
+        key = (cls, s, None if eapi is None else str(eapi))
+
+        with self._lock:
+            if (inst := self._cache.get(key)) is not None:
+                self._cache.move_to_end(key)
+                self._hits += 1
+                return inst
+            self._misses += 1
+
+        # Create instances without holding the lock since parsing can be
+        # expensive and may raise.
+        if eapi is None:
+            inst = type.__call__(cls, s)
+        else:
+            inst = type.__call__(cls, s, eapi)
+
+        with self._lock:
+            # prefer any instance inserted by a concurrent call
+            inst = self._cache.setdefault(key, inst)
+            self._evict()
+        return inst
+
+    def info(self):
+        """Return pool statistics.
+
+        Returns:
+            PoolInfo: hit, miss, and eviction counts along with the pool's size limit and usage
+        """
+        with self._lock:
+            return PoolInfo(
+                self._hits, self._misses, self._evictions, self._maxsize, len(self._cache))
+
+    def clear(self, cls=None):
+        """Remove pooled instances, optionally only those of a given class.
+
+        Statistics are reset when the entire pool is cleared.
+        """
+        with self._lock:
+            if cls is None:
+                self._cache.clear()
+                self._hits = self._misses = self._evictions = 0
+            else:
+                for key in [k for k in self._cache if k[0] is cls]:
+                    del self._cache[key]
+
+    def __len__(self):
+        return len(self._cache)
+
+
 class LruInstanceCache(type):
     """Metaclass providing LRU-based instance caching.
 
-    Note that this currently doesn't provide any cache key customization so
-    attributes such as kwargs ordering will affect cache hits.
+    Instances are interned in an InstancePool keyed on the source string and
+    EAPI. Each class gets its own pool by default, use the `pool` class keyword
+    to share one between classes or `maxsize` to alter the default size limit.
     """
 
-    def __new__(cls, name, bases, attrs):
+    def __new__(cls, name, bases, attrs, pool=None, **kwargs):
         attrs["__slots__"] = ()
+        attrs["__instance_pool__"] = pool if pool is not None else InstancePool(**kwargs)
         return super().__new__(cls, name, bases, attrs)
 
-    @lru_cache(maxsize=10000)
-    def __call__(cls, *args, **kwargs):
-        return super(LruInstanceCache, cls).__call__(*args, **kwargs)
+    def __init__(cls, name, bases, attrs, **kwargs):
+        super().__init__(name, bases, attrs)
+
+    @property
+    def pool(cls):
+        """Get the instance pool for a class."""
+        return cls.__instance_pool__
+
+    def __call__(cls, s, /, eapi=None):
+        return cls.__instance_pool__.get(cls, s, eapi)
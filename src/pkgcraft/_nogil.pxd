@@ -0,0 +1,14 @@
+# Hand-written declarations for native functions that are safe to call without
+# holding the GIL, the auto-generated C.pxd doesn't support marking them nogil.
+
+from . cimport C
+
+
+cdef extern from "pkgcraft.h" nogil:
+    void pkgcraft_pkg_free(C.Pkg *p)
+    bint pkgcraft_pkg_restrict_matches(C.Pkg *p, C.Restrict *r)
+    void pkgcraft_repo_iter_free(C.RepoIter *i)
+    C.Pkg *pkgcraft_repo_iter_next(C.RepoIter *i)
+    C.RepoIterRestrict *pkgcraft_repo_iter_restrict(C.Repo *repo, C.Restrict *restrict)
+    void pkgcraft_repo_iter_restrict_free(C.RepoIterRestrict *i)
+    C.Pkg *pkgcraft_repo_iter_restrict_next(C.RepoIterRestrict *i)
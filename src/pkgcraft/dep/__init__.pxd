@@ -1,6 +1,7 @@
 from .base cimport *
 from .cpn cimport *
 from .cpv cimport *
+from .packed cimport *
 from .pkg cimport *
 from .uri cimport *
 from .use_dep cimport *
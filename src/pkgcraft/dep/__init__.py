@@ -1,6 +1,8 @@
+from .._misc import InstancePool
 from .base import *
 from .cpn import *
 from .cpv import *
+from .packed import *
 from .pkg import *
 from .uri import *
 from .use_dep import *
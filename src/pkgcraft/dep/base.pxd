@@ -1,4 +1,5 @@
 from .. cimport C
+from ..types cimport OrderedFrozenSet
 
 
 cdef class Dependency:
@@ -13,6 +14,7 @@ cdef class Dependency:
 cdef class DependencySet:
     cdef C.DependencySet *ptr
     cdef readonly object set
+    cdef object __weakref__
 
     @staticmethod
     cdef DependencySet from_ptr(C.DependencySet *, DependencySet inst=*)
@@ -28,3 +30,37 @@ cdef class MutableDependencySet(DependencySet):
 
     @staticmethod
     cdef DependencySet from_ptr(C.DependencySet *, DependencySet inst=*)
+
+
+cdef list flatten_objects(C.DependencyIntoIterFlatten *, C.DependencySetKind, bint, str)
+cdef list uri_entries(DependencySet)
+
+
+cdef class CompiledDependencySet:
+    cdef readonly DependencySet deps
+    cdef readonly tuple flags
+    cdef readonly tuple objects
+    cdef dict _flags
+    cdef object _always
+    cdef list _conds
+    cdef dict _evaluated
+
+    cpdef object mask(self, object)
+    cpdef object bitset(self, object)
+
+
+cdef class RequiredUseSolver:
+    cdef readonly DependencySet required_use
+    cdef readonly tuple flags
+    cdef dict _flags
+    cdef tuple _nodes
+    cdef tuple _order
+    cdef object _defaults
+    cdef object _constrained
+    cdef dict _checks
+    cdef dict _solutions
+    cdef list _enumerated
+    cdef object _enumerator
+
+    cdef object mask(self, object)
+    cdef OrderedFrozenSet flags_from_mask(self, object)
@@ -1,5 +1,8 @@
+import hashlib
+from collections import Counter
 from collections.abc import Iterable
 from enum import IntEnum
+from weakref import WeakValueDictionary
 
 cimport cython
 from cpython.mem cimport PyMem_Free, PyMem_Malloc
@@ -9,6 +12,7 @@ from .._misc cimport CStringArray, cstring_to_str
 from ..eapi cimport Eapi
 from ..error cimport Indirect
 from ..types cimport OrderedFrozenSet
+from .cpn cimport Cpn
 from .pkg cimport Dep
 from .uri cimport Uri
 from .use_dep cimport UseDep
@@ -16,6 +20,10 @@ from .use_dep cimport UseDep
 from ..error import PkgcraftError
 
 
+# interned DependencySet objects kept alive while referenced
+cdef object INTERNED = WeakValueDictionary()
+
+
 class DependencySetKind(IntEnum):
     Package = C.DEPENDENCY_SET_KIND_PACKAGE
     License = C.DEPENDENCY_SET_KIND_LICENSE
@@ -43,6 +51,144 @@ cdef list iterable_to_dependencies(object obj, C.DependencySetKind kind):
         raise TypeError(f"invalid Dependency iterable type: {obj.__class__.__name__}")
 
 
+cdef list flatten_objects(
+        C.DependencyIntoIterFlatten *it, C.DependencySetKind kind, bint unique, str as_):
+    """Collect the objects from a flatten iterator into a list, freeing the iterator.
+
+    Object strings are only created when deduplicating or returning strings
+    so duplicates and unrequested object types are never wrapped.
+    """
+    cdef void *ptr
+    cdef C.Cpn *cpn_ptr
+    cdef list objs = []
+    cdef set seen = set()
+    cdef bint strings = as_ == 'strings'
+
+    try:
+        if as_ not in ('deps', 'cpns', 'strings'):
+            raise ValueError(f'invalid flatten type: {as_}')
+        elif as_ == 'cpns' and kind != C.DEPENDENCY_SET_KIND_PACKAGE:
+            raise ValueError(f'invalid flatten type for {DependencySetKind(kind).name}: {as_}')
+
+        while True:
+            ptr = C.pkgcraft_dependency_set_into_iter_flatten_next(it)
+            if ptr is NULL:
+                break
+
+            if kind == C.DEPENDENCY_SET_KIND_PACKAGE:
+                if as_ == 'cpns':
+                    cpn_ptr = C.pkgcraft_dep_cpn(<C.Dep *>ptr)
+                    C.pkgcraft_dep_free(<C.Dep *>ptr)
+                    if unique:
+                        key = cstring_to_str(C.pkgcraft_cpn_str(cpn_ptr))
+                        if key in seen:
+                            C.pkgcraft_cpn_free(cpn_ptr)
+                            continue
+                    obj = Cpn.from_ptr(cpn_ptr)
+                elif strings or unique:
+                    key = cstring_to_str(C.pkgcraft_dep_str(<C.Dep *>ptr))
+                    if strings or key in seen:
+                        C.pkgcraft_dep_free(<C.Dep *>ptr)
+                        obj = key
+                    else:
+                        obj = Dep.from_ptr(<C.Dep *>ptr)
+                else:
+                    obj = Dep.from_ptr(<C.Dep *>ptr)
+            elif kind == C.DEPENDENCY_SET_KIND_SRC_URI:
+                if strings or unique:
+                    key = cstring_to_str(C.pkgcraft_uri_str(<C.Uri *>ptr))
+                    if strings or key in seen:
+                        C.pkgcraft_uri_free(<C.Uri *>ptr)
+                        obj = key
+                    else:
+                        obj = Uri.from_ptr(<C.Uri *>ptr)
+                else:
+                    obj = Uri.from_ptr(<C.Uri *>ptr)
+            else:
+                key = obj = cstring_to_str(<char *>ptr)
+
+            if unique:
+                if key in seen:
+                    continue
+                seen.add(key)
+            objs.append(obj)
+    finally:
+        C.pkgcraft_dependency_set_into_iter_flatten_free(it)
+
+    return objs
+
+
+cdef list uri_entries(DependencySet deps):
+    """Get the (filename, uri) tuples of a flattened SRC_URI DependencySet.
+
+    Values are pulled directly from the flatten iterator without creating
+    Uri objects.
+    """
+    cdef C.Uri *ptr
+    cdef list entries = []
+
+    it = C.pkgcraft_dependency_set_into_iter_flatten(deps.ptr)
+    try:
+        while True:
+            ptr = <C.Uri *>C.pkgcraft_dependency_set_into_iter_flatten_next(it)
+            if ptr is NULL:
+                break
+            filename = cstring_to_str(C.pkgcraft_uri_filename(ptr))
+            uri = cstring_to_str(C.pkgcraft_uri_uri(ptr))
+            C.pkgcraft_uri_free(ptr)
+            entries.append((filename, uri))
+    finally:
+        C.pkgcraft_dependency_set_into_iter_flatten_free(it)
+
+    return entries
+
+
+cdef str canonical_str(C.DependencySet *ptr):
+    """Get the recursively sorted string for a DependencySet pointer, freeing the pointer."""
+    C.pkgcraft_dependency_set_sort_recursive(ptr)
+    s = cstring_to_str(C.pkgcraft_dependency_set_str(ptr))
+    C.pkgcraft_dependency_set_free(ptr)
+    return s
+
+
+cdef object canonical_hash(str s):
+    """Get the stable, 64-bit hash of a canonical string."""
+    return int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), 'little')
+
+
+def _iter_dependency_sets(objs, key, kind):
+    """Iterate over DependencySet objects from an iterable of sets or packages."""
+    if key is not None:
+        attr = str(key).lower()
+    for obj in objs:
+        if key is not None:
+            obj = getattr(obj, attr)
+        if not isinstance(obj, DependencySet):
+            obj = DependencySet(obj, set=kind)
+        yield obj
+
+
+cdef DependencySet set_op_all(object cls, C.SetOp op, object objs, object key, object kind):
+    """Apply a set operation across DependencySet objects using a single accumulator."""
+    cdef DependencySet depset
+    cdef DependencySet result = None
+
+    for depset in _iter_dependency_sets(objs, key, kind):
+        if result is None:
+            result = cls(depset)
+        elif not C.pkgcraft_dependency_set_assign_op_set(op, result.ptr, depset.ptr):
+            raise TypeError(
+                f"unsupported DependencySet types: {result.set.name} and {depset.set.name}")
+
+        # intersections can't regain elements so remaining sets are skipped
+        if op == C.SetOp.SET_OP_AND and C.pkgcraft_dependency_set_is_empty(result.ptr):
+            break
+
+    if result is None:
+        result = cls(set=kind)
+    return result
+
+
 @cython.final
 cdef class Dependency:
     """Dependency object."""
@@ -137,10 +283,47 @@ cdef class Dependency:
         """Iterate over the objects of a flattened Dependency."""
         return _IntoIterFlatten.from_dependency(self.ptr)
 
+    def flatten(self, bint unique=True, str as_='deps'):
+        """Get the objects of a flattened Dependency.
+
+        See :py:meth:`DependencySet.flatten` for details.
+        """
+        it = C.pkgcraft_dependency_into_iter_flatten(self.ptr)
+        return flatten_objects(it, self.ptr.set, unique, as_)
+
     def iter_recursive(self):
         """Recursively iterate over the Dependency objects of a Dependency."""
         return _IntoIterRecursive.from_dependency(self.ptr)
 
+    def canonical_str(self):
+        """Get the canonical string of a Dependency.
+
+        The string matches the Dependency after recursive sorting, see
+        :py:meth:`MutableDependencySet.sort_recursive`, without modifying it.
+        Note that the order of any-of groups is significant and retained.
+
+        >>> from pkgcraft.dep import Dependency
+        >>> d = Dependency('( a/c a/b u? ( b/d b/c ) )')
+        >>> d.canonical_str()
+        '( a/b a/c u? ( b/c b/d ) )'
+        >>> str(d)
+        '( a/c a/b u? ( b/d b/c ) )'
+        """
+        ptr = C.pkgcraft_dependency_set_from_iter(&self.ptr, 1, self.ptr.set)
+        return canonical_str(ptr)
+
+    def canonical_hash(self):
+        """Get the stable, 64-bit hash of the canonical string of a Dependency.
+
+        Hash values are consistent across processes, allowing them to be
+        stored and compared instead of dependency strings.
+
+        >>> from pkgcraft.dep import Dependency
+        >>> Dependency('( a/c a/b )').canonical_hash() == Dependency('( a/b a/c )').canonical_hash()
+        True
+        """
+        return canonical_hash(self.canonical_str())
+
     def sort(self):
         """Recursively sort a Dependency.
 
@@ -327,6 +510,84 @@ cdef class DependencySet:
         """Parse a string into a SRC_URI dependency set."""
         return cls(s, set=DependencySetKind.SrcUri)
 
+    @classmethod
+    def union_all(cls, objs not None, key=None, set=DependencySetKind.Package):
+        """Create the union of many DependencySets.
+
+        All sets are merged into a single accumulated set in one pass without
+        creating intermediate sets.
+
+        Args:
+            objs (Iterable): DependencySet objects, values convertible to them,
+                or packages when a key is given
+            key (str | None): dependency attribute to use for packages, e.g. "rdepend"
+            set (DependencySetKind): set type used for converted values and
+                empty results
+
+        Returns:
+            DependencySet: the union of all sets, matching the calling class
+
+        Raises:
+            TypeError: on mismatched set types
+
+        >>> from pkgcraft.dep import DependencySet
+        >>> d = DependencySet.union_all(['a/b c/d', 'c/d', 'e/f'])
+        >>> str(d)
+        'a/b c/d e/f'
+        """
+        return set_op_all(cls, C.SetOp.SET_OP_OR, objs, key, DependencySetKind(set))
+
+    @classmethod
+    def intersection_all(cls, objs not None, key=None, set=DependencySetKind.Package):
+        """Create the intersection of many DependencySets.
+
+        All sets are intersected into a single accumulated set in one pass
+        without creating intermediate sets. Remaining sets are skipped once
+        the result is empty.
+
+        Args:
+            objs (Iterable): DependencySet objects, values convertible to them,
+                or packages when a key is given
+            key (str | None): dependency attribute to use for packages, e.g. "rdepend"
+            set (DependencySetKind): set type used for converted values and
+                empty results
+
+        Returns:
+            DependencySet: the intersection of all sets, matching the calling class
+
+        Raises:
+            TypeError: on mismatched set types
+
+        >>> from pkgcraft.dep import DependencySet
+        >>> d = DependencySet.intersection_all(['a/b c/d', 'c/d a/b', 'c/d e/f'])
+        >>> str(d)
+        'c/d'
+        """
+        return set_op_all(cls, C.SetOp.SET_OP_AND, objs, key, DependencySetKind(set))
+
+    @staticmethod
+    def count_all(objs not None, key=None, set=DependencySetKind.Package):
+        """Count how many DependencySets contain each Dependency.
+
+        Args:
+            objs (Iterable): DependencySet objects, values convertible to them,
+                or packages when a key is given
+            key (str | None): dependency attribute to use for packages, e.g. "rdepend"
+            set (DependencySetKind): set type used for converted values
+
+        Returns:
+            collections.Counter: the number of sets containing each Dependency
+
+        >>> from pkgcraft.dep import Dependency, DependencySet
+        >>> counts = DependencySet.count_all(['a/b c/d', 'c/d', 'c/d e/f'])
+        >>> counts[Dependency('c/d')], counts[Dependency('a/b')]
+        (3, 1)
+        """
+        counts = Counter()
+        for depset in _iter_dependency_sets(objs, key, DependencySetKind(set)):
+            counts.update(depset)
+        return counts
+
     def evaluate(self, enabled=()):
         """Evaluate a DependencySet using a given set of enabled options or by force."""
         if isinstance(enabled, bool):
@@ -339,6 +600,122 @@ cdef class DependencySet:
 
         return self.create(ptr)
 
+    def evaluate_many(self, configs not None, str as_='sets'):
+        """Evaluate a DependencySet for multiple sets of enabled options.
+
+        The DependencySet is compiled once via :py:class:`CompiledDependencySet`
+        so configurations are reduced to bitmasks of their relevant flags,
+        bitsets and counts are computed using integer operations, and
+        configurations with identical masks are only evaluated once.
+
+        Args:
+            configs (Iterable[Iterable[str] | bool]): enabled options for each
+                evaluation or booleans for forcible evaluation
+            as_ (str): result type, "sets" for DependencySet objects, "bitsets"
+                for integer bitsets where bit N relates to the Nth unique
+                object from :py:meth:`iter_flatten`, or "counts" for the
+                number of unique flattened objects
+
+        Returns:
+            list: results for each configuration in the given order
+
+        Raises:
+            ValueError: on invalid result types
+
+        >>> from pkgcraft.dep import DependencySet
+        >>> d = DependencySet('a/b u1? ( c/d ) !u2? ( e/f )')
+        >>> [str(x) for x in d.evaluate_many([[], ['u1'], ['u1', 'u2', 'u3']])]
+        ['a/b e/f', 'a/b c/d e/f', 'a/b c/d']
+        >>> d.evaluate_many([[], ['u1'], ['u1', 'u2', 'u3']], as_='bitsets')
+        [5, 7, 3]
+        >>> d.evaluate_many([[], ['u1'], ['u1', 'u2', 'u3']], as_='counts')
+        [2, 3, 2]
+        """
+        if as_ not in ('sets', 'bitsets', 'counts'):
+            raise ValueError(f'invalid result type: {as_}')
+
+        compiled = CompiledDependencySet(self)
+        if as_ != 'sets':
+            objs = {x: 1 << i for (i, x) in enumerate(compiled.objects)}
+
+        forced = {}
+        results = []
+        for enabled in configs:
+            if isinstance(enabled, bool):
+                # forcible evaluation can't be represented by a flag bitmask
+                if (result := forced.get(enabled)) is None:
+                    result = self.evaluate(enabled)
+                    if as_ != 'sets':
+                        result = sum(objs[x] for x in set(result.iter_flatten()))
+                    forced[enabled] = result
+            elif as_ == 'sets':
+                result = compiled.evaluate(enabled)
+            else:
+                result = compiled.bitset(enabled)
+
+            if as_ == 'counts':
+                result = result.bit_count()
+            elif as_ == 'sets' and isinstance(self, MutableDependencySet):
+                # mutable results can't be shared
+                result = self.create(C.pkgcraft_dependency_set_clone((<DependencySet>result).ptr))
+
+            results.append(result)
+
+        return results
+
+    def canonical_str(self):
+        """Get the canonical string of a DependencySet.
+
+        The string matches the DependencySet after recursive sorting, see
+        :py:meth:`MutableDependencySet.sort_recursive`, without modifying it.
+        Note that the order of any-of groups is significant and retained.
+
+        >>> from pkgcraft.dep import DependencySet
+        >>> d = DependencySet('|| ( a/c a/b ) ( b/d b/c ) a/z')
+        >>> d.canonical_str()
+        'a/z ( b/c b/d ) || ( a/c a/b )'
+        >>> str(d)
+        '|| ( a/c a/b ) ( b/d b/c ) a/z'
+        """
+        return canonical_str(C.pkgcraft_dependency_set_clone(self.ptr))
+
+    def canonical_hash(self):
+        """Get the stable, 64-bit hash of the canonical string of a DependencySet.
+
+        Hash values are consistent across processes, allowing them to be
+        stored and compared instead of dependency strings.
+
+        >>> from pkgcraft.dep import DependencySet
+        >>> DependencySet('a/b c/d').canonical_hash() == DependencySet('c/d a/b').canonical_hash()
+        True
+        """
+        return canonical_hash(self.canonical_str())
+
+    def intern(self):
+        """Get the shared, interned instance of an identical DependencySet.
+
+        Identical sets are interned to a single immutable instance that is
+        kept alive while referenced, sharing memory and reducing equality
+        checks between interned objects to identity comparisons. Mutable sets
+        are frozen before being interned so modifying them never affects
+        other holders of the interned instance.
+
+        >>> from pkgcraft.dep import DependencySet, MutableDependencySet
+        >>> d = DependencySet('a/b || ( c/d e/f )').intern()
+        >>> d is DependencySet('a/b || ( c/d e/f )').intern()
+        True
+        >>> d is MutableDependencySet('a/b || ( c/d e/f )').intern()
+        True
+        """
+        key = (self.set, str(self))
+        if (obj := INTERNED.get(key)) is None:
+            if isinstance(self, MutableDependencySet):
+                obj = DependencySet(self)
+            else:
+                obj = self
+            obj = INTERNED.setdefault(key, obj)
+        return obj
+
     def iter_conditionals(self):
         """Iterate over the conditionals of a DependencySet."""
         return _IntoIterConditionals.from_dependency_set(self.ptr)
@@ -347,6 +724,36 @@ cdef class DependencySet:
         """Iterate over the objects of a flattened DependencySet."""
         return _IntoIterFlatten.from_dependency_set(self.ptr)
 
+    def flatten(self, bint unique=True, str as_='deps'):
+        """Get the objects of a flattened DependencySet.
+
+        All objects are collected in a single pass with only the returned
+        objects being wrapped.
+
+        Args:
+            unique: skip duplicate objects, retaining the first occurrence
+            as_: result type, "deps" for flattened objects as yielded by
+                :py:meth:`iter_flatten`, "cpns" for the Cpn objects of
+                package dependencies, or "strings" for string values
+
+        Returns:
+            list: the flattened objects
+
+        Raises:
+            ValueError: on invalid result types
+
+        >>> from pkgcraft.dep import DependencySet
+        >>> d = DependencySet('>=a/b-1 u? ( a/b c/d ) || ( a/b >=a/b-1 )')
+        >>> d.flatten(as_='strings')
+        ['>=a/b-1', 'a/b', 'c/d']
+        >>> d.flatten(unique=False, as_='strings')
+        ['>=a/b-1', 'a/b', 'c/d', 'a/b', '>=a/b-1']
+        >>> list(map(str, d.flatten(as_='cpns')))
+        ['a/b', 'c/d']
+        """
+        it = C.pkgcraft_dependency_set_into_iter_flatten(self.ptr)
+        return flatten_objects(it, self.ptr.set, unique, as_)
+
     def iter_recursive(self):
         """Recursively iterate over the Dependency objects of a DependencySet."""
         return _IntoIterRecursive.from_dependency_set(self.ptr)
@@ -382,26 +789,10 @@ cdef class DependencySet:
         return C.pkgcraft_dependency_set_is_subset(depset.ptr, self.ptr)
 
     def intersection(self, *others):
-        depset = self.clone()
-
-        for obj in others:
-            if isinstance(obj, DependencySet):
-                depset &= obj
-            else:
-                depset &= DependencySet(obj, set=self.set)
-
-        return depset
+        return set_op_all(self.__class__, C.SetOp.SET_OP_AND, (self, *others), None, self.set)
 
     def union(self, *others):
-        depset = self.clone()
-
-        for obj in others:
-            if isinstance(obj, DependencySet):
-                depset |= obj
-            else:
-                depset |= DependencySet(obj, set=self.set)
-
-        return depset
+        return set_op_all(self.__class__, C.SetOp.SET_OP_OR, (self, *others), None, self.set)
 
     def difference(self, *others):
         depset = self.clone()
@@ -475,7 +866,9 @@ cdef class DependencySet:
         return NotImplemented
 
     def __eq__(self, other):
-        if isinstance(other, DependencySet):
+        if self is other:
+            return True
+        elif isinstance(other, DependencySet):
             return C.pkgcraft_dependency_set_eq(self.ptr, (<DependencySet>other).ptr)
         return NotImplemented
 
@@ -756,6 +1149,395 @@ cdef class MutableDependencySet(DependencySet):
         return super().__eq__(other)
 
 
+cdef void compile_dependencies(
+        dict conds, dict flags, dict objs, object deps, object on, object off) except *:
+    """Recursively map flattened objects to the conditional flag masks enabling them."""
+    for d in deps:
+        kind = d.kind
+        if kind == DependencyKind.Conditional:
+            u = d.conditional
+            bit = flags.setdefault(u.flag, 1 << len(flags))
+            if u.enabled:
+                compile_dependencies(conds, flags, objs, d, on | bit, off)
+            else:
+                compile_dependencies(conds, flags, objs, d, on, off | bit)
+        elif kind == DependencyKind.Enabled or kind == DependencyKind.Disabled:
+            for obj in d.iter_flatten():
+                bit = objs.setdefault(obj, 1 << len(objs))
+                conds[(on, off)] = conds.get((on, off), 0) | bit
+        else:
+            compile_dependencies(conds, flags, objs, d, on, off)
+
+
+@cython.final
+cdef class CompiledDependencySet:
+    """DependencySet compiled to USE flag bitmasks for repeated evaluation.
+
+    Flags are mapped to bit positions, starting with the given IUSE flags
+    followed by any remaining conditional flags. Each flattened object is
+    tracked by the masks of the flags required to be enabled and disabled to
+    reach it, so evaluating a USE configuration only requires integer
+    operations over the compiled conditions.
+    """
+
+    def __init__(self, DependencySet deps not None, iuse=()):
+        """Compile a DependencySet.
+
+        Args:
+            deps: dependencies to compile
+            iuse (Iterable[str]): USE flags to map first, IUSE defaults are ignored
+
+        >>> from pkgcraft.dep import CompiledDependencySet, DependencySet
+        >>> d = CompiledDependencySet(DependencySet('a/b u1? ( c/d ) !u2? ( e/f )'), ['u2', 'u1'])
+        >>> d.flags
+        ('u2', 'u1')
+        >>> [str(x) for x in d.objects]
+        ['a/b', 'c/d', 'e/f']
+        >>> d.mask(['u1', 'u3'])
+        2
+        >>> d.bitset(['u1'])
+        7
+        >>> d.count(['u1', 'u2'])
+        2
+        >>> str(d.evaluate(['u1']))
+        'a/b c/d e/f'
+        """
+        # use an immutable copy so cached results can be shared
+        if isinstance(deps, MutableDependencySet):
+            deps = DependencySet(deps)
+        self.deps = deps
+
+        flags = {}
+        for flag in iuse:
+            flags.setdefault(flag.lstrip('+-'), 1 << len(flags))
+        objs = {}
+        conds = {}
+        compile_dependencies(conds, flags, objs, deps, 0, 0)
+
+        self.flags = tuple(flags)
+        self.objects = tuple(objs)
+        self._flags = flags
+        self._always = conds.pop((0, 0), 0)
+        self._conds = [(on, off, bits) for ((on, off), bits) in conds.items()]
+        self._evaluated = {}
+
+    cpdef object mask(self, object enabled):
+        """Convert enabled USE flags to a flag bitmask.
+
+        Args:
+            enabled (Iterable[str] | int): enabled USE flags or an existing mask
+
+        Returns:
+            int: bitmask of enabled flags, ignoring unknown flags
+
+        Raises:
+            TypeError: for boolean values
+        """
+        if isinstance(enabled, bool):
+            raise TypeError(f'invalid flag bitmask: {enabled!r}')
+        elif isinstance(enabled, int):
+            return enabled
+
+        mask = 0
+        for flag in enabled:
+            mask |= self._flags.get(flag, 0)
+        return mask
+
+    cpdef object bitset(self, object enabled):
+        """Get the flattened objects enabled for a USE configuration.
+
+        Args:
+            enabled (Iterable[str] | int): enabled USE flags or a flag bitmask
+
+        Returns:
+            int: bitset where bit N relates to the Nth object in :py:attr:`objects`
+        """
+        mask = self.mask(enabled)
+        result = self._always
+        for (on, off, bits) in self._conds:
+            if mask & on == on and not mask & off:
+                result |= bits
+        return result
+
+    def count(self, enabled):
+        """Get the number of flattened objects enabled for a USE configuration."""
+        return self.bitset(enabled).bit_count()
+
+    def evaluate(self, enabled):
+        """Evaluate the DependencySet for a USE configuration.
+
+        Results are cached per flag bitmask.
+
+        Args:
+            enabled (Iterable[str] | int): enabled USE flags or a flag bitmask
+
+        Returns:
+            DependencySet: the evaluated dependencies
+        """
+        mask = self.mask(enabled)
+        if (deps := self._evaluated.get(mask)) is None:
+            deps = self.deps.evaluate(f for (i, f) in enumerate(self.flags) if mask >> i & 1)
+            self._evaluated[mask] = deps
+        return deps
+
+    def __len__(self):
+        return len(self.objects)
+
+    def __repr__(self):
+        name = self.__class__.__name__
+        return f"<{name} with {len(self.flags)} flags and {len(self)} objects>"
+
+
+# dependency kind values used during REQUIRED_USE solving
+cdef int KIND_ENABLED = C.DEPENDENCY_KIND_ENABLED
+cdef int KIND_DISABLED = C.DEPENDENCY_KIND_DISABLED
+cdef int KIND_ALL_OF = C.DEPENDENCY_KIND_ALL_OF
+cdef int KIND_ANY_OF = C.DEPENDENCY_KIND_ANY_OF
+cdef int KIND_EXACTLY_ONE_OF = C.DEPENDENCY_KIND_EXACTLY_ONE_OF
+cdef int KIND_CONDITIONAL = C.DEPENDENCY_KIND_CONDITIONAL
+
+
+cdef tuple compile_required_use(object deps, dict flags, set used):
+    """Recursively convert REQUIRED_USE dependencies to (kind, bit, negated, children) nodes."""
+    nodes = []
+    for d in deps:
+        kind = int(d.kind)
+        if kind == KIND_ENABLED or kind == KIND_DISABLED:
+            s = str(d)
+            flag = s[1:] if kind == KIND_DISABLED else s
+            bit = flags.setdefault(flag, 1 << len(flags))
+            nodes.append((kind, bit, kind == KIND_DISABLED, None))
+        elif kind == KIND_CONDITIONAL:
+            u = d.conditional
+            bit = flags.setdefault(u.flag, 1 << len(flags))
+            nodes.append((kind, bit, not u.enabled, compile_required_use(d, flags, used)))
+        else:
+            bit = 0
+            nodes.append((kind, bit, False, compile_required_use(d, flags, used)))
+        used.add(bit)
+    return tuple(nodes)
+
+
+cdef int required_use_all(tuple nodes, object known, object values):
+    """Determine the combined state of nodes that all must be satisfied."""
+    cdef int state, result = 1
+    for node in nodes:
+        state = required_use_state(node, known, values)
+        if state == 0:
+            return 0
+        elif state == -1:
+            result = -1
+    return result
+
+
+cdef int required_use_state(tuple node, object known, object values):
+    """Determine if a node is satisfied (1), unsatisfied (0), or undetermined (-1).
+
+    Flags are only considered assigned when their bit is set in the known mask.
+    """
+    cdef int kind, state, n_true = 0, n_unknown = 0
+    kind, bit, negated, children = node
+
+    if kind == KIND_ENABLED or kind == KIND_DISABLED:
+        if not known & bit:
+            return -1
+        return (not values & bit) if negated else (values & bit != 0)
+    elif kind == KIND_CONDITIONAL:
+        if known & bit:
+            if (values & bit != 0) == negated:
+                return 1
+            return required_use_all(children, known, values)
+        return 1 if required_use_all(children, known, values) == 1 else -1
+    elif kind == KIND_ALL_OF:
+        return required_use_all(children, known, values)
+
+    for child in children:
+        state = required_use_state(child, known, values)
+        if state == 1:
+            n_true += 1
+        elif state == -1:
+            n_unknown += 1
+
+    if kind == KIND_ANY_OF:
+        if n_true or not children:
+            return 1
+        return -1 if n_unknown else 0
+    elif n_true > 1:
+        return 0
+    elif kind == KIND_EXACTLY_ONE_OF:
+        if not children:
+            return 1
+        elif n_unknown:
+            return -1
+        return n_true == 1
+    # at-most-one-of
+    return 1 if n_true + n_unknown <= 1 else -1
+
+
+def _iter_required_use_solutions(tuple nodes, tuple order, constrained, prefs):
+    """Iterate over REQUIRED_USE solution bitmasks.
+
+    Solutions are yielded in order of the number of constrained flags differing
+    from the preferred values, with earlier flags preferentially left unchanged.
+    """
+    cdef int n = len(order)
+    unconstrained = prefs & ~constrained
+
+    for max_changes in range(n + 1):
+        stack = [(0, 0, 0, 0)]
+        while stack:
+            depth, changes, known, values = stack.pop()
+            if n - depth < max_changes - changes:
+                # not enough remaining flags to reach the required changes
+                continue
+            elif required_use_all(nodes, known, values) == 0:
+                continue
+            elif depth == n:
+                yield values | unconstrained
+                continue
+
+            # push the changed value first so the preferred one is tried first
+            bit = order[depth]
+            known |= bit
+            preferred = values | (prefs & bit)
+            if changes < max_changes:
+                stack.append((depth + 1, changes + 1, known, preferred ^ bit))
+            stack.append((depth + 1, changes, known, preferred))
+
+
+@cython.final
+cdef class RequiredUseSolver:
+    """REQUIRED_USE constraint solver.
+
+    Flags are mapped to bit positions and solutions are found via
+    depth-first search over the flags referenced by REQUIRED_USE, pruning
+    partial assignments as soon as any constraint is violated. Searches are
+    bounded by the number of flags changed from their preferred values so
+    solutions closest to the preferences are found first. Flags not
+    referenced by REQUIRED_USE keep their preferred values. Results are
+    cached per set of flags.
+    """
+
+    def __init__(self, DependencySet required_use not None, iuse=()):
+        """Create a solver for REQUIRED_USE constraints.
+
+        Args:
+            required_use: REQUIRED_USE constraints
+            iuse (Iterable[str]): USE flags with optional IUSE defaults, e.g. +flag
+
+        Raises:
+            ValueError: on non-REQUIRED_USE dependencies
+
+        >>> from pkgcraft.dep import DependencySet, RequiredUseSolver
+        >>> d = DependencySet.required_use('^^ ( a b ) c? ( a )')
+        >>> s = RequiredUseSolver(d, ['a', '+b', 'c'])
+        >>> s.check(['b'])
+        True
+        >>> s.check(['b', 'c'])
+        False
+        >>> list(s.first_solution())
+        ['b']
+        >>> list(s.first_solution(['c']))
+        ['a', 'c']
+        >>> [list(x) for x in s.enumerate_solutions()]
+        [['b'], ['a'], ['a', 'c']]
+        """
+        if required_use.set != DependencySetKind.RequiredUse:
+            raise ValueError(f'invalid REQUIRED_USE dependencies: {required_use.set.name}')
+        self.required_use = required_use
+
+        flags = {}
+        defaults = 0
+        for s in iuse:
+            bit = flags.setdefault(s.lstrip('+-'), 1 << len(flags))
+            if s.startswith('+'):
+                defaults |= bit
+        used = set()
+        self._nodes = compile_required_use(required_use, flags, used)
+        used.discard(0)
+
+        self.flags = tuple(flags)
+        self._flags = flags
+        self._defaults = defaults
+        self._order = tuple(sorted(used))
+        self._constrained = sum(used)
+        self._checks = {}
+        self._solutions = {}
+        self._enumerated = []
+        self._enumerator = None
+
+    cdef object mask(self, object enabled):
+        """Convert enabled USE flags to a flag bitmask, using IUSE defaults for None."""
+        if enabled is None:
+            return self._defaults
+        mask = 0
+        for flag in enabled:
+            mask |= self._flags.get(flag, 0)
+        return mask
+
+    cdef OrderedFrozenSet flags_from_mask(self, object mask):
+        """Convert a flag bitmask to an ordered set of enabled USE flags."""
+        return OrderedFrozenSet(f for (i, f) in enumerate(self.flags) if mask >> i & 1)
+
+    def check(self, enabled=None):
+        """Determine if a USE configuration satisfies the constraints.
+
+        Args:
+            enabled (Iterable[str] | None): enabled USE flags, by default IUSE defaults
+
+        Returns:
+            bool: True if satisfied, otherwise False
+        """
+        mask = self.mask(enabled)
+        if (result := self._checks.get(mask)) is None:
+            known = mask | self._constrained
+            result = required_use_all(self._nodes, known, mask) == 1
+            self._checks[mask] = result
+        return result
+
+    def first_solution(self, preferences=None):
+        """Get the solution closest to the preferred USE configuration.
+
+        Args:
+            preferences (Iterable[str] | None): preferred enabled USE flags,
+                by default IUSE defaults
+
+        Returns:
+            OrderedFrozenSet[str] | None: enabled USE flags or None if unsatisfiable
+        """
+        prefs = self.mask(preferences)
+        if prefs not in self._solutions:
+            solutions = _iter_required_use_solutions(
+                self._nodes, self._order, self._constrained, prefs)
+            mask = next(solutions, None)
+            self._solutions[prefs] = self.flags_from_mask(mask) if mask is not None else None
+        return self._solutions[prefs]
+
+    def enumerate_solutions(self, limit=None):
+        """Get the solutions for the constraints using IUSE defaults as preferences.
+
+        Args:
+            limit (int | None): maximum number of solutions, by default all
+
+        Returns:
+            list[OrderedFrozenSet[str]]: enabled USE flags for each solution
+        """
+        if self._enumerator is None:
+            self._enumerator = _iter_required_use_solutions(
+                self._nodes, self._order, self._constrained, self._defaults)
+
+        while limit is None or len(self._enumerated) < limit:
+            if (mask := next(self._enumerator, None)) is None:
+                break
+            self._enumerated.append(self.flags_from_mask(mask))
+
+        return self._enumerated[:limit]
+
+    def __repr__(self):
+        name = self.__class__.__name__
+        return f"<{name} '{self.required_use}'>"
+
+
 @cython.internal
 cdef class _IntoIter(Indirect):
     """Iterator over a DependencySet or Dependency object."""
@@ -0,0 +1,12 @@
+cdef class PackedArray:
+    cdef readonly object kind
+    cdef object _buf
+    cdef object _items
+    cdef object _offsets
+    cdef object _eapi_idx
+    cdef tuple _eapis
+    cdef object _data
+    cdef list _objs
+
+    cdef void load(self, object) except *
+    cdef object get(self, Py_ssize_t)
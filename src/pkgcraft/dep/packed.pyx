@@ -0,0 +1,242 @@
+import struct
+import sys
+from array import array
+from multiprocessing import shared_memory
+
+cimport cython
+
+from .cpn cimport Cpn
+from .cpv cimport Cpv
+from .pkg cimport Dep
+from .version cimport Version
+
+
+# header fields: magic, format version, kind, reserved, items, unique items, EAPIs
+cdef object HEADER = struct.Struct('<4sBBHIII')
+cdef bytes MAGIC = b'PKGA'
+cdef int FORMAT_VERSION = 1
+
+# supported object types and their related identifiers
+cdef tuple KINDS = (Cpn, Cpv, Dep, Version)
+
+
+cdef object uint32_array(object values):
+    """Create a little-endian, unsigned 32-bit integer array."""
+    a = array('I', values)
+    if sys.byteorder == 'big':  # pragma: no cover
+        a.byteswap()
+    return a
+
+
+cdef object uint32_view(object buf, Py_ssize_t start, Py_ssize_t length):
+    """Create an unsigned 32-bit integer view of a buffer region without copying."""
+    if sys.byteorder == 'big':  # pragma: no cover
+        return uint32_array(buf[start:start + length * 4].cast('I'))
+    return buf[start:start + length * 4].cast('I')
+
+
+cdef Py_ssize_t align(Py_ssize_t n):
+    """Round up to a multiple of four bytes."""
+    return (n + 3) & ~3
+
+
+def _from_bytes(data):
+    """Support unpickling PackedArray objects."""
+    return PackedArray.from_buffer(data)
+
+
+@cython.final
+cdef class PackedArray:
+    """Compact, immutable sequence of Cpn, Cpv, Dep, or Version objects.
+
+    Objects are stored as deduplicated UTF-8 strings in a single contiguous
+    buffer that can be pickled as raw bytes or shared between processes via
+    :py:mod:`multiprocessing.shared_memory`. Objects are lazily rebuilt on
+    access with each unique value only being parsed once per array instance.
+    """
+
+    def __init__(self, objs=(), kind=None):
+        """Create a packed array from an iterable of objects.
+
+        Args:
+            objs: objects of the same supported type
+            kind (type | None): object type for empty arrays, by default the
+                type of the first object
+
+        Raises:
+            TypeError: on unsupported or mixed object types
+
+        >>> from pkgcraft.dep import Dep, PackedArray
+        >>> a = PackedArray([Dep('cat/a'), Dep('>=cat/b-1'), Dep('cat/a')])
+        >>> len(a)
+        3
+        >>> a.kind is Dep
+        True
+        >>> list(map(str, a))
+        ['cat/a', '>=cat/b-1', 'cat/a']
+        >>> a[0] is a[2]
+        True
+        >>> b = PackedArray.from_buffer(a.to_bytes())
+        >>> list(b) == list(a)
+        True
+        """
+        cdef Dep dep
+
+        unique = {}
+        eapis = {}
+        items = []
+        for obj in objs:
+            if kind is None:
+                kind = next((k for k in KINDS if isinstance(obj, k)), None)
+            if kind is None or not isinstance(obj, kind):
+                raise TypeError(f'{obj.__class__.__name__!r} unsupported packed object type')
+            if kind is Dep:
+                dep = obj
+                eapi_idx = eapis.setdefault(str(dep.eapi), len(eapis))
+                key = (str(obj), eapi_idx)
+            else:
+                key = (str(obj), 0)
+            items.append(unique.setdefault(key, len(unique)))
+
+        if kind is None:
+            kind = Dep
+        elif kind not in KINDS:
+            raise TypeError(f'{kind.__name__!r} unsupported packed object type')
+
+        # string data and offsets for unique values
+        strs = [s.encode() for (s, _) in unique]
+        offsets = [0]
+        for s in strs:
+            offsets.append(offsets[-1] + len(s))
+
+        eapi_table = b''.join(bytes([len(x)]) + x.encode() for x in eapis)
+        eapi_idx = bytes(i for (_, i) in unique) if kind is Dep else b''
+
+        parts = [
+            HEADER.pack(
+                MAGIC, FORMAT_VERSION, KINDS.index(kind), 0,
+                len(items), len(unique), len(eapis)),
+            eapi_table.ljust(align(len(eapi_table)), b'\0'),
+            uint32_array(items).tobytes(),
+            uint32_array(offsets).tobytes(),
+            eapi_idx.ljust(align(len(eapi_idx)), b'\0'),
+            b''.join(strs),
+        ]
+        self.load(memoryview(b''.join(parts)))
+
+    @staticmethod
+    def from_buffer(buf not None):
+        """Create a packed array from a buffer without copying it.
+
+        The buffer must remain valid and unmodified while the array or any
+        views of it are in use.
+
+        Args:
+            buf: bytes-like object, e.g. bytes or SharedMemory.buf
+
+        Returns:
+            PackedArray: the array backed by the given buffer
+
+        Raises:
+            ValueError: on invalid data
+        """
+        inst = <PackedArray>PackedArray.__new__(PackedArray)
+        inst.load(memoryview(buf).cast('B'))
+        return inst
+
+    cdef void load(self, object buf) except *:
+        """Load packed data from a memoryview, verifying its layout."""
+        # verify header
+        if len(buf) < HEADER.size:
+            raise ValueError('invalid packed data: truncated header')
+        magic, version, kind, _, n_items, n_unique, n_eapis = HEADER.unpack_from(buf)
+        if magic != MAGIC:
+            raise ValueError('invalid packed data: unknown format')
+        elif version != FORMAT_VERSION:
+            raise ValueError(f'invalid packed data: unsupported version: {version}')
+        elif kind >= len(KINDS):
+            raise ValueError(f'invalid packed data: unsupported kind: {kind}')
+
+        try:
+            # EAPI identifiers
+            pos = HEADER.size
+            eapis = []
+            for _ in range(n_eapis):
+                length = buf[pos]
+                eapis.append(bytes(buf[pos + 1:pos + 1 + length]).decode())
+                pos += 1 + length
+            pos = align(pos)
+
+            self._items = uint32_view(buf, pos, n_items)
+            pos += n_items * 4
+            self._offsets = uint32_view(buf, pos, n_unique + 1)
+            pos += (n_unique + 1) * 4
+            if KINDS[kind] is Dep:
+                self._eapi_idx = buf[pos:pos + n_unique]
+                pos = align(pos + n_unique)
+            self._data = buf[pos:pos + self._offsets[n_unique]]
+        except (IndexError, TypeError):
+            raise ValueError('invalid packed data: truncated')
+
+        if len(self._items) != n_items or len(self._data) != self._offsets[n_unique]:
+            raise ValueError('invalid packed data: truncated')
+
+        self.kind = KINDS[kind]
+        self._buf = buf[:pos + len(self._data)]
+        self._eapis = tuple(eapis)
+        self._objs = [None] * n_unique
+
+    cdef object get(self, Py_ssize_t i):
+        """Get the object for a given unique value index, parsing it if required."""
+        if (obj := self._objs[i]) is None:
+            s = str(self._data[self._offsets[i]:self._offsets[i + 1]], 'utf-8')
+            if self.kind is Dep:
+                obj = Dep(s, self._eapis[self._eapi_idx[i]])
+            else:
+                obj = self.kind(s)
+            self._objs[i] = obj
+        return obj
+
+    @property
+    def nbytes(self):
+        """Get the size of the packed data in bytes."""
+        return len(self._buf)
+
+    def to_bytes(self):
+        """Return a copy of the packed data."""
+        return bytes(self._buf)
+
+    def to_shared_memory(self, name=None):
+        """Copy the packed data into a new shared memory block.
+
+        Other processes can attach to the block by name and load the array
+        using ``PackedArray.from_buffer(SharedMemory(name).buf)``. The caller
+        is responsible for closing and unlinking the block.
+
+        Args:
+            name (str | None): shared memory block name, by default a random name
+
+        Returns:
+            SharedMemory: the shared memory block containing the packed data
+        """
+        shm = shared_memory.SharedMemory(name=name, create=True, size=max(len(self._buf), 1))
+        shm.buf[:len(self._buf)] = self._buf
+        return shm
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self.get(i) for i in self._items[key]]
+        return self.get(self._items[key])
+
+    def __iter__(self):
+        return (self.get(i) for i in self._items)
+
+    def __reduce__(self):
+        return _from_bytes, (self.to_bytes(),)
+
+    def __repr__(self):
+        name = self.__class__.__name__
+        return f"<{name} of {len(self)} {self.kind.__name__} objects>"
@@ -168,6 +168,58 @@ cdef class Dep:
             raise InvalidDep
         return valid
 
+    @staticmethod
+    def parse_many(deps not None, eapi: Eapi | str = None, errors: str = 'raise'):
+        """Create package dependencies from an iterable of strings.
+
+        All strings are encoded up front and then parsed in a single loop,
+        avoiding the per-object overhead of calling Dep() for each string.
+
+        Args:
+            deps: iterable of package dependency strings
+            eapi: an :py:class:`~pkgcraft.eapi.Eapi` constant or string identifier
+            errors: handling for invalid strings, "raise" raises an exception,
+                "skip" drops them, and "none" uses None in their place
+
+        Returns:
+            list[Dep | None]: the package dependencies in iteration order
+
+        Raises:
+            InvalidDep: on parsing failure if errors is "raise"
+            ValueError: on invalid errors values
+
+        >>> from pkgcraft.dep import Dep
+        >>> list(map(str, Dep.parse_many(['cat/pkg', '>=cat/pkg-1'])))
+        ['cat/pkg', '>=cat/pkg-1']
+        >>> Dep.parse_many(['cat/pkg', 'cat/pkg-1'], errors='none')[1] is None
+        True
+        >>> len(Dep.parse_many(['cat/pkg', 'cat/pkg-1'], errors='skip'))
+        1
+        """
+        cdef Eapi eapi_obj = EAPI_LATEST
+        cdef C.Dep *ptr
+        cdef Dep inst
+        cdef list results = []
+
+        if errors not in ('raise', 'skip', 'none'):
+            raise ValueError(f'invalid errors value: {errors!r}')
+        if eapi is not None:
+            eapi_obj = Eapi._from_obj(eapi)
+
+        encoded = [(<str?>s).encode() for s in deps]
+        for s in encoded:
+            ptr = C.pkgcraft_dep_new(s, eapi_obj.ptr)
+            if ptr is not NULL:
+                inst = Dep.from_ptr(ptr)
+                inst.eapi = eapi_obj
+                results.append(inst)
+            elif errors == 'raise':
+                raise InvalidDep
+            elif errors == 'none':
+                results.append(None)
+
+        return results
+
     def without(self, *fields: str):
         """Return a new Dep without the given attributes.
 
@@ -733,6 +785,21 @@ class DepCachedLru(Dep, metaclass=LruInstanceCache):
     >>> d = DepCachedLru(s)
     >>> repr(d) == dep_id
     True
+
+    Equivalent EAPI arguments map to the same cached object.
+
+    >>> from pkgcraft.eapi import EAPI_LATEST_OFFICIAL
+    >>> eapi = str(EAPI_LATEST_OFFICIAL)
+    >>> DepCachedLru('cat/pkg', eapi) is DepCachedLru('cat/pkg', eapi=EAPI_LATEST_OFFICIAL)
+    True
+
+    Cache statistics are available via the class pool.
+
+    >>> DepCachedLru.pool.clear()
+    >>> d = DepCachedLru(s)
+    >>> d = DepCachedLru(s)
+    >>> DepCachedLru.pool.info()
+    PoolInfo(hits=1, misses=1, evictions=0, maxsize=10000, currsize=1)
     """
 
 
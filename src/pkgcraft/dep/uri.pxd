@@ -6,6 +6,7 @@ cdef class Uri(Indirect):
     cdef C.Uri *ptr
     # cached fields
     cdef str _uri_str
+    cdef str _filename
 
     @staticmethod
     cdef Uri from_ptr(C.Uri *)
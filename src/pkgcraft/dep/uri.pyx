@@ -22,7 +22,9 @@ cdef class Uri(Indirect):
 
     @property
     def filename(self):
-        return cstring_to_str(C.pkgcraft_uri_filename(self.ptr))
+        if self._filename is None:
+            self._filename = cstring_to_str(C.pkgcraft_uri_filename(self.ptr))
+        return self._filename
 
     def __str__(self):
         return cstring_to_str(C.pkgcraft_uri_str(self.ptr))
@@ -18,3 +18,12 @@ cdef class Version:
 
     @staticmethod
     cdef Version from_ptr(C.Version *)
+
+
+cdef class VersionIndex:
+    cdef tuple _versions
+    cdef tuple _strs
+    cdef tuple _strs_idx
+
+    cdef Py_ssize_t bisect(self, Version, bint)
+    cdef tuple query(self, object)
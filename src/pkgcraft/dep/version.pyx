@@ -1,5 +1,8 @@
+from bisect import bisect_left
 from enum import IntEnum
 
+cimport cython
+
 from .. cimport C
 from .._misc cimport SENTINEL, cstring_to_str
 
@@ -340,3 +343,152 @@ cdef class Version:
 
     def __dealloc__(self):
         C.pkgcraft_version_free(self.ptr)
+
+
+@cython.final
+cdef class VersionIndex:
+    """Sorted package versions supporting binary search queries.
+
+    Matching versions are returned as slices of the sorted, deduplicated versions.
+    """
+
+    def __init__(self, versions=()):
+        """Create a new version index.
+
+        Args:
+            versions (Iterable[Version | str]): versions to index
+
+        Raises:
+            InvalidVersion: on version parsing failure
+            ValueError: for versions with operators
+
+        >>> from pkgcraft.dep import Dep, VersionIndex
+        >>> idx = VersionIndex(['1.1', '1', '2', '1.2_alpha', '1-r1'])
+        >>> list(map(str, idx))
+        ['1', '1-r1', '1.1', '1.2_alpha', '2']
+        >>> list(map(str, idx.matches('>=1.1')))
+        ['1.1', '1.2_alpha', '2']
+        >>> list(map(str, idx.matches(Dep('~cat/pkg-1'))))
+        ['1', '1-r1']
+        >>> list(map(str, idx.matches('=1.1*')))
+        ['1.1']
+        >>> str(idx.best('<2'))
+        '1.2_alpha'
+        >>> idx.best('>2') is None
+        True
+        """
+        vers = {}
+        for obj in versions:
+            v = obj if isinstance(obj, Version) else Version(obj)
+            if v.op is not None:
+                raise ValueError(f'invalid indexed version: {v}')
+            vers.setdefault(v, None)
+        self._versions = tuple(sorted(vers))
+
+        # versions sorted by string for prefix-based glob queries
+        strs = sorted((str(v), i) for (i, v) in enumerate(self._versions))
+        self._strs = tuple(s for (s, _) in strs)
+        self._strs_idx = tuple(i for (_, i) in strs)
+
+    cdef Py_ssize_t bisect(self, Version query, bint right):
+        """Find a boundary index for the contiguous versions matching a query."""
+        cdef Version v
+        cdef Py_ssize_t lo = 0, hi = len(self._versions), mid
+        cdef int side
+
+        # non-matching versions equal to the query are only excluded for < and >
+        cdef int equal_side = 1 if C.pkgcraft_version_op(query.ptr) == C.OPERATOR_LESS else -1
+
+        while lo < hi:
+            mid = (lo + hi) // 2
+            v = self._versions[mid]
+            if C.pkgcraft_version_intersects(query.ptr, v.ptr):
+                side = 0
+            else:
+                side = C.pkgcraft_version_cmp(v.ptr, query.ptr)
+                if side == 0:
+                    side = equal_side
+            if side < 0 or (right and side == 0):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    cdef tuple query(self, object obj):
+        """Return the versions matching a query."""
+        cdef Version query
+
+        if isinstance(obj, str):
+            obj = Version(obj)
+        if not isinstance(obj, Version):
+            try:
+                obj = obj.version
+            except AttributeError:
+                raise TypeError(f'{obj.__class__.__name__!r} unsupported query type')
+            if obj is None:
+                return self._versions
+
+        query = obj
+        op = C.pkgcraft_version_op(query.ptr)
+        if op == C.OPERATOR_EQUAL_GLOB:
+            # glob matches share a string prefix, verifying each candidate
+            prefix = str(query)[1:-1]
+            start = bisect_left(self._strs, prefix)
+            stop = bisect_left(self._strs, prefix + '\U0010ffff', start)
+            matches = sorted(self._strs_idx[start:stop])
+            return tuple(
+                v for v in (self._versions[i] for i in matches)
+                if C.pkgcraft_version_intersects(query.ptr, (<Version>v).ptr)
+            )
+        elif op == 0:
+            query = query.with_op(Operator.Equal)
+
+        return self._versions[self.bisect(query, False):self.bisect(query, True)]
+
+    def matches(self, obj not None):
+        """Return the versions matching an operator-qualified version or dependency.
+
+        Unqualified versions are treated as exact matches while dependencies
+        lacking versions match all versions.
+
+        Args:
+            obj (Version | Dep | Cpv | str): version query
+
+        Returns:
+            tuple[Version]: matching versions in ascending order
+        """
+        return self.query(obj)
+
+    def best(self, obj not None):
+        """Return the highest version matching an operator-qualified version or dependency.
+
+        Args:
+            obj (Version | Dep | Cpv | str): version query
+
+        Returns:
+            Version | None: the highest matching version if one exists, otherwise None
+        """
+        if versions := self.query(obj):
+            return versions[-1]
+        return None
+
+    def __len__(self):
+        return len(self._versions)
+
+    def __iter__(self):
+        return iter(self._versions)
+
+    def __reversed__(self):
+        return reversed(self._versions)
+
+    def __getitem__(self, key):
+        return self._versions[key]
+
+    def __contains__(self, obj):
+        if isinstance(obj, (Version, str)):
+            return bool(self.query(obj))
+        return False
+
+    def __repr__(self):
+        name = self.__class__.__name__
+        return f"<{name} with {len(self)} versions>"
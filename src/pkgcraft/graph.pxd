@@ -0,0 +1,22 @@
+from .dep cimport Cpv, Dep
+from .error cimport Indirect
+
+
+cdef class Edge(Indirect):
+    cdef readonly Cpv pkg
+    cdef readonly Dep dep
+    cdef readonly str key
+    cdef readonly tuple conditionals
+    # Cpn strings for the source and target nodes
+    cdef str source
+    cdef str target
+
+    @staticmethod
+    cdef Edge create(Cpv, Dep, str, tuple)
+
+
+cdef class DepGraph:
+    cdef dict _pkgs
+    cdef dict _forward
+    cdef dict _reverse
+    cdef dict _closures
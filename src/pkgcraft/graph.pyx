@@ -0,0 +1,226 @@
+from collections import deque
+
+cimport cython
+
+from .dep cimport Cpn, Cpv, Dep
+from .error cimport Indirect
+from .pkg cimport Pkg
+from .types cimport OrderedFrozenSet
+
+from .dep import DependencyKind
+from .error import InvalidCpn, InvalidCpv
+
+
+cdef void dependency_edges(list edges, Cpv cpv, str key, object deps, tuple conditionals):
+    """Recursively add the edges for non-blocker dependencies to a list."""
+    for d in deps:
+        kind = d.kind
+        if kind == DependencyKind.Enabled:
+            for dep in d.iter_flatten():
+                if dep.blocker is None:
+                    edges.append(Edge.create(cpv, dep, key, conditionals))
+        elif kind == DependencyKind.Conditional:
+            dependency_edges(edges, cpv, key, d, conditionals + (d.conditional,))
+        else:
+            dependency_edges(edges, cpv, key, d, conditionals)
+
+
+cdef tuple graph_target(object obj):
+    """Convert an object into its Cpn string and related version matching target.
+
+    The version matching target is None when all versions match.
+    """
+    if isinstance(obj, str):
+        try:
+            return (str(Cpn(obj)), None)
+        except InvalidCpn:
+            pass
+        try:
+            obj = Cpv(obj)
+        except InvalidCpv:
+            obj = Dep(obj)
+
+    if isinstance(obj, Cpn):
+        return (str(obj), None)
+    elif isinstance(obj, Cpv):
+        return (str(obj.cpn), obj)
+    elif isinstance(obj, Dep):
+        return (str(obj.cpn), obj if obj.version is not None or obj.slot is not None else None)
+    elif isinstance(obj, Pkg):
+        return (str(obj.cpn), obj)
+    raise TypeError(f"{obj.__class__.__name__!r} unsupported graph target type")
+
+
+@cython.final
+cdef class Edge(Indirect):
+    """Dependency graph edge from a package to one of its dependencies."""
+
+    @staticmethod
+    cdef Edge create(Cpv pkg, Dep dep, str key, tuple conditionals):
+        inst = <Edge>Edge.__new__(Edge)
+        inst.pkg = pkg
+        inst.dep = dep
+        inst.key = key
+        inst.conditionals = conditionals
+        inst.source = str(pkg.cpn)
+        inst.target = str(dep.cpn)
+        return inst
+
+    def __eq__(self, other):
+        if isinstance(other, Edge):
+            o = <Edge>other
+            return (
+                self.pkg == o.pkg
+                and self.dep == o.dep
+                and self.key == o.key
+                and self.conditionals == o.conditionals
+            )
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((self.pkg, self.dep, self.key, self.conditionals))
+
+    def __str__(self):
+        conditionals = ''.join(f'{x} ' for x in self.conditionals)
+        return f'{self.pkg}: {self.key}: {conditionals}{self.dep}'
+
+    def __repr__(self):
+        name = self.__class__.__name__
+        return f"<{name} '{self}'>"
+
+
+@cython.final
+cdef class DepGraph:
+    """Package dependency graph with forward and reverse adjacency keyed by Cpn.
+
+    Edges are labeled by dependency key, e.g. RDEPEND, and the USE conditionals
+    required to enable them. Blockers aren't treated as dependencies and are
+    excluded from the graph.
+    """
+
+    def __init__(self, repos not None):
+        """Create a dependency graph from the packages of a repo or repo set.
+
+        Args:
+            repos (Repo | RepoSet): packages to include in the graph
+        """
+        cdef list edges
+        cdef Edge edge
+
+        self._pkgs = {}
+        self._forward = {}
+        self._reverse = {}
+        self._closures = {}
+
+        for pkg in repos:
+            cpv = pkg.cpv
+            cpn = str(cpv.cpn)
+            self._pkgs.setdefault(cpn, []).append(cpv)
+            edges = self._forward.setdefault(cpn, [])
+            for key in pkg.eapi.dep_keys:
+                if deps := getattr(pkg, key.lower(), None):
+                    dependency_edges(edges, cpv, key, deps, ())
+
+        for edges in self._forward.values():
+            for edge in edges:
+                self._reverse.setdefault(edge.target, []).append(edge)
+
+    def revdeps(self, obj not None, keys=None):
+        """Get the edges for all dependencies on a given target.
+
+        Args:
+            obj (Cpn | Cpv | Dep | Pkg | str): dependency target, versioned
+                targets only match intersecting dependencies
+            keys (Iterable[str] | None): dependency keys to include, by default all
+
+        Returns:
+            OrderedFrozenSet[Edge]: reverse dependency edges in repo order
+        """
+        cdef Edge edge
+        cpn, target = graph_target(obj)
+        keys = frozenset(keys) if keys is not None else None
+        return OrderedFrozenSet(
+            edge for edge in self._reverse.get(cpn, ())
+            if (keys is None or edge.key in keys)
+            and (target is None or edge.dep.intersects(target))
+        )
+
+    def deps(self, obj not None, keys=None):
+        """Get the edges for all dependencies of a given package.
+
+        Args:
+            obj (Cpn | Cpv | Dep | Pkg | str): source package, versioned
+                targets only match intersecting package versions
+            keys (Iterable[str] | None): dependency keys to include, by default all
+
+        Returns:
+            OrderedFrozenSet[Edge]: dependency edges in repo order
+        """
+        cdef Edge edge
+        cpn, target = graph_target(obj)
+        if isinstance(target, Pkg):
+            target = target.cpv
+        keys = frozenset(keys) if keys is not None else None
+        return OrderedFrozenSet(
+            edge for edge in self._forward.get(cpn, ())
+            if (keys is None or edge.key in keys)
+            and (target is None or target.intersects(edge.pkg))
+        )
+
+    def closure(self, obj not None, reverse=False, keys=None):
+        """Get the transitive closure of dependencies for a given package.
+
+        Traversal is performed at the package name level, ignoring versions
+        and USE conditionals. Results are cached per query.
+
+        Args:
+            obj (Cpn | Cpv | Dep | Pkg | str): starting package
+            reverse (bool): follow reverse dependencies instead of dependencies
+            keys (Iterable[str] | None): dependency keys to follow, by default all
+
+        Returns:
+            OrderedFrozenSet[Cpn]: reachable packages in breadth-first order
+        """
+        cdef Edge edge
+        cpn, _ = graph_target(obj)
+        keys = frozenset(keys) if keys is not None else None
+
+        cache_key = (cpn, bool(reverse), keys)
+        if (cpns := self._closures.get(cache_key)) is not None:
+            return cpns
+
+        adjacency = self._reverse if reverse else self._forward
+        seen = {cpn: None}
+        queue = deque([cpn])
+        while queue:
+            for edge in adjacency.get(queue.popleft(), ()):
+                if keys is None or edge.key in keys:
+                    node = edge.source if reverse else edge.target
+                    if node not in seen:
+                        seen[node] = None
+                        queue.append(node)
+
+        del seen[cpn]
+        cpns = OrderedFrozenSet(map(Cpn, seen))
+        self._closures[cache_key] = cpns
+        return cpns
+
+    def __len__(self):
+        return len(self._pkgs)
+
+    def __contains__(self, obj):
+        try:
+            cpn, target = graph_target(obj)
+        except (TypeError, ValueError):
+            return False
+        if cpns := self._pkgs.get(cpn):
+            return target is None or any(target.intersects(x) for x in cpns)
+        return False
+
+    def __iter__(self):
+        return map(Cpn, self._pkgs)
+
+    def __repr__(self):
+        name = self.__class__.__name__
+        edges = sum(map(len, self._forward.values()))
+        return f"<{name} with {len(self)} pkgs and {edges} edges>"
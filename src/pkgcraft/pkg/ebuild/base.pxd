@@ -1,9 +1,13 @@
-from ...dep cimport DependencySet
+from ... cimport C
+from ...dep cimport DependencySet, RequiredUseSolver
 from ...types cimport OrderedFrozenSet
 from .. cimport Pkg
 
 
 cdef class EbuildPkg(Pkg):
+    # flag denoting dependency sets are interned
+    cdef bint intern_deps
+
     # cached fields
     cdef str _description
     cdef str _slot
@@ -16,6 +20,7 @@ cdef class EbuildPkg(Pkg):
     cdef DependencySet _license
     cdef DependencySet _properties
     cdef DependencySet _required_use
+    cdef RequiredUseSolver _required_use_solver
     cdef DependencySet _restrict
     cdef DependencySet _src_uri
     cdef OrderedFrozenSet _defined_phases
@@ -27,6 +32,8 @@ cdef class EbuildPkg(Pkg):
     cdef OrderedFrozenSet _maintainers
     cdef object _upstream
 
+    cdef DependencySet dependency_set(self, C.DependencySet *)
+
 
 cdef class ConfiguredPkg(EbuildPkg):
     pass
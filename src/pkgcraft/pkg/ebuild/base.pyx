@@ -4,7 +4,7 @@ cimport cython
 
 from ... cimport C
 from ..._misc cimport SENTINEL, CStringArray, cstring_iter, cstring_to_str
-from ...dep cimport DependencySet, MutableDependencySet
+from ...dep cimport DependencySet, MutableDependencySet, RequiredUseSolver
 from ...types cimport OrderedFrozenSet
 from .. cimport Pkg
 from . cimport Keyword, Maintainer, Upstream
@@ -18,6 +18,13 @@ cdef class EbuildPkg(Pkg):
     def __cinit__(self):
         self._upstream = SENTINEL
 
+    cdef DependencySet dependency_set(self, C.DependencySet *ptr):
+        """Create a DependencySet from a pointer, interning it if enabled."""
+        deps = DependencySet.from_ptr(ptr)
+        if self.intern_deps:
+            return deps.intern()
+        return deps
+
     @property
     def path(self):
         """Get a package's path."""
@@ -81,7 +88,7 @@ cdef class EbuildPkg(Pkg):
         """Get a package's BDEPEND."""
         if self._bdepend is None:
             ptr = C.pkgcraft_pkg_ebuild_bdepend(self.ptr)
-            self._bdepend = DependencySet.from_ptr(ptr)
+            self._bdepend = self.dependency_set(ptr)
         return self._bdepend
 
     @property
@@ -89,7 +96,7 @@ cdef class EbuildPkg(Pkg):
         """Get a package's DEPEND."""
         if self._depend is None:
             ptr = C.pkgcraft_pkg_ebuild_depend(self.ptr)
-            self._depend = DependencySet.from_ptr(ptr)
+            self._depend = self.dependency_set(ptr)
         return self._depend
 
     @property
@@ -97,7 +104,7 @@ cdef class EbuildPkg(Pkg):
         """Get a package's IDEPEND."""
         if self._idepend is None:
             ptr = C.pkgcraft_pkg_ebuild_idepend(self.ptr)
-            self._idepend = DependencySet.from_ptr(ptr)
+            self._idepend = self.dependency_set(ptr)
         return self._idepend
 
     @property
@@ -105,7 +112,7 @@ cdef class EbuildPkg(Pkg):
         """Get a package's PDEPEND."""
         if self._pdepend is None:
             ptr = C.pkgcraft_pkg_ebuild_pdepend(self.ptr)
-            self._pdepend = DependencySet.from_ptr(ptr)
+            self._pdepend = self.dependency_set(ptr)
         return self._pdepend
 
     @property
@@ -113,7 +120,7 @@ cdef class EbuildPkg(Pkg):
         """Get a package's RDEPEND."""
         if self._rdepend is None:
             ptr = C.pkgcraft_pkg_ebuild_rdepend(self.ptr)
-            self._rdepend = DependencySet.from_ptr(ptr)
+            self._rdepend = self.dependency_set(ptr)
         return self._rdepend
 
     @property
@@ -121,7 +128,7 @@ cdef class EbuildPkg(Pkg):
         """Get a package's LICENSE."""
         if self._license is None:
             ptr = C.pkgcraft_pkg_ebuild_license(self.ptr)
-            self._license = DependencySet.from_ptr(ptr)
+            self._license = self.dependency_set(ptr)
         return self._license
 
     @property
@@ -129,7 +136,7 @@ cdef class EbuildPkg(Pkg):
         """Get a package's PROPERTIES."""
         if self._properties is None:
             ptr = C.pkgcraft_pkg_ebuild_properties(self.ptr)
-            self._properties = DependencySet.from_ptr(ptr)
+            self._properties = self.dependency_set(ptr)
         return self._properties
 
     @property
@@ -137,15 +144,22 @@ cdef class EbuildPkg(Pkg):
         """Get a package's REQUIRED_USE."""
         if self._required_use is None:
             ptr = C.pkgcraft_pkg_ebuild_required_use(self.ptr)
-            self._required_use = DependencySet.from_ptr(ptr)
+            self._required_use = self.dependency_set(ptr)
         return self._required_use
 
+    @property
+    def required_use_solver(self):
+        """Get a solver for a package's REQUIRED_USE using its IUSE defaults."""
+        if self._required_use_solver is None:
+            self._required_use_solver = RequiredUseSolver(self.required_use, self.iuse)
+        return self._required_use_solver
+
     @property
     def restrict(self):
         """Get a package's RESTRICT."""
         if self._restrict is None:
             ptr = C.pkgcraft_pkg_ebuild_restrict(self.ptr)
-            self._restrict = DependencySet.from_ptr(ptr)
+            self._restrict = self.dependency_set(ptr)
         return self._restrict
 
     @property
@@ -153,7 +167,7 @@ cdef class EbuildPkg(Pkg):
         """Get a package's SRC_URI."""
         if self._src_uri is None:
             ptr = C.pkgcraft_pkg_ebuild_src_uri(self.ptr)
-            self._src_uri = DependencySet.from_ptr(ptr)
+            self._src_uri = self.dependency_set(ptr)
         return self._src_uri
 
     @property
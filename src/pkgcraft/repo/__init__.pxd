@@ -1,4 +1,7 @@
 from .base cimport *
+from .cache cimport *
 from .ebuild cimport *
 from .fake cimport *
+from .index cimport *
 from .set cimport *
+from .table cimport *
@@ -1,4 +1,7 @@
 from .base import *
+from .cache import *
 from .ebuild import *
 from .fake import *
+from .index import *
 from .set import *
+from .table import *
@@ -13,3 +13,6 @@ cdef class Repo:
 
     @staticmethod
     cdef Repo from_ptr(C.Repo *, bint ref=*)
+
+
+cdef object iter_leaf_pkgs(object, object)
@@ -1,17 +1,20 @@
 import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 from pathlib import Path
 
 cimport cython
 
-from .. cimport C, parse
+from .. cimport C, _nogil, parse
 from .._misc cimport cstring_iter, cstring_to_str
-from ..dep cimport Cpv, Version
+from ..dep cimport Cpn, Cpv, Dep, Version
 from ..error cimport Indirect
-from ..pkg cimport Pkg
-from ..restrict cimport Restrict
+from ..pkg cimport EbuildPkg, Pkg
+from ..restrict cimport COST_CPN, COST_CPV, Restrict, required
 from ..types cimport OrderedFrozenSet
-from . cimport ConfiguredRepo, EbuildRepo, FakeRepo
+from . cimport ConfiguredRepo, EbuildRepo, FakeRepo, repo_intern_deps
 
+from ..dep import Operator
 from ..error import InvalidRepo
 
 
@@ -118,12 +121,37 @@ cdef class Repo:
     def iter_cpv(self):
         return _IterCpv.create(self)
 
-    def iter(self, restrict=None):
-        """Iterate over a repo's packages, optionally applying a restriction."""
+    def iter(self, restrict=None, *, int jobs=1, bint ordered=True):
+        """Iterate over a repo's packages, optionally applying a restriction.
+
+        Args:
+            restrict: restriction to filter packages, compiled restrictions
+                are pushed down to repo listings so only packages matching
+                their Cpn and Cpv-level parts are loaded, see :py:meth:`Restrict.compile`
+            jobs (int): number of worker threads used to load and match packages,
+                values less than one use all available CPUs
+            ordered (bool): yield packages in repo order, otherwise in completion order
+
+        Packages are loaded and matched with the GIL released so worker
+        threads run in parallel, work is split by package name with the
+        versions of each package loaded by a single worker.
+        """
+        cdef Restrict r = None
+
+        if jobs != 1:
+            if restrict is not None:
+                r = restrict if isinstance(restrict, Restrict) else Restrict(restrict)
+            if jobs < 1:
+                jobs = os.cpu_count() or 1
+            return _iter_parallel(self, r, jobs, ordered)
+
         if restrict is None:
             return _Iter.create(self)
-        else:
-            return _IterRestrict.create(self, restrict)
+
+        r = restrict if isinstance(restrict, Restrict) else Restrict(restrict)
+        if r._compiled:
+            return _IterPushdown.create(self, r)
+        return _IterRestrict.create(self, r)
 
     def __lt__(self, other):
         if isinstance(other, Repo):
@@ -201,50 +229,324 @@ cdef class _IterCpv(Indirect):
         C.pkgcraft_repo_iter_cpv_free(self.ptr)
 
 
+cdef Pkg repo_pkg(C.Pkg *ptr, bint intern_deps):
+    """Create a Pkg from a repo iterator pointer, flagging dependency set interning."""
+    pkg = Pkg.from_ptr(ptr)
+    if intern_deps:
+        (<EbuildPkg>pkg).intern_deps = True
+    return pkg
+
+
 @cython.internal
 cdef class _Iter(Indirect):
     """Iterator over a repo."""
 
     cdef C.RepoIter *ptr
+    cdef bint intern_deps
 
     @staticmethod
     cdef _Iter create(Repo r):
         inst = <_Iter>_Iter.__new__(_Iter)
         inst.ptr = C.pkgcraft_repo_iter(r.ptr)
+        inst.intern_deps = repo_intern_deps(r)
         return inst
 
     def __iter__(self):
         return self
 
     def __next__(self):
-        if ptr := C.pkgcraft_repo_iter_next(self.ptr):
-            return Pkg.from_ptr(ptr)
+        cdef C.Pkg *ptr
+        with nogil:
+            ptr = _nogil.pkgcraft_repo_iter_next(self.ptr)
+        if ptr is not NULL:
+            return repo_pkg(ptr, self.intern_deps)
         raise StopIteration
 
     def __dealloc__(self):
         C.pkgcraft_repo_iter_free(self.ptr)
 
 
+def _load_cpn(Repo repo, Cpn cpn, Restrict restrict, bint intern_deps):
+    """Load all packages for a Cpn, optionally applying a restriction."""
+    return load_pkgs(repo, C.pkgcraft_cpn_restrict(cpn.ptr), restrict, intern_deps)
+
+
+def _iter_cpns(Repo repo, Restrict restrict):
+    """Iterate over a repo's Cpn objects, optionally skipping those rejected by a restriction."""
+    for cat in repo.categories:
+        for pkg in repo.packages(cat):
+            cpn = Cpn(f'{cat}/{pkg}')
+            if restrict is None or cpn.matches(restrict):
+                yield cpn
+
+
+def _iter_parallel(Repo repo, Restrict restrict, int jobs, bint ordered):
+    """Iterate over a repo's packages using a pool of worker threads.
+
+    Work is partitioned by package with each worker loading and matching the
+    versions for a single Cpn at a time. Submissions are limited to a window
+    of twice the number of jobs so unconsumed results don't accumulate.
+    """
+    cdef Restrict cpn_restrict = None
+    cdef int window = 2 * jobs
+    cdef bint intern_deps = repo_intern_deps(repo)
+
+    # skip packages rejected by the Cpn-level parts of compiled restrictions
+    if restrict is not None and restrict._compiled:
+        cpn_restrict = required(restrict, COST_CPN)
+
+    executor = ThreadPoolExecutor(max_workers=jobs)
+    try:
+        if ordered:
+            pending = deque()
+            for cpn in _iter_cpns(repo, cpn_restrict):
+                pending.append(executor.submit(_load_cpn, repo, cpn, restrict, intern_deps))
+                if len(pending) >= window:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        else:
+            pending = set()
+            for cpn in _iter_cpns(repo, cpn_restrict):
+                pending.add(executor.submit(_load_cpn, repo, cpn, restrict, intern_deps))
+                if len(pending) >= window:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield from future.result()
+            for future in as_completed(pending):
+                yield from future.result()
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
 @cython.internal
 cdef class _IterRestrict(Indirect):
     """Iterator that applies a restriction over a repo iterator."""
 
     cdef C.RepoIterRestrict *ptr
+    cdef bint intern_deps
 
     @staticmethod
     cdef _IterRestrict create(Repo repo, object obj):
         cdef Restrict r = obj if isinstance(obj, Restrict) else Restrict(obj)
         inst = <_IterRestrict>_IterRestrict.__new__(_IterRestrict)
         inst.ptr = C.pkgcraft_repo_iter_restrict(repo.ptr, r.ptr)
+        inst.intern_deps = repo_intern_deps(repo)
         return inst
 
     def __iter__(self):
         return self
 
     def __next__(self):
-        if ptr := C.pkgcraft_repo_iter_restrict_next(self.ptr):
-            return Pkg.from_ptr(ptr)
+        cdef C.Pkg *ptr
+        with nogil:
+            ptr = _nogil.pkgcraft_repo_iter_restrict_next(self.ptr)
+        if ptr is not NULL:
+            return repo_pkg(ptr, self.intern_deps)
         raise StopIteration
 
     def __dealloc__(self):
         C.pkgcraft_repo_iter_restrict_free(self.ptr)
+
+
+cdef C.Pkg *next_match(C.RepoIterRestrict *it, C.Restrict *r) noexcept nogil:
+    """Get the next package matching a restriction from an iterator, freeing non-matches."""
+    cdef C.Pkg *ptr
+    while True:
+        ptr = _nogil.pkgcraft_repo_iter_restrict_next(it)
+        if ptr is NULL or r is NULL or _nogil.pkgcraft_pkg_restrict_matches(ptr, r):
+            return ptr
+        _nogil.pkgcraft_pkg_free(ptr)
+
+
+cdef list load_pkgs(Repo repo, C.Restrict *target, Restrict restrict, bint intern_deps):
+    """Load the packages matching a target restriction, freeing it.
+
+    Loaded packages are optionally matched directly against a restriction
+    with only matching packages being wrapped. The GIL is released while
+    packages are loaded and matched.
+    """
+    cdef C.Pkg *ptr
+    cdef C.Restrict *restrict_ptr = NULL
+    cdef C.RepoIterRestrict *it
+    cdef list pkgs = []
+
+    if restrict is not None:
+        restrict_ptr = restrict.ptr
+
+    with nogil:
+        it = _nogil.pkgcraft_repo_iter_restrict(repo.ptr, target)
+    try:
+        while True:
+            with nogil:
+                ptr = next_match(it, restrict_ptr)
+            if ptr is NULL:
+                break
+            pkgs.append(repo_pkg(ptr, intern_deps))
+    finally:
+        C.pkgcraft_repo_iter_restrict_free(it)
+        C.pkgcraft_restrict_free(target)
+
+    return pkgs
+
+
+@cython.final
+@cython.internal
+cdef class _IterPushdown:
+    """Iterator that pushes a compiled restriction down to repo listings.
+
+    Packages rejected by the Cpn-level parts of the restriction are skipped
+    using package listings while versions rejected by the Cpv-level parts
+    are skipped using version listings, only loading the remaining packages
+    to apply the full restriction.
+    """
+
+    cdef Repo repo
+    cdef Restrict restrict
+    cdef bint intern_deps
+    cdef object it
+    cdef int loaded
+    cdef object _pruned
+
+    @staticmethod
+    cdef _IterPushdown create(Repo repo, Restrict restrict):
+        inst = <_IterPushdown>_IterPushdown.__new__(_IterPushdown)
+        inst.repo = repo
+        inst.restrict = restrict
+        inst.intern_deps = repo_intern_deps(repo)
+        inst.it = inst.iter_pkgs(required(restrict, COST_CPN), required(restrict, COST_CPV))
+        return inst
+
+    def iter_pkgs(self, Restrict cpn_restrict, Restrict cpv_restrict):
+        cdef Cpn cpn
+        cdef Cpv cpv
+
+        for cat in self.repo.categories:
+            for pkg in self.repo.packages(cat):
+                cpn = Cpn(f'{cat}/{pkg}')
+                if cpn_restrict is not None and not cpn.matches(cpn_restrict):
+                    continue
+
+                versions = self.repo.versions(cat, pkg)
+                if cpv_restrict is None:
+                    cpvs = None
+                else:
+                    cpvs = [
+                        cpv for cpv in (Cpv(f'{cat}/{pkg}-{ver}') for ver in versions)
+                        if cpv.matches(cpv_restrict)
+                    ]
+
+                # load all versions of a package using a single iterator when possible
+                if cpvs is None or len(cpvs) == len(versions):
+                    self.loaded += len(versions)
+                    target = C.pkgcraft_cpn_restrict(cpn.ptr)
+                    yield from load_pkgs(self.repo, target, self.restrict, self.intern_deps)
+                else:
+                    self.loaded += len(cpvs)
+                    for cpv in cpvs:
+                        target = C.pkgcraft_cpv_restrict(cpv.ptr)
+                        yield from load_pkgs(self.repo, target, self.restrict, self.intern_deps)
+
+    @property
+    def pruned(self):
+        """Get the number of packages skipped without being loaded.
+
+        The value is only available once iteration has finished, otherwise None.
+        """
+        return self._pruned
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self.it)
+        except StopIteration:
+            if self._pruned is None:
+                self._pruned = len(self.repo) - self.loaded
+            raise
+
+
+@cython.final
+@cython.internal
+cdef class _VersionRanges:
+    """Version ranges covered by the dependencies on a package name.
+
+    Open-ended ranges are collapsed into their widest bound while other
+    versioned dependencies are deduplicated by version.
+    """
+
+    cdef bint any_version
+    cdef Dep lower
+    cdef Dep upper
+    cdef dict versioned
+
+    def __cinit__(self):
+        self.versioned = {}
+
+    cdef void add(self, Dep dep):
+        if self.any_version:
+            return
+
+        version = dep.version
+        if version is None:
+            self.any_version = True
+            return
+
+        op = version.op
+        if op == Operator.GreaterOrEqual or op == Operator.Greater:
+            if self.lower is None:
+                self.lower = dep
+            else:
+                bound = self.lower.version
+                if version < bound or (version == bound and op == Operator.GreaterOrEqual):
+                    self.lower = dep
+        elif op == Operator.LessOrEqual or op == Operator.Less:
+            if self.upper is None:
+                self.upper = dep
+            else:
+                bound = self.upper.version
+                if version > bound or (version == bound and op == Operator.LessOrEqual):
+                    self.upper = dep
+        else:
+            self.versioned.setdefault(str(version), dep)
+
+    cdef bint matches(self, Cpv cpv):
+        if self.any_version:
+            return True
+        if self.lower is not None and self.lower.intersects(cpv):
+            return True
+        if self.upper is not None and self.upper.intersects(cpv):
+            return True
+        return any(dep.intersects(cpv) for dep in self.versioned.values())
+
+
+cdef object iter_leaf_pkgs(object pkgs, object cpvs):
+    """Create an iterator over the Cpv objects lacking reverse dependencies."""
+    return _iter_leaf_pkgs(pkgs, cpvs)
+
+
+def _iter_leaf_pkgs(object pkgs, object cpvs):
+    """Iterate over the Cpv objects lacking reverse dependencies.
+
+    All package dependencies are collapsed into version ranges keyed by
+    package name before the Cpv objects are checked against them.
+    """
+    cdef _VersionRanges ranges
+    cdef Dep dep
+    cdef Cpv cpv
+
+    deps = {}
+    for pkg in pkgs:
+        if isinstance(pkg, EbuildPkg):
+            for dep in pkg.dependencies().flatten():
+                if dep.blocker is None:
+                    cpn = str(dep.cpn)
+                    if (ranges := deps.get(cpn)) is None:
+                        ranges = deps[cpn] = _VersionRanges()
+                    ranges.add(dep)
+
+    for cpv in cpvs:
+        ranges = deps.get(str(cpv.cpn))
+        if ranges is None or not ranges.matches(cpv):
+            yield cpv
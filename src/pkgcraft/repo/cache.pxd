@@ -0,0 +1,12 @@
+cdef class QueryCache:
+    cdef readonly object repo
+    cdef readonly int maxsize
+    cdef readonly double check_interval
+    cdef readonly int hits
+    cdef readonly int misses
+    cdef readonly int invalidations
+    cdef object _entries
+    cdef object _state
+    cdef double _checked
+
+    cdef void validate(self) except *
@@ -0,0 +1,160 @@
+import hashlib
+import os
+import time
+from collections import OrderedDict
+
+cimport cython
+
+from ..restrict cimport Restrict
+from . cimport EbuildRepo, Repo, RepoSet
+from .index cimport eclass_mtimes
+
+
+# repo files used to detect synced trees
+cdef tuple TIMESTAMP_FILES = ('timestamp.chk', 'timestamp.commit', 'timestamp.x')
+
+
+cdef void add_file_state(object digest, object entry) except *:
+    """Add the path, modification time, and size of a directory entry to a digest."""
+    st = entry.stat()
+    digest.update(f'{entry.path}\0{st.st_mtime_ns}\0{st.st_size}\n'.encode())
+
+
+cdef tuple ebuild_repo_state(EbuildRepo repo):
+    """Get the package file digest and eclass modification times for an ebuild repo.
+
+    The digest covers the path, modification time, and size of each ebuild,
+    metadata.xml, and sync timestamp file so any change to them is detected,
+    including those restoring older modification times.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+
+    try:
+        with os.scandir(repo.path / 'metadata') as entries:
+            for entry in sorted(entries, key=lambda x: x.name):
+                if entry.name in TIMESTAMP_FILES:
+                    add_file_state(digest, entry)
+    except FileNotFoundError:
+        pass
+
+    for cat in repo.categories:
+        try:
+            with os.scandir(repo.path / cat) as pkgs:
+                for pkg in sorted(pkgs, key=lambda x: x.name):
+                    if not pkg.is_dir():
+                        continue
+                    with os.scandir(pkg.path) as entries:
+                        for entry in sorted(entries, key=lambda x: x.name):
+                            if entry.name.endswith('.ebuild') or entry.name == 'metadata.xml':
+                                add_file_state(digest, entry)
+        except FileNotFoundError:
+            pass
+
+    return (digest.digest(), tuple(sorted(eclass_mtimes(repo).items())))
+
+
+cdef object repo_state(object repo):
+    """Get a value that changes when the packages of a repo or repo set are modified."""
+    if isinstance(repo, RepoSet):
+        return tuple((r.id, repo_state(r)) for r in repo.repos)
+    elif isinstance(repo, EbuildRepo):
+        return ebuild_repo_state(repo)
+    return len(repo)
+
+
+@cython.final
+cdef class QueryCache:
+    """LRU cache of restriction query results for a repo or repo set.
+
+    The Cpv objects of the packages matching a restriction are cached using
+    the restriction as the key. All entries are invalidated when the repo is
+    modified, e.g. via :py:meth:`FakeRepo.extend` for fake repos or when
+    ebuild, metadata.xml, or eclass files are added, removed, or modified for
+    ebuild repos. Repos are checked for modifications at most once per check
+    interval.
+    """
+
+    def __init__(self, repo not None, int maxsize=128, double check_interval=1):
+        """Create a query cache for a repo or repo set.
+
+        Args:
+            repo (Repo | RepoSet): repo or repo set to query
+            maxsize: maximum number of cached queries, with the least recently
+                used entries being evicted first
+            check_interval: minimum number of seconds between checks for repo
+                modifications, checking ebuild repos requires stat calls for all
+                package files so modifications made within the interval may be
+                missed, use zero to check the repo on every query
+
+        Raises:
+            TypeError: on unsupported repo types
+            ValueError: on invalid cache sizes
+        """
+        if not isinstance(repo, (Repo, RepoSet)):
+            raise TypeError(f"{repo.__class__.__name__!r} unsupported repo type")
+        elif maxsize < 1:
+            raise ValueError(f'invalid cache size: {maxsize}')
+
+        self.repo = repo
+        self.maxsize = maxsize
+        self.check_interval = check_interval
+        self._entries = OrderedDict()
+        self._checked = -check_interval
+
+    cdef void validate(self) except *:
+        """Invalidate all entries if the repo has been modified since the last check."""
+        now = time.monotonic()
+        if self._state is not None and now - self._checked < self.check_interval:
+            return
+
+        self._checked = now
+        state = repo_state(self.repo)
+        if state != self._state:
+            if self._entries:
+                self.invalidations += 1
+                self._entries.clear()
+            self._state = state
+
+    def query(self, restrict not None):
+        """Get the Cpv objects of the packages matching a restriction.
+
+        Args:
+            restrict: restriction to filter packages
+
+        Returns:
+            tuple[Cpv]: the matching Cpv objects in iteration order
+        """
+        cdef Restrict r = restrict if isinstance(restrict, Restrict) else Restrict(restrict)
+
+        self.validate()
+        if (cpvs := self._entries.get(r)) is not None:
+            self.hits += 1
+            self._entries.move_to_end(r)
+            return cpvs
+
+        self.misses += 1
+        cpvs = tuple(pkg.cpv for pkg in self.repo.iter(r))
+        self._entries[r] = cpvs
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return cpvs
+
+    def clear(self):
+        """Remove all entries and reset statistics."""
+        self._entries.clear()
+        self.hits = self.misses = self.invalidations = 0
+
+    def __contains__(self, restrict):
+        if not isinstance(restrict, Restrict):
+            restrict = Restrict(restrict)
+        return restrict in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        name = self.__class__.__name__
+        return (
+            f"<{name} for '{self.repo}' with {len(self)}/{self.maxsize} entries, "
+            f"{self.hits} hits, {self.misses} misses>"
+        )
@@ -5,7 +5,14 @@ from ..types cimport OrderedFrozenSet
 from . cimport Repo
 
 
+cdef bint repo_intern_deps(Repo)
+cdef dict eclass_entries(EbuildRepo)
+
+
 cdef class EbuildRepo(Repo):
+    # flag denoting dependency set interning for loaded packages
+    cdef bint _intern_deps
+
     # cached fields
     cdef Eapi _eapi
     cdef tuple _masters
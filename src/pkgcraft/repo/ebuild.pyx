@@ -1,20 +1,239 @@
+import hashlib
+import os
+from itertools import islice
+from pathlib import Path
+
 cimport cython
 
 from .. cimport C
 from .._misc cimport cstring_iter
 from ..config cimport Config
+from ..dep cimport Cpv, DependencySet, flatten_objects, uri_entries
+from ..eapi cimport Eapi
 from ..error cimport Indirect
 from ..types cimport OrderedFrozenSet
-from . cimport Repo
+from . cimport PackageTable, Repo, RepoIndex, iter_leaf_pkgs
 
+from ..eapi import EAPI_LATEST, EAPIS
 from ..error import PkgcraftError
 
 
+cdef bint repo_intern_deps(Repo repo):
+    """Determine if dependency set interning is enabled for a repo."""
+    return isinstance(repo, EbuildRepo) and (<EbuildRepo>repo)._intern_deps
+
+
+cdef str file_md5(object path):
+    """Get the MD5 hex digest for a file."""
+    with open(path, 'rb') as f:
+        return hashlib.md5(f.read()).hexdigest()
+
+
+cdef dict eclass_entries(EbuildRepo repo):
+    """Get the directory entries for all eclasses available to a repo."""
+    eclasses = {}
+    # eclasses in the repo override those from its masters
+    for r in (*reversed(repo.masters), repo):
+        try:
+            with os.scandir(r.path / 'eclass') as entries:
+                for entry in entries:
+                    if entry.name.endswith('.eclass') and entry.is_file():
+                        eclasses[entry.name[:-7]] = entry
+        except FileNotFoundError:
+            pass
+    return eclasses
+
+
+cdef dict read_cache_entry(object path):
+    """Read the raw metadata from an md5-cache entry, returning None if it doesn't exist."""
+    try:
+        with open(path) as f:
+            return dict(line.rstrip('\n').partition('=')[::2] for line in f)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
+
+cdef bint cache_entry_valid(dict entry, object ebuild, dict eclasses, dict eclass_md5s):
+    """Determine if an md5-cache entry is valid for a given ebuild."""
+    if entry is None or entry.get('_md5_') != file_md5(ebuild):
+        return False
+
+    # verify inherited eclass checksums
+    values = entry.get('_eclasses_', '').split()
+    for (name, md5) in zip(values[::2], values[1::2]):
+        if (eclass_md5 := eclass_md5s.get(name)) is None:
+            if (eclass := eclasses.get(name)) is None:
+                return False
+            eclass_md5 = eclass_md5s[name] = file_md5(eclass)
+        if eclass_md5 != md5:
+            return False
+
+    return True
+
+
+cdef tuple dependency_keys(object keys):
+    """Convert an iterable of dependency keys to uppercase, verifying them."""
+    if keys is None:
+        return None
+    keys = tuple(k.upper() for k in keys)
+    if invalid := [k for k in keys if k not in EAPI_LATEST.dep_keys]:
+        raise ValueError(f"invalid dependency keys: {', '.join(invalid)}")
+    return keys
+
+
+cdef C.DependencySet *dependency_set_ptr(C.Pkg *ptr, str key) except NULL:
+    """Get the DependencySet pointer for a package's dependency key."""
+    if key == 'BDEPEND':
+        return C.pkgcraft_pkg_ebuild_bdepend(ptr)
+    elif key == 'DEPEND':
+        return C.pkgcraft_pkg_ebuild_depend(ptr)
+    elif key == 'IDEPEND':
+        return C.pkgcraft_pkg_ebuild_idepend(ptr)
+    elif key == 'PDEPEND':
+        return C.pkgcraft_pkg_ebuild_pdepend(ptr)
+    elif key == 'RDEPEND':
+        return C.pkgcraft_pkg_ebuild_rdepend(ptr)
+    raise ValueError(f'unknown dependency key: {key}')  # pragma: no cover
+
+
+def _iter_dependencies(EbuildRepo repo, tuple keys, bint flatten):
+    """Iterate over (Cpv, key, dependency) tuples for all packages in a repo.
+
+    Values are pulled directly from package pointers without creating
+    package objects.
+    """
+    cdef C.RepoIter *iter_ptr
+    cdef C.Pkg *ptr
+    cdef C.DependencySet *deps_ptr
+    cdef C.DependencyIntoIterFlatten *it
+    cdef const C.Eapi *eapi_ptr
+    # EAPI dependency keys cached by EAPI pointer
+    cdef dict eapi_keys = {}
+    cdef bint intern_deps = repo_intern_deps(repo)
+
+    iter_ptr = C.pkgcraft_repo_iter(repo.ptr)
+    try:
+        while True:
+            ptr = C.pkgcraft_repo_iter_next(iter_ptr)
+            if ptr is NULL:
+                break
+
+            rows = []
+            try:
+                pkg_keys = keys
+                if pkg_keys is None:
+                    eapi_ptr = C.pkgcraft_pkg_eapi(ptr)
+                    if (pkg_keys := eapi_keys.get(<size_t>eapi_ptr)) is None:
+                        pkg_keys = tuple(Eapi.from_ptr(eapi_ptr).dep_keys)
+                        eapi_keys[<size_t>eapi_ptr] = pkg_keys
+
+                for key in pkg_keys:
+                    deps_ptr = dependency_set_ptr(ptr, key)
+                    if C.pkgcraft_dependency_set_is_empty(deps_ptr):
+                        C.pkgcraft_dependency_set_free(deps_ptr)
+                    elif flatten:
+                        it = C.pkgcraft_dependency_set_into_iter_flatten(deps_ptr)
+                        C.pkgcraft_dependency_set_free(deps_ptr)
+                        for dep in flatten_objects(it, C.DEPENDENCY_SET_KIND_PACKAGE, True, 'deps'):
+                            rows.append((key, dep))
+                    else:
+                        deps = DependencySet.from_ptr(deps_ptr)
+                        rows.append((key, deps.intern() if intern_deps else deps))
+
+                cpv = Cpv.from_ptr(C.pkgcraft_pkg_cpv(ptr)) if rows else None
+            finally:
+                C.pkgcraft_pkg_free(ptr)
+
+            for (key, dep) in rows:
+                yield (cpv, key, dep)
+    finally:
+        C.pkgcraft_repo_iter_free(iter_ptr)
+
+
+def _iter_raw_dependencies(EbuildRepo repo, tuple keys):
+    """Iterate over (Cpv, key, string) tuples using raw metadata cache values.
+
+    Values use the metadata cache format with whitespace collapsed to single
+    spaces. Packages are only loaded for missing or outdated cache entries,
+    serializing their dependencies as a regen would write them, while
+    packages that fail to load are skipped. Without specified keys, the
+    dependency keys for each package's EAPI are used.
+    """
+    cache_path = repo.path / 'metadata' / 'md5-cache'
+    eclasses = eclass_entries(repo)
+    eclass_md5s = {}
+
+    for cpv in repo.iter_cpv():
+        ebuild = repo.path / cpv.category / cpv.package / f'{cpv.pf}.ebuild'
+        entry = read_cache_entry(cache_path / cpv.category / cpv.pf)
+        if (
+            cache_entry_valid(entry, ebuild, eclasses, eclass_md5s)
+            and (eapi := EAPIS.get(entry.get('EAPI', '0'))) is not None
+        ):
+            pkg_keys = keys if keys is not None else eapi.dep_keys
+            values = {k: ' '.join(entry.get(k, '').split()) for k in pkg_keys}
+        elif (pkg := next(repo.iter(cpv), None)) is not None:
+            pkg_keys = keys if keys is not None else pkg.eapi.dep_keys
+            values = {k: str(getattr(pkg, k.lower())) for k in pkg_keys}
+        else:
+            continue
+        for key in pkg_keys:
+            if value := values[key]:
+                yield (cpv, key, value)
+
+
+def _iter_distfiles(EbuildRepo repo, object evaluate_use, bint unique):
+    """Iterate over (Cpv, filename, uris) tuples for all packages in a repo."""
+    cdef set seen = set()
+
+    for pkg in repo:
+        if not (deps := pkg.src_uri):
+            continue
+        elif evaluate_use is not True:
+            deps = deps.evaluate(evaluate_use)
+
+        # group URIs by target filename
+        files = {}
+        for (filename, uri) in uri_entries(deps):
+            uris = files.setdefault(filename, [])
+            if uri not in uris:
+                uris.append(uri)
+
+        for (filename, uris) in files.items():
+            if unique:
+                if filename in seen:
+                    continue
+                seen.add(filename)
+            yield (pkg.cpv, filename, tuple(uris))
+
+
+def _iter_batches(object rows, int size):
+    """Iterate over columnar batches of rows."""
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield tuple(list(x) for x in zip(*batch))
+
+
 cdef class EbuildRepo(Repo):
     """Ebuild package repo."""
 
     _format = C.RepoFormat.REPO_FORMAT_EBUILD
 
+    @property
+    def intern_dependencies(self):
+        """Get or set if the dependency sets of loaded packages are interned.
+
+        When enabled, the dependency related attributes of packages loaded via
+        the repo's iterators are interned using :py:meth:`DependencySet.intern`
+        so identical sets are shared between packages. The setting only applies
+        to the repo object and repo sets created from it.
+        """
+        return self._intern_deps
+
+    @intern_dependencies.setter
+    def intern_dependencies(self, bint value):
+        self._intern_deps = value
+
     @property
     def eapi(self):
         """Get an ebuild repo's EAPI."""
@@ -52,8 +271,174 @@ cdef class EbuildRepo(Repo):
         ptr = C.pkgcraft_repo_ebuild_configure(self.ptr, config.ptr)
         return Repo.from_ptr(ptr)
 
+    def to_table(self, fields=None):
+        """Create a columnar snapshot of package metadata.
+
+        Package metadata is pulled directly from the repo's package iterator
+        without creating package objects, storing each field as a column of
+        interned values that supports filtering, grouping, and sorting by row
+        index.
+
+        Args:
+            fields (Iterable[str] | None): field names to include, by default all
+                supported fields are included
+
+        Returns:
+            PackageTable: the table of package metadata in repo order
+
+        Raises:
+            ValueError: on invalid fields
+        """
+        return PackageTable.from_repo(self, fields)
+
+    def index(self, path=None, force=False):
+        """Load the repo's reverse query index, updating it as required.
+
+        The index is stored in the user cache directory by default, e.g.
+        ~/.cache/pkgcraft/index, and only packages with modified ebuilds,
+        metadata.xml files, or inherited eclasses are reloaded when updating
+        it. Packages that fail to load are omitted from the index.
+
+        Args:
+            path (str | os.PathLike | None): custom index file path
+            force (bool): rebuild the index from scratch
+
+        Returns:
+            RepoIndex: index mapping dependencies, eclasses, and maintainers to packages
+        """
+        return RepoIndex.from_repo(self, path, force)
+
+    def leaf_packages(self):
+        """Iterate over the packages lacking reverse dependencies in the repo.
+
+        Blockers are ignored and conditional dependencies are included
+        regardless of USE flag settings. Results are yielded in repo order once
+        all package dependencies have been collapsed into per-package version
+        ranges.
+
+        Returns:
+            Iterator[Cpv]: leaf packages
+        """
+        return iter_leaf_pkgs(self, self.iter_cpv())
+
+    def iter_dependencies(self, keys=None, bint flatten=True, batch=None, bint raw=False):
+        """Iterate over the dependencies of all packages in the repo.
+
+        Dependencies are read directly from the loaded packages without
+        creating package objects and are yielded with the Cpv and dependency
+        key they relate to in repo order.
+
+        Raw dependency strings are pulled directly from valid metadata cache
+        entries, skipping package loading and dependency parsing entirely.
+        Packages are only loaded for missing or outdated cache entries with
+        their dependencies serialized in the same format, and packages that
+        fail to load are skipped.
+
+        Args:
+            keys (Iterable[str] | None): dependency keys, e.g. RDEPEND, by
+                default all keys supported by each package's EAPI
+            flatten: yield unique, flattened dependencies instead of non-empty
+                DependencySet objects
+            batch (int | None): yield columnar batches of up to the given number
+                of rows as (cpvs, keys, dependencies) list tuples
+            raw: yield non-empty, raw dependency strings, ignoring the flatten argument
+
+        Returns:
+            Iterator[tuple]: dependency rows or columnar batches
+
+        Raises:
+            ValueError: on invalid dependency keys or batch sizes
+        """
+        keys = dependency_keys(keys)
+        if raw:
+            rows = _iter_raw_dependencies(self, keys)
+        else:
+            rows = _iter_dependencies(self, keys, flatten)
+        if batch is not None:
+            if batch < 1:
+                raise ValueError(f'invalid batch size: {batch}')
+            return _iter_batches(rows, batch)
+        return rows
+
+    def iter_distfiles(self, evaluate_use=True, bint unique=True):
+        """Iterate over the distfiles of all packages in the repo.
+
+        Distfiles are yielded in repo order with the Cpv of the related
+        package and the URIs they're fetched from, including all URIs using
+        the same filename within a package.
+
+        Args:
+            evaluate_use (bool | Iterable[str]): USE flag conditionals to
+                include, True for all, False for none, or the enabled flags
+            unique: skip filenames yielded for previous packages
+
+        Returns:
+            Iterator[tuple[Cpv, str, tuple[str]]]: distfile rows
+        """
+        return _iter_distfiles(self, evaluate_use, unique)
+
+    def dependency_fingerprints(self, keys=None):
+        """Get the canonical dependency hashes of all packages in the repo.
+
+        Hashes are stable across processes and independent of dependency
+        ordering, see :py:meth:`DependencySet.canonical_hash`, allowing
+        dependency changes between repo snapshots to be found by comparing
+        hashes instead of strings. Empty dependency sets are skipped while
+        packages lacking dependencies are still included.
+
+        Args:
+            keys (Iterable[str] | None): dependency keys, e.g. RDEPEND, by
+                default all keys supported by each package's EAPI
+
+        Returns:
+            dict[Cpv, dict[str, int]]: dependency hashes per key for each package
+
+        Raises:
+            ValueError: on invalid dependency keys
+        """
+        keys = dependency_keys(keys)
+        fingerprints = {}
+        for pkg in self:
+            hashes = fingerprints[pkg.cpv] = {}
+            for key in (keys if keys is not None else pkg.eapi.dep_keys):
+                if deps := getattr(pkg, key.lower()):
+                    hashes[key] = deps.canonical_hash()
+        return fingerprints
+
+    def metadata_outdated(self, path=None):
+        """Get the packages with missing or outdated metadata cache entries.
+
+        Cache entries are outdated when the checksums for their ebuild or any
+        inherited eclass differ from the current files.
+
+        Args:
+            path (str | os.PathLike | None): custom metadata cache path
+
+        Returns:
+            OrderedFrozenSet[Cpv]: outdated packages in repo order
+        """
+        cache_path = Path(path) if path is not None else self.path / 'metadata' / 'md5-cache'
+        eclasses = eclass_entries(self)
+        eclass_md5s = {}
+        outdated = []
+        for cpv in self.iter_cpv():
+            ebuild = self.path / cpv.category / cpv.package / f'{cpv.pf}.ebuild'
+            entry = read_cache_entry(cache_path / cpv.category / cpv.pf)
+            if not cache_entry_valid(entry, ebuild, eclasses, eclass_md5s):
+                outdated.append(cpv)
+        return OrderedFrozenSet(outdated)
+
     def metadata_regen(self, int jobs=0, force=False, path=None):
-        """Regenerate an ebuild repo's package metadata cache."""
+        """Regenerate an ebuild repo's package metadata cache.
+
+        Args:
+            jobs (int): number of jobs to use, defaults to all available CPUs
+            force (bool): regenerate all cache entries, not only outdated ones
+            path (str | os.PathLike | None): custom metadata cache path
+
+        Raises:
+            PkgcraftError: on regen failure
+        """
         cache_path = str(path) if path is not None else ""
         if not C.pkgcraft_repo_ebuild_metadata_regen(self.ptr, jobs, force, cache_path.encode()):
             raise PkgcraftError
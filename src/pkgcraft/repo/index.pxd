@@ -0,0 +1,18 @@
+from ..error cimport Indirect
+from . cimport EbuildRepo
+
+
+cdef dict eclass_mtimes(EbuildRepo)
+
+
+cdef class RepoIndex(Indirect):
+    cdef readonly object path
+    cdef readonly int updated
+    cdef dict _entries
+    cdef dict _eclasses
+    cdef dict _dependents
+    cdef dict _inheriting
+    cdef dict _maintained
+
+    @staticmethod
+    cdef RepoIndex from_repo(EbuildRepo, object, bint)
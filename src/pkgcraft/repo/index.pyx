@@ -0,0 +1,190 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+cimport cython
+
+from ..dep cimport Cpv
+from ..error cimport Indirect
+from ..types cimport OrderedFrozenSet
+from . cimport EbuildRepo, eclass_entries
+
+from ..logging import logger
+
+
+# on-disk format version, bumped on incompatible changes
+cdef int INDEX_VERSION = 1
+
+
+cdef long long file_mtime(object path):
+    """Get a file's modification time in nanoseconds, returning -1 if nonexistent."""
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return -1
+
+
+cdef object default_path(EbuildRepo repo):
+    """Get the default index file path for a repo in the user cache directory."""
+    cache_dir = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    # repo ids default to their paths so the path digest is used as the file name
+    digest = hashlib.blake2b(str(repo.path).encode(), digest_size=8).hexdigest()
+    return Path(cache_dir) / 'pkgcraft' / 'index' / f'{digest}.json'
+
+
+cdef dict eclass_mtimes(EbuildRepo repo):
+    """Get the modification times for all eclasses available to a repo."""
+    return {k: entry.stat().st_mtime_ns for (k, entry) in eclass_entries(repo).items()}
+
+
+cdef dict pkg_entry(object pkg, list mtimes):
+    """Create an index entry for a package."""
+    deps = pkg.dependencies().flatten()
+    return {
+        'mtimes': mtimes,
+        'dependencies': list(dict.fromkeys(str(d.cpn) for d in deps if d.blocker is None)),
+        'inherited': list(pkg.inherited),
+        'maintainers': [m.email for m in pkg.maintainers],
+    }
+
+
+@cython.final
+cdef class RepoIndex(Indirect):
+    """Persistent reverse index of ebuild repo package metadata.
+
+    Packages are mapped by dependency target, inherited eclass, and maintainer
+    with entries invalidated when their ebuild, metadata.xml, or any inherited
+    eclass is modified.
+    """
+
+    @staticmethod
+    cdef RepoIndex from_repo(EbuildRepo repo, object path, bint force):
+        """Load a repo's index, updating and saving it when outdated."""
+        inst = <RepoIndex>RepoIndex.__new__(RepoIndex)
+        inst.path = default_path(repo) if path is None else Path(path)
+
+        prev_entries = {}
+        prev_eclasses = {}
+        if not force:
+            try:
+                with open(inst.path) as f:
+                    data = json.load(f)
+                if data['version'] == INDEX_VERSION:
+                    prev_entries = data['packages']
+                    prev_eclasses = data['eclasses']
+            except (OSError, ValueError, KeyError, TypeError):
+                pass
+
+        # determine modified eclasses
+        eclasses = eclass_mtimes(repo)
+        changed = {
+            k for k in prev_eclasses.keys() | eclasses.keys()
+            if prev_eclasses.get(k) != eclasses.get(k)
+        }
+
+        # determine outdated entries using the package iteration order
+        entries = {}
+        stale = {}
+        xml_mtimes = {}
+        for cpv in repo.iter_cpv():
+            pkg_dir = repo.path / cpv.category / cpv.package
+            cpn = str(cpv.cpn)
+            if (xml_mtime := xml_mtimes.get(cpn)) is None:
+                xml_mtime = xml_mtimes[cpn] = file_mtime(pkg_dir / 'metadata.xml')
+            mtimes = [file_mtime(pkg_dir / f'{cpv.pf}.ebuild'), xml_mtime]
+
+            key = str(cpv)
+            entry = prev_entries.get(key)
+            if (
+                entry is None
+                or entry['mtimes'] != mtimes
+                or not changed.isdisjoint(entry['inherited'])
+            ):
+                stale[key] = (cpv, mtimes)
+                entry = None
+            entries[key] = entry
+
+        # regenerate outdated entries, loading the full repo when nothing is reusable
+        if stale:
+            if len(stale) == len(entries):
+                pkgs = iter(repo)
+            else:
+                pkgs = (pkg for (cpv, _) in stale.values() for pkg in repo.iter(cpv))
+            for pkg in pkgs:
+                key = str(pkg.cpv)
+                entries[key] = pkg_entry(pkg, stale[key][1])
+                inst.updated += 1
+
+            # drop entries for packages that failed to load
+            entries = {k: v for (k, v) in entries.items() if v is not None}
+
+        inst._entries = entries
+        inst._eclasses = eclasses
+        inst._dependents = {}
+        inst._inheriting = {}
+        inst._maintained = {}
+        for (key, entry) in entries.items():
+            for cpn in entry['dependencies']:
+                inst._dependents.setdefault(cpn, []).append(key)
+            for eclass in entry['inherited']:
+                inst._inheriting.setdefault(eclass, []).append(key)
+            for email in entry['maintainers']:
+                inst._maintained.setdefault(email, []).append(key)
+
+        if stale or changed or prev_entries.keys() != entries.keys():
+            inst.save()
+
+        return inst
+
+    def save(self):
+        """Write the index to disk, logging a warning on failure."""
+        data = {'version': INDEX_VERSION, 'eclasses': self._eclasses, 'packages': self._entries}
+        tmp_path = self.path.with_name(f'.{self.path.name}.{os.getpid()}')
+        try:
+            os.makedirs(self.path.parent, exist_ok=True)
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f'failed writing repo index: {self.path}: {e.strerror}')
+
+    def dependents(self, cpn not None):
+        """Get the packages with dependencies on a given package name.
+
+        Blockers are ignored while conditional dependencies are included
+        regardless of USE flag settings.
+
+        Args:
+            cpn (Cpn | str): unversioned package, e.g. cat/pkg
+
+        Returns:
+            OrderedFrozenSet[Cpv]: dependent packages in repo order
+        """
+        return OrderedFrozenSet(map(Cpv, self._dependents.get(str(cpn), ())))
+
+    def inheriting(self, str eclass not None):
+        """Get the packages inheriting a given eclass, directly or indirectly.
+
+        Returns:
+            OrderedFrozenSet[Cpv]: inheriting packages in repo order
+        """
+        return OrderedFrozenSet(map(Cpv, self._inheriting.get(eclass, ())))
+
+    def maintained_by(self, str email not None):
+        """Get the packages maintained by a given email address.
+
+        Returns:
+            OrderedFrozenSet[Cpv]: maintained packages in repo order
+        """
+        return OrderedFrozenSet(map(Cpv, self._maintained.get(email, ())))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, obj):
+        return str(obj) in self._entries
+
+    def __repr__(self):
+        name = self.__class__.__name__
+        return f"<{name} '{self.path}' with {len(self)} pkgs>"
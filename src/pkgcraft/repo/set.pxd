@@ -5,13 +5,16 @@ from ..types cimport OrderedFrozenSet
 cdef class RepoSet:
     cdef C.RepoSet *ptr
 
+    # repo objects used to create the set, mapped by id
+    cdef dict _members
+
     # cached fields
     cdef OrderedFrozenSet _repos
 
     @staticmethod
     cdef RepoSet from_ptr(C.RepoSet *)
 
-    cdef create(self, C.RepoSet *)
+    cdef create(self, C.RepoSet *, object)
 
 
 cdef class MutableRepoSet(RepoSet):
@@ -1,3 +1,9 @@
+import heapq
+import os
+import threading
+from itertools import chain
+from queue import Empty, Queue
+
 cimport cython
 from cpython.mem cimport PyMem_Free, PyMem_Malloc
 
@@ -5,15 +11,25 @@ from .. cimport C, parse
 from .._misc cimport cstring_iter
 from ..config cimport repos_to_dict
 from ..dep cimport Version
-from ..pkg cimport Pkg
+from ..pkg cimport EbuildPkg, Pkg
 from ..restrict cimport Restrict
 from ..types cimport OrderedFrozenSet
-from . cimport Repo
+from . cimport Repo, iter_leaf_pkgs, repo_intern_deps
+
+
+cdef dict repo_members(object obj):
+    """Get the repo objects for a repo or repo set, mapped by id."""
+    if isinstance(obj, RepoSet):
+        return (<RepoSet>obj)._members
+    return {obj.id: obj}
 
 
 cdef class RepoSet:
     """Immutable, ordered repo set."""
 
+    def __cinit__(self):
+        self._members = {}
+
     def __init__(self, *repos):
         array = <C.Repo **> PyMem_Malloc(len(repos) * sizeof(C.Repo *))
         if not array:  # pragma: no cover
@@ -22,6 +38,7 @@ cdef class RepoSet:
             array[i] = (<Repo?>r).ptr
         self.ptr = C.pkgcraft_repo_set_new(array, len(repos))
         PyMem_Free(array)
+        self._members = {r.id: r for r in repos}
 
     @staticmethod
     cdef RepoSet from_ptr(C.RepoSet *ptr):
@@ -30,11 +47,15 @@ cdef class RepoSet:
         inst.ptr = ptr
         return inst
 
-    cdef create(self, C.RepoSet *ptr):
+    cdef create(self, C.RepoSet *ptr, object other):
         """Create a RepoSet from a pointer using the instance class."""
+        cdef RepoSet inst
         if isinstance(self, MutableRepoSet):
-            return MutableRepoSet.from_ptr(ptr)
-        return RepoSet.from_ptr(ptr)
+            inst = MutableRepoSet.from_ptr(ptr)
+        else:
+            inst = RepoSet.from_ptr(ptr)
+        inst._members = {**self._members, **repo_members(other)}
+        return inst
 
     def __iter__(self):
         return _Iter(self)
@@ -53,9 +74,57 @@ cdef class RepoSet:
             return pkgs[0]
         raise KeyError(key)
 
-    def iter(self, restrict=None):
-        """Iterate over a repo set's packages, optionally applying a restriction."""
-        return _Iter(self, restrict)
+    def iter(self, restrict=None, *, int jobs=1, bint merge=False, int buffer=64):
+        """Iterate over a repo set's packages, optionally applying a restriction.
+
+        By default, each repo's packages are yielded in turn using the repo
+        set order. When merging, the packages from all repos are merged into
+        Cpv order using a k-way heap merge with packages having equal Cpv
+        objects yielded in repo set order.
+
+        When using multiple jobs, repos are loaded by separate producer
+        threads that release the GIL while loading and matching packages.
+        Producers are paused while their buffer of loaded packages is full,
+        bounding memory usage. Without merging, producers load up to the
+        given number of repos ahead of the consumer, otherwise producers are
+        started for that many repos with the remaining repos loaded by the
+        consumer.
+
+        Args:
+            restrict: restriction to filter packages
+            jobs (int): number of repos loaded concurrently by producer
+                threads, values less than one use all available CPUs
+            merge (bool): merge the packages from all repos into Cpv order
+            buffer (int): maximum number of packages buffered per repo
+
+        Raises:
+            ValueError: on invalid buffer sizes
+        """
+        cdef Restrict r = None
+
+        if jobs == 1 and not merge:
+            return _Iter(self, restrict)
+        elif buffer < 1:
+            raise ValueError(f'invalid buffer size: {buffer}')
+
+        if restrict is not None:
+            r = restrict if isinstance(restrict, Restrict) else Restrict(restrict)
+        if jobs < 1:
+            jobs = os.cpu_count() or 1
+        return _iter_producers(self, r, jobs, buffer, merge)
+
+    def leaf_packages(self):
+        """Iterate over the packages lacking reverse dependencies in the repo set.
+
+        Dependencies from all repos in the set are considered. Blockers are
+        ignored and conditional dependencies are included regardless of USE
+        flag settings.
+
+        Returns:
+            Iterator[Cpv]: leaf packages in repo order
+        """
+        cpvs = chain.from_iterable(r.iter_cpv() for r in self.repos)
+        return iter_leaf_pkgs(self, cpvs)
 
     @property
     def repos(self):
@@ -65,7 +134,10 @@ cdef class RepoSet:
             c_repos = <C.Repo **>C.pkgcraft_repo_set_repos(self.ptr, &length)
             d = repos_to_dict(c_repos, length, True)
             C.pkgcraft_array_free(<void **>c_repos, length)
-            self._repos = OrderedFrozenSet(d.values())
+            # prefer the repo objects used to create the set to retain their settings
+            members = self._members
+            self._repos = OrderedFrozenSet(
+                r if (m := members.get(k)) is None or m != r else m for (k, r) in d.items())
         return self._repos
 
     @property
@@ -147,9 +219,11 @@ cdef class RepoSet:
     def __and__(self, other):
         op = C.SetOp.SET_OP_AND
         if isinstance(other, RepoSet):
-            return self.create(C.pkgcraft_repo_set_op_set(op, self.ptr, (<RepoSet>other).ptr))
+            return self.create(
+                C.pkgcraft_repo_set_op_set(op, self.ptr, (<RepoSet>other).ptr), other)
         elif isinstance(other, Repo):
-            return self.create(C.pkgcraft_repo_set_op_repo(op, self.ptr, (<Repo>other).ptr))
+            return self.create(
+                C.pkgcraft_repo_set_op_repo(op, self.ptr, (<Repo>other).ptr), other)
         else:
             return NotImplemented
 
@@ -159,9 +233,11 @@ cdef class RepoSet:
     def __or__(self, other):
         op = C.SetOp.SET_OP_OR
         if isinstance(other, RepoSet):
-            return self.create(C.pkgcraft_repo_set_op_set(op, self.ptr, (<RepoSet>other).ptr))
+            return self.create(
+                C.pkgcraft_repo_set_op_set(op, self.ptr, (<RepoSet>other).ptr), other)
         elif isinstance(other, Repo):
-            return self.create(C.pkgcraft_repo_set_op_repo(op, self.ptr, (<Repo>other).ptr))
+            return self.create(
+                C.pkgcraft_repo_set_op_repo(op, self.ptr, (<Repo>other).ptr), other)
         else:
             return NotImplemented
 
@@ -171,9 +247,11 @@ cdef class RepoSet:
     def __xor__(self, other):
         op = C.SetOp.SET_OP_XOR
         if isinstance(other, RepoSet):
-            return self.create(C.pkgcraft_repo_set_op_set(op, self.ptr, (<RepoSet>other).ptr))
+            return self.create(
+                C.pkgcraft_repo_set_op_set(op, self.ptr, (<RepoSet>other).ptr), other)
         elif isinstance(other, Repo):
-            return self.create(C.pkgcraft_repo_set_op_repo(op, self.ptr, (<Repo>other).ptr))
+            return self.create(
+                C.pkgcraft_repo_set_op_repo(op, self.ptr, (<Repo>other).ptr), other)
         else:
             return NotImplemented
 
@@ -183,9 +261,11 @@ cdef class RepoSet:
     def __sub__(self, other):
         op = C.SetOp.SET_OP_SUB
         if isinstance(other, RepoSet):
-            return self.create(C.pkgcraft_repo_set_op_set(op, self.ptr, (<RepoSet>other).ptr))
+            return self.create(
+                C.pkgcraft_repo_set_op_set(op, self.ptr, (<RepoSet>other).ptr), other)
         elif isinstance(other, Repo):
-            return self.create(C.pkgcraft_repo_set_op_repo(op, self.ptr, (<Repo>other).ptr))
+            return self.create(
+                C.pkgcraft_repo_set_op_repo(op, self.ptr, (<Repo>other).ptr), other)
         else:
             return NotImplemented
 
@@ -217,6 +297,7 @@ cdef class MutableRepoSet(RepoSet):
             return NotImplemented
 
         # force repos refresh
+        self._members.update(repo_members(other))
         self._repos = None
         return self
 
@@ -230,6 +311,7 @@ cdef class MutableRepoSet(RepoSet):
             return NotImplemented
 
         # force repos refresh
+        self._members.update(repo_members(other))
         self._repos = None
         return self
 
@@ -243,6 +325,7 @@ cdef class MutableRepoSet(RepoSet):
             return NotImplemented
 
         # force repos refresh
+        self._members.update(repo_members(other))
         self._repos = None
         return self
 
@@ -256,6 +339,7 @@ cdef class MutableRepoSet(RepoSet):
             return NotImplemented
 
         # force repos refresh
+        self._members.update(repo_members(other))
         self._repos = None
         return self
 
@@ -266,11 +350,107 @@ cdef class MutableRepoSet(RepoSet):
         return super().__eq__(other)
 
 
+# sentinel marking the end of a producer's packages
+cdef object DONE = object()
+
+
+@cython.final
+@cython.internal
+cdef class _Producer:
+    """Thread loading a repo's packages into a bounded queue."""
+
+    cdef Repo repo
+    cdef Restrict restrict
+    cdef object queue
+    cdef object stop
+    cdef object thread
+
+    def __cinit__(self, Repo repo, Restrict restrict, int buffer, object stop):
+        self.repo = repo
+        self.restrict = restrict
+        self.queue = Queue(maxsize=buffer)
+        self.stop = stop
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def run(self):
+        """Load the repo's packages, ending with a sentinel or raised exception.
+
+        Consumer shutdown is checked before each addition so at most one item
+        is added once the consumer has stopped and drained the queue.
+        """
+        try:
+            for pkg in self.repo.iter(self.restrict):
+                if self.stop.is_set():
+                    return
+                self.queue.put(pkg)
+            item = DONE
+        except Exception as e:
+            item = e
+        if not self.stop.is_set():
+            self.queue.put(item)
+
+    cdef void start(self):
+        """Start the thread if it isn't running."""
+        if self.thread.ident is None:
+            self.thread.start()
+
+    cdef void close(self):
+        """Drain the queue to unblock the thread if running, then wait on it."""
+        if self.thread.ident is not None:
+            while True:
+                try:
+                    self.queue.get_nowait()
+                except Empty:
+                    break
+            self.thread.join()
+
+    def __iter__(self):
+        while (item := self.queue.get()) is not DONE:
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+
+def _iter_producers(RepoSet s, Restrict restrict, int jobs, int buffer, bint merge):
+    """Iterate over a repo set's packages using per-repo producer threads.
+
+    Packages are yielded in repo set order or merged into Cpv order while
+    up to the given number of repos are loaded concurrently.
+    """
+    cdef _Producer p
+    repos = list(s.repos)
+    stop = threading.Event()
+    producers = [_Producer(r, restrict, buffer, stop) for r in repos]
+
+    try:
+        if merge:
+            # all repos are consumed together so those lacking running
+            # producers are loaded directly by the consumer
+            if jobs == 1:
+                jobs = 0
+            for p in producers[:jobs]:
+                p.start()
+            streams = producers[:jobs] + [r.iter(restrict) for r in repos[jobs:]]
+            yield from heapq.merge(*streams, key=lambda pkg: pkg.cpv)
+        else:
+            for (i, p) in enumerate(producers):
+                # keep producers running for the current and following repos
+                for x in producers[i:i + jobs]:
+                    (<_Producer>x).start()
+                yield from p
+    finally:
+        stop.set()
+        for p in producers:
+            p.close()
+
+
 @cython.internal
 cdef class _Iter:
     """Iterator over a repo set, optionally applying a restriction."""
 
     cdef C.RepoSetIter *ptr
+    # ids of the repos with dependency set interning enabled
+    cdef frozenset intern_deps
 
     def __cinit__(self, s: RepoSet, obj=None):
         cdef C.Restrict *restrict_ptr = NULL
@@ -281,13 +461,17 @@ cdef class _Iter:
             restrict_ptr = r.ptr
 
         self.ptr = C.pkgcraft_repo_set_iter(s.ptr, restrict_ptr)
+        self.intern_deps = frozenset(r.id for r in s.repos if repo_intern_deps(r))
 
     def __iter__(self):
         return self
 
     def __next__(self):
         if ptr := C.pkgcraft_repo_set_iter_next(self.ptr):
-            return Pkg.from_ptr(ptr)
+            pkg = Pkg.from_ptr(ptr)
+            if self.intern_deps and isinstance(pkg, EbuildPkg) and pkg.repo.id in self.intern_deps:
+                (<EbuildPkg>pkg).intern_deps = True
+            return pkg
         raise StopIteration
 
     def __dealloc__(self):
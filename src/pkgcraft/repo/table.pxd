@@ -0,0 +1,29 @@
+from ..error cimport Indirect
+from . cimport Repo
+
+
+cdef class Column(Indirect):
+    cdef readonly str name
+    cdef readonly object codes
+    cdef readonly list values
+    cdef dict _index
+    # value conversion used for sorting
+    cdef object key
+
+    cdef size_t intern(self, object)
+    cdef void append(self, object)
+
+
+cdef class MultiColumn(Column):
+    cdef readonly object offsets
+
+    cdef void append_many(self, list)
+
+
+cdef class PackageTable(Indirect):
+    cdef readonly tuple fields
+    cdef dict columns
+    cdef size_t length
+
+    @staticmethod
+    cdef PackageTable from_repo(Repo, object)
@@ -0,0 +1,428 @@
+from array import array
+from bisect import bisect_right
+
+cimport cython
+
+from .. cimport C
+from .._misc cimport cstring_to_str
+from ..dep cimport Cpv, Version
+from ..error cimport Indirect
+from . cimport Repo
+
+
+cdef enum Field:
+    FIELD_CPV
+    FIELD_CATEGORY
+    FIELD_PACKAGE
+    FIELD_VERSION
+    FIELD_EAPI
+    FIELD_SLOT
+    FIELD_SUBSLOT
+    FIELD_DESCRIPTION
+    FIELD_BDEPEND
+    FIELD_DEPEND
+    FIELD_IDEPEND
+    FIELD_PDEPEND
+    FIELD_RDEPEND
+    FIELD_LICENSE
+    FIELD_PROPERTIES
+    FIELD_REQUIRED_USE
+    FIELD_RESTRICT
+    FIELD_SRC_URI
+    FIELD_DEFINED_PHASES
+    FIELD_HOMEPAGE
+    FIELD_INHERIT
+    FIELD_INHERITED
+    FIELD_IUSE
+    FIELD_KEYWORDS
+
+
+# mapping of single-valued field names to identifiers
+cdef dict SCALAR_FIELDS = {
+    'cpv': FIELD_CPV,
+    'category': FIELD_CATEGORY,
+    'package': FIELD_PACKAGE,
+    'version': FIELD_VERSION,
+    'eapi': FIELD_EAPI,
+    'slot': FIELD_SLOT,
+    'subslot': FIELD_SUBSLOT,
+    'description': FIELD_DESCRIPTION,
+    'bdepend': FIELD_BDEPEND,
+    'depend': FIELD_DEPEND,
+    'idepend': FIELD_IDEPEND,
+    'pdepend': FIELD_PDEPEND,
+    'rdepend': FIELD_RDEPEND,
+    'license': FIELD_LICENSE,
+    'properties': FIELD_PROPERTIES,
+    'required_use': FIELD_REQUIRED_USE,
+    'restrict': FIELD_RESTRICT,
+    'src_uri': FIELD_SRC_URI,
+}
+
+# mapping of multi-valued field names to identifiers
+cdef dict MULTI_FIELDS = {
+    'defined_phases': FIELD_DEFINED_PHASES,
+    'homepage': FIELD_HOMEPAGE,
+    'inherit': FIELD_INHERIT,
+    'inherited': FIELD_INHERITED,
+    'iuse': FIELD_IUSE,
+    'keywords': FIELD_KEYWORDS,
+}
+
+# mapping of field names to value conversions used for sorting
+cdef dict SORT_KEYS = {
+    'cpv': Cpv,
+    'version': Version,
+}
+
+TABLE_FIELDS = tuple(SCALAR_FIELDS) + tuple(MULTI_FIELDS)
+
+
+cdef str dependency_set_str(C.DependencySet *ptr):
+    """Convert a DependencySet pointer to a string, freeing the set."""
+    s = cstring_to_str(C.pkgcraft_dependency_set_str(ptr))
+    C.pkgcraft_dependency_set_free(ptr)
+    return s
+
+
+cdef str scalar_field(C.Pkg *ptr, int field):
+    """Get the string value for a single-valued package field."""
+    cdef C.Cpv *cpv
+    cdef C.Version *version
+
+    if field == FIELD_CPV or field == FIELD_CATEGORY or field == FIELD_PACKAGE:
+        cpv = C.pkgcraft_pkg_cpv(ptr)
+        if field == FIELD_CPV:
+            s = cstring_to_str(C.pkgcraft_cpv_str(cpv))
+        elif field == FIELD_CATEGORY:
+            s = cstring_to_str(C.pkgcraft_cpv_category(cpv))
+        else:
+            s = cstring_to_str(C.pkgcraft_cpv_package(cpv))
+        C.pkgcraft_cpv_free(cpv)
+        return s
+    elif field == FIELD_VERSION:
+        version = C.pkgcraft_pkg_version(ptr)
+        s = cstring_to_str(C.pkgcraft_version_str(version))
+        C.pkgcraft_version_free(version)
+        return s
+    elif field == FIELD_EAPI:
+        return cstring_to_str(C.pkgcraft_eapi_as_str(C.pkgcraft_pkg_eapi(ptr)))
+    elif field == FIELD_SLOT:
+        return cstring_to_str(C.pkgcraft_pkg_ebuild_slot(ptr))
+    elif field == FIELD_SUBSLOT:
+        return cstring_to_str(C.pkgcraft_pkg_ebuild_subslot(ptr))
+    elif field == FIELD_DESCRIPTION:
+        return cstring_to_str(C.pkgcraft_pkg_ebuild_description(ptr))
+    elif field == FIELD_BDEPEND:
+        return dependency_set_str(C.pkgcraft_pkg_ebuild_bdepend(ptr))
+    elif field == FIELD_DEPEND:
+        return dependency_set_str(C.pkgcraft_pkg_ebuild_depend(ptr))
+    elif field == FIELD_IDEPEND:
+        return dependency_set_str(C.pkgcraft_pkg_ebuild_idepend(ptr))
+    elif field == FIELD_PDEPEND:
+        return dependency_set_str(C.pkgcraft_pkg_ebuild_pdepend(ptr))
+    elif field == FIELD_RDEPEND:
+        return dependency_set_str(C.pkgcraft_pkg_ebuild_rdepend(ptr))
+    elif field == FIELD_LICENSE:
+        return dependency_set_str(C.pkgcraft_pkg_ebuild_license(ptr))
+    elif field == FIELD_PROPERTIES:
+        return dependency_set_str(C.pkgcraft_pkg_ebuild_properties(ptr))
+    elif field == FIELD_REQUIRED_USE:
+        return dependency_set_str(C.pkgcraft_pkg_ebuild_required_use(ptr))
+    elif field == FIELD_RESTRICT:
+        return dependency_set_str(C.pkgcraft_pkg_ebuild_restrict(ptr))
+    elif field == FIELD_SRC_URI:
+        return dependency_set_str(C.pkgcraft_pkg_ebuild_src_uri(ptr))
+    raise ValueError(f'unknown field: {field}')  # pragma: no cover
+
+
+cdef list multi_field(C.Pkg *ptr, int field):
+    """Get the string values for a multi-valued package field."""
+    cdef char **c_strs
+    cdef size_t length
+
+    if field == FIELD_DEFINED_PHASES:
+        c_strs = C.pkgcraft_pkg_ebuild_defined_phases(ptr, &length)
+    elif field == FIELD_HOMEPAGE:
+        c_strs = C.pkgcraft_pkg_ebuild_homepage(ptr, &length)
+    elif field == FIELD_INHERIT:
+        c_strs = C.pkgcraft_pkg_ebuild_inherit(ptr, &length)
+    elif field == FIELD_INHERITED:
+        c_strs = C.pkgcraft_pkg_ebuild_inherited(ptr, &length)
+    elif field == FIELD_IUSE:
+        c_strs = C.pkgcraft_pkg_ebuild_iuse(ptr, &length)
+    elif field == FIELD_KEYWORDS:
+        c_strs = C.pkgcraft_pkg_ebuild_keywords_str(ptr, &length)
+    else:  # pragma: no cover
+        raise ValueError(f'unknown field: {field}')
+
+    vals = [c_strs[i].decode() for i in range(length)]
+    C.pkgcraft_str_array_free(c_strs, length)
+    return vals
+
+
+cdef class Column(Indirect):
+    """Table column of interned values with one entry per package.
+
+    Values are stored once in the `values` list while `codes` holds the
+    index of each package's value.
+    """
+
+    def __cinit__(self):
+        self.codes = array('I')
+        self.values = []
+        self._index = {}
+
+    cdef size_t intern(self, object value):
+        """Return the code for a value, registering it if missing."""
+        try:
+            return self._index[value]
+        except KeyError:
+            code = len(self.values)
+            self.values.append(value)
+            self._index[value] = code
+            return code
+
+    cdef void append(self, object value):
+        self.codes.append(self.intern(value))
+
+    def counts(self):
+        """Return the number of packages for each value.
+
+        Returns:
+            dict[str, int]: mapping of values to package counts
+        """
+        counts = [0] * len(self.values)
+        for code in self.codes:
+            counts[code] += 1
+        return dict(zip(self.values, counts))
+
+    def indices(self, value):
+        """Return the row indices of packages matching a value.
+
+        Returns:
+            array: unsigned integer array of row indices
+        """
+        if (code := self._index.get(value)) is None:
+            return array('Q')
+        return array('Q', (i for (i, c) in enumerate(self.codes) if c == code))
+
+    def groups(self):
+        """Return the row indices of packages grouped by value.
+
+        Returns:
+            dict[str, array]: mapping of values to unsigned integer arrays of row indices
+        """
+        groups = [array('Q') for _ in self.values]
+        for (i, code) in enumerate(self.codes):
+            groups[code].append(i)
+        return dict(zip(self.values, groups))
+
+    def argsort(self, reverse=False):
+        """Return the row indices ordered by value.
+
+        Values are only compared once per unique value, with None values sorted
+        last. Cpv and version values are compared using their native ordering.
+
+        Returns:
+            list[int]: row indices in sorted order
+        """
+        values = self.values
+        key = self.key if self.key is not None else str
+        order = sorted(
+            range(len(values)),
+            key=lambda c: (values[c] is None, '' if values[c] is None else key(values[c])))
+        ranks = [0] * len(values)
+        for (rank, code) in enumerate(order):
+            ranks[code] = rank
+        codes = self.codes
+        return sorted(range(len(codes)), key=lambda i: ranks[codes[i]], reverse=reverse)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, key):
+        return self.values[self.codes[key]]
+
+    def __iter__(self):
+        values = self.values
+        return (values[code] for code in self.codes)
+
+    def __repr__(self):
+        name = self.__class__.__name__
+        return f"<{name} {self.name!r} with {len(self.values)} unique values>"
+
+
+@cython.final
+cdef class MultiColumn(Column):
+    """Table column of interned value sequences with one entry per package.
+
+    Package values are stored as contiguous runs in `codes` with each
+    package's run ending at its corresponding offset.
+    """
+
+    def __cinit__(self):
+        self.offsets = array('Q', [0])
+
+    cdef void append_many(self, list values):
+        for value in values:
+            self.codes.append(self.intern(value))
+        self.offsets.append(len(self.codes))
+
+    def indices(self, value):
+        """Return the row indices of packages containing a value.
+
+        Returns:
+            array: unsigned integer array of row indices
+        """
+        rows = array('Q')
+        if (code := self._index.get(value)) is not None:
+            offsets = self.offsets
+            for (i, c) in enumerate(self.codes):
+                if c == code:
+                    row = bisect_right(offsets, i) - 1
+                    # skip repeated values within a package's run
+                    if not rows or rows[-1] != row:
+                        rows.append(row)
+        return rows
+
+    def groups(self):
+        """Return the row indices of packages grouped by contained value.
+
+        Returns:
+            dict[str, array]: mapping of values to unsigned integer arrays of row indices
+        """
+        groups = [array('Q') for _ in self.values]
+        codes = self.codes
+        offsets = self.offsets
+        for row in range(len(offsets) - 1):
+            for i in range(offsets[row], offsets[row + 1]):
+                groups[codes[i]].append(row)
+        return dict(zip(self.values, groups))
+
+    def argsort(self, reverse=False):
+        raise TypeError(f"{self.__class__.__name__} doesn't support sorting")
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, int key):
+        if key < 0:
+            key += len(self)
+        if key < 0 or key >= len(self):
+            raise IndexError(f"{self.__class__.__name__} index out of range")
+        values = self.values
+        codes = self.codes[self.offsets[key]:self.offsets[key + 1]]
+        return tuple(values[code] for code in codes)
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+
+@cython.final
+cdef class PackageTable(Indirect):
+    """Columnar snapshot of package metadata for a repo.
+
+    Rows are stored in repo iteration order with each requested field
+    represented as a column of interned values. The `cpv` field is always
+    included.
+    """
+
+    @staticmethod
+    cdef PackageTable from_repo(Repo repo, object fields):
+        """Create a PackageTable from a repo's packages."""
+        cdef C.RepoIter *iter_ptr
+        cdef C.Pkg *ptr
+        cdef Column column
+        cdef MultiColumn multi_column
+        cdef int field
+
+        if fields is None:
+            fields = TABLE_FIELDS
+        elif isinstance(fields, str):
+            fields = (fields,)
+        fields = tuple(dict.fromkeys(('cpv',) + tuple(fields)))
+
+        scalar = []
+        multi = []
+        inst = <PackageTable>PackageTable.__new__(PackageTable)
+        inst.fields = fields
+        inst.columns = {}
+        inst.length = 0
+
+        for name in fields:
+            if (field := SCALAR_FIELDS.get(name, -1)) >= 0:
+                column = <Column>Column.__new__(Column)
+                column.key = SORT_KEYS.get(name)
+                scalar.append((field, column))
+            elif (field := MULTI_FIELDS.get(name, -1)) >= 0:
+                column = <MultiColumn>MultiColumn.__new__(MultiColumn)
+                multi.append((field, column))
+            else:
+                raise ValueError(f'invalid field: {name}')
+            column.name = name
+            inst.columns[name] = column
+
+        iter_ptr = C.pkgcraft_repo_iter(repo.ptr)
+        try:
+            while True:
+                ptr = C.pkgcraft_repo_iter_next(iter_ptr)
+                if ptr is NULL:
+                    break
+                try:
+                    for (field, column) in scalar:
+                        column.append(scalar_field(ptr, field))
+                    for (field, multi_column) in multi:
+                        multi_column.append_many(multi_field(ptr, field))
+                finally:
+                    C.pkgcraft_pkg_free(ptr)
+                inst.length += 1
+        finally:
+            C.pkgcraft_repo_iter_free(iter_ptr)
+
+        return inst
+
+    def row(self, int index):
+        """Return the field values for a given row.
+
+        Returns:
+            dict[str, object]: mapping of field names to values
+        """
+        if index < 0:
+            index += self.length
+        if index < 0 or index >= <int>self.length:
+            raise IndexError(f"{self.__class__.__name__} index out of range")
+        return {name: column[index] for (name, column) in self.columns.items()}
+
+    def filter(self, field, value):
+        """Return the row indices of packages matching or containing a field value."""
+        return self[field].indices(value)
+
+    def groupby(self, field):
+        """Return the row indices of packages grouped by field value."""
+        return self[field].groups()
+
+    def counts(self, field):
+        """Return the number of packages for each field value."""
+        return self[field].counts()
+
+    def argsort(self, field, reverse=False):
+        """Return the row indices ordered by a single-valued field."""
+        return self[field].argsort(reverse=reverse)
+
+    def __len__(self):
+        return self.length
+
+    def __contains__(self, field):
+        return field in self.columns
+
+    def __getitem__(self, field):
+        try:
+            return self.columns[field]
+        except KeyError:
+            raise KeyError(field)
+
+    def __repr__(self):
+        name = self.__class__.__name__
+        fields = ', '.join(self.fields)
+        return f"<{name} ({fields}) with {self.length} rows>"
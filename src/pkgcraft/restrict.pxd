@@ -1,10 +1,33 @@
 from . cimport C
 
 
-cdef C.Restrict *str_to_restrict(str s) except NULL
+# restriction evaluation costs, ordered from cheapest to most expensive
+cdef enum RestrictCost:
+    # category and package name
+    COST_CPN
+    # category, package name, and version
+    COST_CPV
+    # package metadata
+    COST_PKG
+    # metadata.xml or ebuild file content
+    COST_XML
+
+
+cdef C.Restrict *str_to_restrict(str s, int *cost) except NULL
 
 cdef class Restrict:
     cdef C.Restrict *ptr
+    # query plan data, combined restrictions store (operator, cost, nodes)
+    # tuples referencing only their leaf restrictions
+    cdef tuple _plan
+    cdef str _desc
+    cdef int _cost
+    cdef readonly bint _compiled
+    # restriction owning a shared pointer, set for copies that must not free it
+    cdef Restrict _owner
 
     @staticmethod
-    cdef Restrict from_ptr(C.Restrict *)
+    cdef Restrict from_ptr(C.Restrict *, int cost=*, str desc=*)
+
+
+cdef Restrict required(Restrict, int)
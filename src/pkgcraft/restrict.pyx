@@ -1,3 +1,5 @@
+import re
+
 cimport cython
 
 from . cimport C
@@ -7,68 +9,315 @@ from .pkg cimport Pkg
 from .error import InvalidCpv, InvalidDep, InvalidRestrict
 
 
-cdef C.Restrict *str_to_restrict(str s) except NULL:
-    """Try to convert a string to a Restrict pointer."""
+# names for restriction costs
+cdef tuple COST_NAMES = ('cpn', 'cpv', 'metadata', 'metadata.xml')
+
+# package attributes requiring metadata.xml parsing or ebuild file reads
+cdef frozenset EXPENSIVE_ATTRS = frozenset([
+    'ebuild', 'long_description', 'maintainers', 'upstream'])
+
+cdef object QUOTED_RE = re.compile(r'"(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\'')
+cdef object WORD_RE = re.compile(r'[A-Za-z_]+')
+
+
+cdef int dep_cost(Dep dep):
+    """Get the cost of a package dependency restriction."""
+    if any(x is not None for x in (dep.blocker, dep.slot, dep.slot_op, dep.use_deps, dep.repo)):
+        return COST_PKG
+    elif dep.version is not None:
+        return COST_CPV
+    return COST_CPN
+
+
+cdef int dep_str_cost(str s):
+    """Get the cost of a dependency restriction string."""
+    if any(c in s for c in '!:['):
+        return COST_PKG
+    elif any(c in s for c in '<>=~'):
+        return COST_CPV
+    return COST_CPN
+
+
+cdef int pkg_str_cost(str s):
+    """Get the cost of a package restriction string."""
+    if EXPENSIVE_ATTRS.intersection(WORD_RE.findall(QUOTED_RE.sub('', s))):
+        return COST_XML
+    return COST_PKG
+
+
+cdef C.Restrict *str_to_restrict(str s, int *cost) except NULL:
+    """Try to convert a string to a Restrict pointer, setting its cost."""
     cdef C.Restrict *r
 
     try:
+        cost[0] = COST_CPV
         return C.pkgcraft_cpv_restrict(Cpv(s).ptr)
     except InvalidCpv:
         pass
 
     try:
-        return C.pkgcraft_dep_restrict(Dep(s).ptr)
+        dep = Dep(s)
+        cost[0] = dep_cost(dep)
+        return C.pkgcraft_dep_restrict(dep.ptr)
     except InvalidDep:
         pass
 
     restrict_bytes = s.encode()
     if r := C.pkgcraft_restrict_parse_dep(restrict_bytes):
+        cost[0] = dep_str_cost(s)
         return r
     elif r := C.pkgcraft_restrict_parse_pkg(restrict_bytes):
+        cost[0] = pkg_str_cost(s)
         return r
 
     raise InvalidRestrict(f'invalid restriction string: {s}')
 
 
+cdef object plan_node(Restrict r):
+    """Get the plan node for a restriction.
+
+    Leaf restrictions are their own nodes while combined restrictions use
+    (operator, cost, nodes) tuples.
+    """
+    return r if r._plan is None else r._plan
+
+
+cdef int node_cost(object node):
+    """Get the cost of a plan node."""
+    return (<Restrict>node)._cost if isinstance(node, Restrict) else node[1]
+
+
+cdef Restrict combine(str op, C.Restrict *ptr, tuple args):
+    """Create a Restrict from a pointer combining other restrictions."""
+    nodes = tuple(plan_node(r) for r in args)
+    cost = max(node_cost(x) for x in nodes)
+    inst = Restrict.from_ptr(ptr, cost)
+    inst._plan = (op, cost, nodes)
+    return inst
+
+
+cdef Restrict build(object node):
+    """Create a restriction from a plan node."""
+    cdef Restrict r
+
+    if isinstance(node, Restrict):
+        return node
+
+    op, _, nodes = node
+    restricts = [build(x) for x in nodes]
+    if op == 'not':
+        r = ~restricts[0]
+    else:
+        r = restricts[0]
+        for x in restricts[1:]:
+            if op == 'and':
+                r = r & x
+            elif op == 'or':
+                r = r | x
+            else:
+                r = r ^ x
+    r._plan = node
+    return r
+
+
+cdef Restrict copy(Restrict r):
+    """Create a Restrict sharing the pointer and plan of another restriction."""
+    inst = Restrict.from_ptr(r.ptr, r._cost, r._desc)
+    inst._plan = r._plan
+    inst._owner = r
+    return inst
+
+
+cdef object compile_node(object node):
+    """Recursively flatten and reorder the branches of a plan node by cost."""
+    if isinstance(node, Restrict):
+        return node
+
+    op, cost, nodes = node
+    if op == 'not' or op == 'xor':
+        return (op, cost, tuple(compile_node(x) for x in nodes))
+
+    flattened = []
+    for x in map(compile_node, nodes):
+        if isinstance(x, tuple) and x[0] == op:
+            flattened.extend(x[2])
+        else:
+            flattened.append(x)
+
+    # stable sort retains the given order for equal costs
+    flattened.sort(key=node_cost)
+    return (op, cost, tuple(flattened))
+
+
+cdef object required_node(object node, int cost):
+    """Get the plan node of a given maximum cost required to match a plan node.
+
+    Returns None if no such node exists.
+    """
+    if node_cost(node) <= cost:
+        return node
+    elif node[0] == 'and':
+        if parts := [x for x in (required_node(x, cost) for x in node[2]) if x is not None]:
+            if len(parts) == 1:
+                return parts[0]
+            return ('and', max(node_cost(x) for x in parts), tuple(parts))
+    elif node[0] == 'or':
+        parts = [required_node(x, cost) for x in node[2]]
+        if None not in parts:
+            return ('or', max(node_cost(x) for x in parts), tuple(parts))
+    return None
+
+
+cdef Restrict required(Restrict r, int cost):
+    """Get the restriction of a given maximum cost required to match a restriction.
+
+    Returns None if no such restriction exists.
+    """
+    if r._cost <= cost:
+        return r
+    elif (node := required_node(plan_node(r), cost)) is not None:
+        return build(node)
+    return None
+
+
+cdef void explain_node(object node, str indent, list lines):
+    """Add the lines describing a plan node to a list."""
+    cost = COST_NAMES[node_cost(node)]
+    if isinstance(node, Restrict):
+        lines.append(f'{indent}{(<Restrict>node)._desc} [{cost}]')
+    else:
+        lines.append(f'{indent}{node[0].upper()} [{cost}]')
+        for x in node[2]:
+            explain_node(x, indent + '  ', lines)
+
+
+cdef bint matches(C.Restrict *r, object obj) except -1:
+    """Determine if a restriction matches a given object."""
+    if isinstance(obj, Cpv):
+        return C.pkgcraft_cpv_restrict_matches((<Cpv>obj).ptr, r)
+    elif isinstance(obj, Dep):
+        return C.pkgcraft_dep_restrict_matches((<Dep>obj).ptr, r)
+    elif isinstance(obj, Pkg):
+        return C.pkgcraft_pkg_restrict_matches((<Pkg>obj).ptr, r)
+    elif isinstance(obj, Cpn):
+        return C.pkgcraft_cpn_restrict_matches((<Cpn>obj).ptr, r)
+    raise TypeError(f"{obj.__class__.__name__!r} unsupported restriction matches type")
+
+
 @cython.final
 cdef class Restrict:
     """Generic restriction."""
 
     def __init__(self, obj not None):
+        cdef int cost
+
         if isinstance(obj, Cpn):
             self.ptr = C.pkgcraft_cpn_restrict((<Cpn>obj).ptr)
+            self._cost = COST_CPN
+            self._desc = f'cpn {str(obj)!r}'
         elif isinstance(obj, Cpv):
             self.ptr = C.pkgcraft_cpv_restrict((<Cpv>obj).ptr)
+            self._cost = COST_CPV
+            self._desc = f'cpv {str(obj)!r}'
         elif isinstance(obj, Dep):
             self.ptr = C.pkgcraft_dep_restrict((<Dep>obj).ptr)
+            self._cost = dep_cost(obj)
+            self._desc = f'dep {str(obj)!r}'
         elif isinstance(obj, Pkg):
             self.ptr = C.pkgcraft_pkg_restrict((<Pkg>obj).ptr)
+            self._cost = COST_PKG
+            self._desc = f'pkg {str(obj)!r}'
         elif isinstance(obj, str):
-            self.ptr = str_to_restrict(obj)
+            self.ptr = str_to_restrict(obj, &cost)
+            self._cost = cost
+            self._desc = repr(obj)
         else:
             raise TypeError(f"{obj.__class__.__name__!r} unsupported restriction type")
 
     @staticmethod
-    cdef Restrict from_ptr(C.Restrict *ptr):
+    cdef Restrict from_ptr(C.Restrict *ptr, int cost=COST_PKG, str desc=None):
         """Create a Restrict from a pointer."""
         inst = <Restrict>Restrict.__new__(Restrict)
         inst.ptr = ptr
+        inst._cost = cost
+        inst._desc = desc if desc is not None else 'restriction'
         return inst
 
     @staticmethod
     def dep(s: str):
         """Convert a string into a dependency-based restriction."""
         if ptr := C.pkgcraft_restrict_parse_dep(s.encode()):
-            return Restrict.from_ptr(ptr)
+            return Restrict.from_ptr(ptr, dep_str_cost(s), f'dep {s!r}')
         raise InvalidRestrict
 
     @staticmethod
     def pkg(s: str):
         """Convert a string into a package-based restriction."""
         if ptr := C.pkgcraft_restrict_parse_pkg(s.encode()):
-            return Restrict.from_ptr(ptr)
+            return Restrict.from_ptr(ptr, pkg_str_cost(s), f'pkg {s!r}')
         raise InvalidRestrict
 
+    @property
+    def prefilter(self):
+        """Get the Cpv-level restriction of a compiled restriction if one exists.
+
+        The prefilter is required to match for the restriction to match and
+        can be checked against Cpv objects without loading packages.
+        """
+        if self._compiled:
+            return required(self, COST_CPV)
+        return None
+
+    def compile(self):
+        """Create an equivalent restriction with an optimized evaluation plan.
+
+        Nested AND and OR branches are flattened and reordered from cheapest
+        to most expensive so cheap predicates short-circuit evaluation before
+        package metadata, metadata.xml, or ebuild files are accessed.
+
+        Repo iteration using compiled restrictions pushes their Cpn and
+        Cpv-level parts down to repo listings, only loading the packages
+        matching them.
+
+        Note that reordered restrictions aren't necessarily equal to their
+        original forms.
+
+        Returns:
+            Restrict: the compiled restriction
+
+        >>> from pkgcraft.restrict import Restrict
+        >>> r = Restrict.pkg('maintainers is none') & Restrict.dep('dev-python/*')
+        >>> print(r.compile().explain())
+        AND [metadata.xml]
+          dep 'dev-python/*' [cpn]
+          pkg 'maintainers is none' [metadata.xml]
+        prefilter:
+          dep 'dev-python/*' [cpn]
+        """
+        cdef Restrict inst = build(compile_node(plan_node(self)))
+        # leaf restrictions are their own plan nodes so copy them
+        if inst is self:
+            inst = copy(self)
+        inst._compiled = True
+        return inst
+
+    def explain(self):
+        """Describe the evaluation plan of a restriction.
+
+        Restrictions are shown in evaluation order with the cost of each
+        branch, from Cpn-level checks to metadata.xml parsing, followed by
+        the prefilter for compiled restrictions requiring package loading.
+
+        Returns:
+            str: the plan description
+        """
+        lines = []
+        explain_node(plan_node(self), '', lines)
+        if (prefilter := self.prefilter) is not None and prefilter is not self:
+            lines.append('prefilter:')
+            explain_node(plan_node(prefilter), '  ', lines)
+        return '\n'.join(lines)
+
     def matches(self, obj not None):
         """Determine if a restriction matches a given object.
 
@@ -76,13 +325,53 @@ cdef class Restrict:
 
         Raises TypeError for object types not supporting matches.
         """
-        if isinstance(obj, Cpv):
-            return C.pkgcraft_cpv_restrict_matches((<Cpv>obj).ptr, self.ptr)
-        if isinstance(obj, Dep):
-            return C.pkgcraft_dep_restrict_matches((<Dep>obj).ptr, self.ptr)
-        elif isinstance(obj, Pkg):
-            return C.pkgcraft_pkg_restrict_matches((<Pkg>obj).ptr, self.ptr)
-        raise TypeError(f"{obj.__class__.__name__!r} unsupported restriction matches type")
+        return matches(self.ptr, obj)
+
+    def matches_many(self, objs not None, str as_='mask'):
+        """Determine which objects of a sequence a restriction matches.
+
+        Objects are matched in a single loop directly calling the related
+        native matching function for each object's type, avoiding per object
+        method dispatch. The mask supports the buffer protocol, e.g. it can be
+        loaded via ``numpy.frombuffer(mask, dtype=bool)``.
+
+        Args:
+            objs (Iterable[Cpn | Cpv | Dep | Pkg]): objects to match
+            as_ (str): result type, "mask" for a bytes object with a value of 1
+                for each matching object and 0 otherwise, or "indices" for the
+                indices of matching objects
+
+        Returns:
+            bytes | list[int]: the match mask or indices
+
+        Raises:
+            TypeError: for object types not supporting matches
+            ValueError: on invalid result types
+
+        >>> from pkgcraft.dep import Dep
+        >>> from pkgcraft.restrict import Restrict
+        >>> r = Restrict.dep('cat/*')
+        >>> deps = [Dep('cat/a'), Dep('a/b'), Dep('>=cat/b-1')]
+        >>> r.matches_many(deps)
+        b'\\x01\\x00\\x01'
+        >>> r.matches_many(deps, as_='indices')
+        [0, 2]
+        """
+        cdef Py_ssize_t i
+
+        if as_ not in ('mask', 'indices'):
+            raise ValueError(f'invalid result type: {as_}')
+        if not isinstance(objs, (list, tuple)):
+            objs = list(objs)
+
+        mask = bytearray(len(objs))
+        cdef unsigned char[:] view = mask
+        for i in range(len(objs)):
+            view[i] = matches(self.ptr, objs[i])
+
+        if as_ == 'indices':
+            return [i for i in range(len(objs)) if view[i]]
+        return bytes(mask)
 
     def __eq__(self, other):
         if isinstance(other, Restrict):
@@ -95,23 +384,24 @@ cdef class Restrict:
     def __and__(self, other):
         if isinstance(other, Restrict):
             ptr = C.pkgcraft_restrict_and(self.ptr, (<Restrict>other).ptr)
-            return Restrict.from_ptr(ptr)
+            return combine('and', ptr, (self, other))
         return NotImplemented
 
     def __or__(self, other):
         if isinstance(other, Restrict):
             ptr = C.pkgcraft_restrict_or(self.ptr, (<Restrict>other).ptr)
-            return Restrict.from_ptr(ptr)
+            return combine('or', ptr, (self, other))
         return NotImplemented
 
     def __xor__(self, other):
         if isinstance(other, Restrict):
             ptr = C.pkgcraft_restrict_xor(self.ptr, (<Restrict>other).ptr)
-            return Restrict.from_ptr(ptr)
+            return combine('xor', ptr, (self, other))
         return NotImplemented
 
     def __invert__(self):
-        return Restrict.from_ptr(C.pkgcraft_restrict_not(self.ptr))
+        return combine('not', C.pkgcraft_restrict_not(self.ptr), (self,))
 
     def __dealloc__(self):
-        C.pkgcraft_restrict_free(self.ptr)
+        if self._owner is None:
+            C.pkgcraft_restrict_free(self.ptr)
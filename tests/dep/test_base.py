@@ -228,6 +228,22 @@ class TestDependency:
         assert list(map(str, reversed(Dependency.required_use("|| ( a b )")))) == ["b", "a"]
         assert list(map(str, reversed(Dependency.required_use("|| ( u? ( a ) )")))) == ["u? ( a )"]
 
+    def test_canonical(self):
+        d = Dependency("( a/c a/b u? ( b/d b/c ) )")
+        assert d.canonical_str() == "( a/b a/c u? ( b/c b/d ) )"
+        # original object isn't modified
+        assert str(d) == "( a/c a/b u? ( b/d b/c ) )"
+        assert d.canonical_hash() == Dependency("( a/b a/c u? ( b/d b/c ) )").canonical_hash()
+        assert d.canonical_hash() != Dependency("( a/b a/c u? ( b/d ) )").canonical_hash()
+        # any-of order is significant
+        assert Dependency("|| ( a/c a/b )").canonical_str() == "|| ( a/c a/b )"
+        assert (
+            Dependency("|| ( a/c a/b )").canonical_hash()
+            != Dependency("|| ( a/b a/c )").canonical_hash()
+        )
+        # non-package set types
+        assert Dependency.required_use("( b a )").canonical_str() == "( a b )"
+
     def test_iter_conditionals(self):
         assert list(Dependency.required_use("a").iter_conditionals()) == []
         assert list(Dependency.required_use("( a )").iter_conditionals()) == []
@@ -407,6 +423,39 @@ class DependencySetBase:
         ]
         assert list(reversed(self.cls("|| ( u? ( a/b ) )"))) == [Dependency("|| ( u? ( a/b ) )")]
 
+    def test_intern(self):
+        d1 = self.cls("a/b || ( c/d e/f )")
+        d2 = self.cls("a/b || ( c/d e/f )")
+        i1 = d1.intern()
+        assert i1.__class__ == DependencySet
+        assert i1 is d2.intern()
+        assert i1 is i1.intern()
+        assert i1 == d1
+        if self.cls is DependencySet:
+            assert i1 is d1
+        else:
+            assert i1 is not d1
+            # modifying a mutable set doesn't affect the interned instance
+            d1.clear()
+            assert i1 == d2
+        # interning is per set type
+        d = self.cls("a", set=DependencySetKind.License).intern()
+        assert d is not self.cls("a", set=DependencySetKind.RequiredUse).intern()
+        assert d.set == DependencySetKind.License
+
+    def test_canonical(self):
+        d = self.cls("|| ( a/c a/b ) ( b/d b/c ) a/z")
+        assert d.canonical_str() == "a/z ( b/c b/d ) || ( a/c a/b )"
+        # original object isn't modified
+        assert str(d) == "|| ( a/c a/b ) ( b/d b/c ) a/z"
+        assert d.canonical_hash() == self.cls("a/z ( b/c b/d ) || ( a/c a/b )").canonical_hash()
+        assert d.canonical_hash() != self.cls("a/z ( b/c b/d )").canonical_hash()
+        assert isinstance(d.canonical_hash(), int)
+
+        # empty sets
+        assert self.cls().canonical_str() == ""
+        assert self.cls().canonical_hash() == self.cls().canonical_hash()
+
     def test_iter_conditionals(self):
         assert list(self.cls("a/b").iter_conditionals()) == []
         assert list(self.cls("( a/b )").iter_conditionals()) == []
@@ -424,6 +473,37 @@ class DependencySetBase:
         assert list(self.cls("|| ( a/b c/d )").iter_flatten()) == [Dep("a/b"), Dep("c/d")]
         assert list(self.cls("|| ( u? ( a/b ) )").iter_flatten()) == [Dep("a/b")]
 
+    def test_flatten(self):
+        d = self.cls(">=a/b-1 u? ( a/b c/d ) || ( a/b >=a/b-1 ) !e/f")
+        assert d.flatten() == [Dep(">=a/b-1"), Dep("a/b"), Dep("c/d"), Dep("!e/f")]
+        assert d.flatten(unique=False) == list(d.iter_flatten())
+        assert d.flatten(as_="strings") == [">=a/b-1", "a/b", "c/d", "!e/f"]
+        assert d.flatten(unique=False, as_="strings") == list(map(str, d.iter_flatten()))
+        assert d.flatten(as_="cpns") == [Cpn("a/b"), Cpn("c/d"), Cpn("e/f")]
+        assert d.flatten(unique=False, as_="cpns") == [x.cpn for x in d.iter_flatten()]
+        assert self.cls().flatten() == []
+
+        # Dependency objects
+        dep = Dependency("|| ( a/b u? ( >=a/b-1 a/b ) )")
+        assert dep.flatten() == [Dep("a/b"), Dep(">=a/b-1")]
+        assert dep.flatten(as_="cpns") == [Cpn("a/b")]
+
+        # other set types
+        d = self.cls("a u? ( b a )", set=DependencySetKind.License)
+        assert d.flatten() == ["a", "b"]
+        assert d.flatten(unique=False) == ["a", "b", "a"]
+        d = self.cls("https://a/b.tar.gz u? ( https://a/b.tar.gz )", set=DependencySetKind.SrcUri)
+        uris = d.flatten()
+        assert len(uris) == 1
+        assert isinstance(uris[0], Uri)
+        assert d.flatten(unique=False, as_="strings") == ["https://a/b.tar.gz"] * 2
+
+        # invalid result types
+        with pytest.raises(ValueError):
+            self.cls("a/b").flatten(as_="objects")
+        with pytest.raises(ValueError):
+            self.cls("a", set=DependencySetKind.License).flatten(as_="cpns")
+
     def test_iter_recursive(self):
         assert list(self.cls("a/b").iter_recursive()) == [Dependency("a/b")]
         assert list(self.cls("!a/b").iter_recursive()) == [Dependency("!a/b")]
@@ -473,6 +553,35 @@ class DependencySetBase:
         assert d1.evaluate(True) == self.cls("|| ( a/b c/d )")
         assert not d1.evaluate(False)
 
+    def test_evaluate_many(self):
+        d = self.cls("a/b u1? ( c/d ) !u2? ( e/f ) || ( u1? ( a/b ) g/h )")
+        configs = [[], ["u1"], ["u2", "u3"], ["u1", "u2"], ["u3"], True, False]
+
+        # results match individual evaluation
+        results = d.evaluate_many(configs)
+        assert results == [d.evaluate(x) for x in configs]
+        assert all(x.__class__ == self.cls for x in results)
+        # configs with the same relevant flags share results for immutable sets
+        if self.cls is DependencySet:
+            assert results[0] is results[4]
+        else:
+            assert results[0] is not results[4]
+
+        # bitsets and counts of flattened objects
+        assert d.evaluate_many(configs, as_="bitsets") == [13, 15, 9, 11, 13, 15, 9]
+        assert d.evaluate_many(configs, as_="counts") == [3, 4, 2, 3, 3, 4, 2]
+
+        # no configs
+        assert d.evaluate_many([]) == []
+
+        # no conditionals
+        d = self.cls("a/b c/d")
+        assert d.evaluate_many([[], ["u"]], as_="counts") == [2, 2]
+
+        # invalid result type
+        with pytest.raises(ValueError):
+            d.evaluate_many([[]], as_="objects")
+
     def test_contains(self):
         d = self.cls("!u1? ( a/b u2? ( b/c ) ) c/d")
 
@@ -638,6 +747,79 @@ class DependencySetBase:
         assert d.intersection(Dependency("a/a")) == self.cls("a/a")
         assert d.intersection(Dependency("a/a"), Dependency("c/c")) == self.cls()
 
+    def test_union_all(self, ebuild_repo):
+        # empty iterable
+        d = self.cls.union_all([])
+        assert d.__class__ == self.cls
+        assert not d and d.set == DependencySetKind.Package
+        d = self.cls.union_all([], set=DependencySetKind.License)
+        assert not d and d.set == DependencySetKind.License
+
+        # DependencySet and string args
+        d = self.cls("a/a b/b")
+        assert self.cls.union_all([d]) == d and self.cls.union_all([d]) is not d
+        d = self.cls.union_all([d, "b/b c/c", self.cls("u? ( d/d )")])
+        assert d.__class__ == self.cls
+        assert d == self.cls("a/a b/b c/c u? ( d/d )")
+        d = self.cls.union_all(iter(["a b", "c"]), set=DependencySetKind.License)
+        assert d == self.cls.license("a b c")
+
+        # mismatched set types
+        with pytest.raises(TypeError):
+            self.cls.union_all([self.cls("a/a"), self.cls.license("a")])
+
+        # packages
+        pkg1 = ebuild_repo.create_pkg("cat/pkg-1", rdepend="a/a b/b")
+        pkg2 = ebuild_repo.create_pkg("cat/pkg-2", rdepend="b/b c/c")
+        assert self.cls.union_all([pkg1, pkg2], key="rdepend") == self.cls("a/a b/b c/c")
+        assert self.cls.union_all([pkg1, pkg2], key="RDEPEND") == self.cls("a/a b/b c/c")
+        assert not self.cls.union_all([pkg1, pkg2], key="depend")
+
+    def test_intersection_all(self, ebuild_repo):
+        # empty iterable
+        d = self.cls.intersection_all([])
+        assert d.__class__ == self.cls
+        assert not d
+
+        # DependencySet and string args
+        d = self.cls("a/a b/b")
+        assert self.cls.intersection_all([d]) == d and self.cls.intersection_all([d]) is not d
+        d = self.cls.intersection_all([d, "b/b c/c a/a", self.cls("b/b")])
+        assert d.__class__ == self.cls
+        assert d == self.cls("b/b")
+        assert not self.cls.intersection_all(["a/a", "b/b", "a/a"])
+
+        # remaining sets are skipped once empty
+        assert not self.cls.intersection_all(["a/a", "b/b", self.cls.license("a")])
+
+        # mismatched set types
+        with pytest.raises(TypeError):
+            self.cls.intersection_all([self.cls("a/a"), self.cls.license("a")])
+
+        # packages
+        pkg1 = ebuild_repo.create_pkg("cat/pkg-1", rdepend="a/a b/b")
+        pkg2 = ebuild_repo.create_pkg("cat/pkg-2", rdepend="b/b c/c")
+        assert self.cls.intersection_all([pkg1, pkg2], key="rdepend") == self.cls("b/b")
+
+    def test_count_all(self, ebuild_repo):
+        assert not self.cls.count_all([])
+
+        counts = self.cls.count_all([self.cls("a/a b/b"), "b/b c/c", "u? ( a/a ) b/b"])
+        assert counts == {
+            Dependency("a/a"): 1,
+            Dependency("b/b"): 3,
+            Dependency("c/c"): 1,
+            Dependency("u? ( a/a )"): 1,
+        }
+        assert counts.most_common(1) == [(Dependency("b/b"), 3)]
+
+        # packages
+        pkg1 = ebuild_repo.create_pkg("cat/pkg-1", rdepend="a/a b/b")
+        pkg2 = ebuild_repo.create_pkg("cat/pkg-2", rdepend="b/b c/c")
+        counts = self.cls.count_all([pkg1, pkg2], key="rdepend")
+        assert counts[Dependency("b/b")] == 2
+        assert counts[Dependency("a/a")] == 1
+
     def test_difference(self):
         d = self.cls("a/a b/b")
 
@@ -1056,3 +1238,137 @@ class TestMutableDependencySet(DependencySetBase):
     def test_hash(self):
         with pytest.raises(TypeError):
             hash(MutableDependencySet())
+
+
+class TestCompiledDependencySet:
+    def test_creation(self):
+        d = DependencySet("a/b u1? ( c/d !u2? ( e/f ) ) || ( u3? ( a/b ) g/h )")
+        c = CompiledDependencySet(d, ["+u4", "-u3"])
+        assert c.deps == d
+        assert c.flags == ("u4", "u3", "u1", "u2")
+        assert c.objects == tuple(Dep(x) for x in ("a/b", "c/d", "e/f", "g/h"))
+        assert len(c) == 4
+        assert repr(c) == "<CompiledDependencySet with 4 flags and 4 objects>"
+
+        # mutable sets are copied
+        m = MutableDependencySet("u? ( a/b )")
+        c = CompiledDependencySet(m)
+        m.add("c/d")
+        assert c.deps == DependencySet("u? ( a/b )")
+        assert c.deps.__class__ == DependencySet
+
+        # empty
+        c = CompiledDependencySet(DependencySet())
+        assert not c.flags
+        assert c.bitset(["u"]) == 0
+
+        # invalid
+        with pytest.raises(TypeError):
+            CompiledDependencySet("a/b")
+
+    def test_evaluate(self):
+        d = DependencySet("a/b u1? ( c/d !u2? ( e/f ) ) || ( u3? ( a/b ) g/h )")
+        c = CompiledDependencySet(d)
+        assert c.flags == ("u1", "u2", "u3")
+        assert c.mask([]) == 0
+        assert c.mask(["u3", "u1", "unknown"]) == 0b101
+        assert c.mask(0b10) == 0b10
+        for value in (True, False):
+            with pytest.raises(TypeError):
+                c.mask(value)
+
+        for enabled in ([], ["u1"], ["u1", "u2"], ["u2", "u3"], ["u1", "u3"]):
+            evaluated = d.evaluate(enabled)
+            assert c.evaluate(enabled) == evaluated
+            objs = set(evaluated.iter_flatten())
+            bitset = sum(1 << i for (i, x) in enumerate(c.objects) if x in objs)
+            assert c.bitset(enabled) == bitset
+            assert c.bitset(c.mask(enabled)) == bitset
+            assert c.count(enabled) == len(objs)
+
+        # evaluation results are cached per mask
+        assert c.evaluate(["u1", "u4"]) is c.evaluate(["u1"])
+        assert c.evaluate(0b1) is c.evaluate(["u1"])
+
+
+class TestRequiredUseSolver:
+    def test_creation(self):
+        d = DependencySet.required_use("x? ( y ) a")
+        s = RequiredUseSolver(d, ["+a", "-b"])
+        assert s.required_use is d
+        assert s.flags == ("a", "b", "x", "y")
+        assert repr(s) == "<RequiredUseSolver 'x? ( y ) a'>"
+
+        # invalid
+        with pytest.raises(ValueError):
+            RequiredUseSolver(DependencySet("a/b"))
+        with pytest.raises(TypeError):
+            RequiredUseSolver("a")
+
+    def test_check(self):
+        s = RequiredUseSolver(DependencySet.required_use("|| ( a b ) c? ( !a )"), ["+a", "b", "c"])
+        assert s.check()
+        assert s.check(["a"])
+        assert s.check(["b", "c"])
+        assert not s.check([])
+        assert not s.check(["a", "c"])
+        # unknown flags are ignored
+        assert s.check(["a", "z"])
+
+        for required_use, enabled in (
+            ("^^ ( a b )", (False, True, True, False)),
+            ("?? ( a b )", (True, True, True, False)),
+            ("( a b )", (False, False, False, True)),
+            ("!a? ( b )", (False, True, True, True)),
+        ):
+            s = RequiredUseSolver(DependencySet.required_use(required_use), ["a", "b"])
+            for flags, expected in zip(([], ["a"], ["b"], ["a", "b"]), enabled):
+                assert s.check(flags) == expected, f"{required_use}: {flags}"
+
+    def test_first_solution(self):
+        s = RequiredUseSolver(DependencySet.required_use("|| ( a b )"), ["a", "b"])
+        assert list(s.first_solution()) == ["b"]
+        assert list(s.first_solution(["a"])) == ["a"]
+        assert list(s.first_solution(["a", "b"])) == ["a", "b"]
+        # results are cached
+        assert s.first_solution() is s.first_solution([])
+
+        # closest solution to the preferences
+        s = RequiredUseSolver(DependencySet.required_use("?? ( a b )"), ["+a", "+b", "+c"])
+        assert list(s.first_solution()) == ["a", "c"]
+        assert list(s.first_solution(["b"])) == ["b"]
+
+        # no constraints
+        s = RequiredUseSolver(DependencySet.required_use(), ["+a", "b"])
+        assert list(s.first_solution()) == ["a"]
+        assert list(s.first_solution(["b"])) == ["b"]
+
+        # unsatisfiable
+        s = RequiredUseSolver(DependencySet.required_use("a !a"), ["a"])
+        assert s.first_solution() is None
+
+    def test_enumerate_solutions(self):
+        s = RequiredUseSolver(DependencySet.required_use("|| ( a b )"), ["a", "b"])
+        assert s.enumerate_solutions(1) == [["b"]]
+        assert s.enumerate_solutions() == [["b"], ["a"], ["a", "b"]]
+        assert s.enumerate_solutions(2) == [["b"], ["a"]]
+        assert s.enumerate_solutions(0) == []
+
+        # unsatisfiable
+        s = RequiredUseSolver(DependencySet.required_use("a !a"), ["a"])
+        assert s.enumerate_solutions() == []
+
+        # solutions match the satisfying configurations
+        required_use = "^^ ( a b c ) d? ( || ( a e ) ) !e? ( ?? ( b d ) )"
+        iuse = ["a", "b", "c", "d", "e"]
+        s = RequiredUseSolver(DependencySet.required_use(required_use), iuse)
+        solutions = s.enumerate_solutions()
+        configs = [
+            {flag for (i, flag) in enumerate(iuse) if n >> i & 1} for n in range(2 ** len(iuse))
+        ]
+        expected = [x for x in configs if s.check(x)]
+        assert len(solutions) == len(expected)
+        assert sorted(map(sorted, solutions)) == sorted(map(sorted, expected))
+        # solutions are ordered by the number of changed flags
+        changes = [len(x) for x in solutions]
+        assert changes == sorted(changes)
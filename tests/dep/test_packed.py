@@ -0,0 +1,91 @@
+import pickle
+
+import pytest
+
+from pkgcraft.dep import *
+from pkgcraft.eapi import EAPI_LATEST
+
+
+class TestPackedArray:
+    def test_creation(self):
+        # empty
+        a = PackedArray()
+        assert len(a) == 0
+        assert list(a) == []
+        assert a.kind is Dep
+        assert PackedArray([], kind=Cpv).kind is Cpv
+        assert repr(a) == "<PackedArray of 0 Dep objects>"
+
+        # mixed types
+        with pytest.raises(TypeError):
+            PackedArray([Cpv("cat/pkg-1"), Dep("cat/pkg")])
+
+        # unsupported types
+        for objs in (["cat/pkg"], [None], [object()]):
+            with pytest.raises(TypeError):
+                PackedArray(objs)
+        with pytest.raises(TypeError):
+            PackedArray([], kind=str)
+
+    @pytest.mark.parametrize(
+        "kind,values",
+        (
+            (Cpn, ("cat/a", "cat/b", "cat/a")),
+            (Cpv, ("cat/a-1", "cat/b-2-r1", "cat/a-1")),
+            (Dep, ("cat/a", ">=cat/b-1:2/3[u]", "cat/a")),
+            (Version, ("1", "2.0_alpha1-r1", "1")),
+        ),
+    )
+    def test_kinds(self, kind, values):
+        objs = [kind(x) for x in values]
+        a = PackedArray(objs)
+        assert a.kind is kind
+        assert len(a) == 3
+        assert list(a) == objs
+        assert a[1] == objs[1]
+        assert a[-1] == objs[-1]
+        assert a[:2] == objs[:2]
+        # duplicate values share the same object
+        assert a[0] is a[2]
+        # objects are cached
+        assert a[1] is a[1]
+
+        with pytest.raises(IndexError):
+            a[3]
+
+    def test_dep_eapi(self):
+        a = PackedArray([Dep("cat/a", "5"), Dep("cat/a"), Dep("cat/b", "5")])
+        assert [str(x.eapi) for x in a] == ["5", str(EAPI_LATEST), "5"]
+        # dependencies with differing EAPIs aren't merged
+        assert a[0] is not a[1]
+
+    def test_buffer(self):
+        a = PackedArray([Cpv("cat/a-1"), Cpv("cat/b-1"), Cpv("cat/a-1")])
+        data = a.to_bytes()
+        assert a.nbytes == len(data)
+        b = PackedArray.from_buffer(data)
+        assert list(b) == list(a)
+        b = PackedArray.from_buffer(bytearray(data))
+        assert list(b) == list(a)
+
+        # invalid data
+        for data in (b"", b"PKGA", b"\0" * 32, data[:-1], data[:24]):
+            with pytest.raises(ValueError):
+                PackedArray.from_buffer(data)
+
+    def test_shared_memory(self):
+        a = PackedArray([Dep("cat/a"), Dep(">=cat/b-1")])
+        shm = a.to_shared_memory()
+        try:
+            b = PackedArray.from_buffer(shm.buf)
+            assert list(b) == list(a)
+            del b
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def test_pickle(self):
+        a = PackedArray([Version("1"), Version("2"), Version("1")])
+        b = pickle.loads(pickle.dumps(a))
+        assert b.kind is Version
+        assert list(a) == list(b)
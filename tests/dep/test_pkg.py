@@ -127,6 +127,39 @@ class TestDep:
             with pytest.raises(TypeError):
                 Dep.parse(obj)
 
+    def test_parse_many(self):
+        strs = ["cat/pkg", ">=cat/pkg-1", "=cat/pkg-1-r2:3/4::repo[a,b,c]"]
+        deps = Dep.parse_many(strs)
+        assert deps == [Dep(s) for s in strs]
+
+        # empty iterables
+        assert Dep.parse_many([]) == []
+        assert Dep.parse_many(iter(())) == []
+
+        # generators
+        assert Dep.parse_many(s for s in strs) == deps
+
+        # explicitly specifying an EAPI
+        assert Dep.parse_many(["cat/pkg"], EAPI_LATEST_OFFICIAL) == [Dep("cat/pkg")]
+        with pytest.raises(InvalidDep, match="invalid dep: cat/pkg::repo"):
+            Dep.parse_many(["cat/pkg", "cat/pkg::repo"], str(EAPI_LATEST_OFFICIAL))
+
+        # invalid strings
+        invalid = ["cat/pkg", "cat/pkg-1", ">=cat/pkg-1"]
+        with pytest.raises(InvalidDep, match="invalid dep: cat/pkg-1"):
+            Dep.parse_many(invalid)
+        assert Dep.parse_many(invalid, errors="skip") == [Dep("cat/pkg"), Dep(">=cat/pkg-1")]
+        assert Dep.parse_many(invalid, errors="none") == [Dep("cat/pkg"), None, Dep(">=cat/pkg-1")]
+
+        # invalid errors value
+        with pytest.raises(ValueError, match="invalid errors value"):
+            Dep.parse_many(strs, errors="ignore")
+
+        # invalid args
+        for obj in [None, object(), [None], [object()]]:
+            with pytest.raises(TypeError):
+                Dep.parse_many(obj)
+
     def test_without(self):
         optional_fields = ("blocker", "version", "slot_dep", "use_deps", "repo")
         dep = Dep("!!>=cat/pkg-1.2-r3:4/5=::repo[u]")
@@ -369,3 +402,91 @@ class TestDep:
         dep = Dep("=cat/pkg-1-r2:0/2=[a,b,c]")
         new_dep = pickle.loads(pickle.dumps(dep))
         assert dep == new_dep
+
+
+class TestDepCachedLru:
+    def test_caching(self):
+        DepCachedLru.pool.clear()
+        d1 = DepCachedLru("=cat/pkg-1")
+        assert d1 is DepCachedLru("=cat/pkg-1")
+        assert d1 is not DepCachedLru("=cat/pkg-2")
+        assert d1 == Dep("=cat/pkg-1")
+
+        # EAPI arguments are normalized
+        for eapi in (str(EAPI_LATEST_OFFICIAL), EAPI_LATEST_OFFICIAL):
+            assert DepCachedLru("cat/pkg", eapi) is DepCachedLru("cat/pkg", eapi=eapi)
+        assert DepCachedLru("cat/pkg", str(EAPI_LATEST_OFFICIAL)) is DepCachedLru(
+            "cat/pkg", EAPI_LATEST_OFFICIAL
+        )
+
+        # invalid deps aren't cached
+        for _ in range(2):
+            with pytest.raises(InvalidDep):
+                DepCachedLru("cat/pkg-1")
+
+        info = DepCachedLru.pool.info()
+        assert info.hits == 6
+        assert info.misses == 5
+        assert info.currsize == 3
+
+    def test_pool(self):
+        pool = InstancePool(maxsize=2)
+        assert pool.maxsize == 2
+        d1 = pool.get(Dep, "=cat/pkg-1")
+        cpv = pool.get(Cpv, "cat/pkg-1")
+        ver = pool.get(Version, "1")
+        assert len(pool) == 2
+        assert pool.info().evictions == 1
+
+        # least recently used instances are evicted
+        assert pool.get(Dep, "=cat/pkg-1") is not d1
+        assert pool.get(Version, "1") is ver
+        assert pool.get(Cpv, "cat/pkg-1") is not cpv
+
+        # shrinking the pool evicts entries
+        pool.maxsize = 1
+        assert len(pool) == 1
+        assert pool.info() == (1, 5, 4, 1, 1)
+
+        # clearing by class
+        pool.maxsize = None
+        pool.get(Dep, "=cat/pkg-1")
+        pool.clear(Cpv)
+        assert len(pool) == 1
+        assert pool.info().hits == 1
+
+        # clearing everything resets stats
+        pool.clear()
+        assert pool.info() == (0, 0, 0, None, 0)
+
+        # invalid sizes
+        for size in (-1, "a"):
+            with pytest.raises(ValueError):
+                InstancePool(size)
+            with pytest.raises(ValueError):
+                pool.maxsize = size
+
+    def test_shared_pool(self):
+        pool = InstancePool()
+
+        class Dep1(Dep, metaclass=LruInstanceCache, pool=pool):
+            pass
+
+        class Dep2(Dep, metaclass=LruInstanceCache, pool=pool):
+            pass
+
+        d1 = Dep1("cat/pkg")
+        d2 = Dep2("cat/pkg")
+        assert d1 is not d2
+        assert isinstance(d1, Dep1) and isinstance(d2, Dep2)
+        assert Dep1.pool is Dep2.pool is pool
+        assert len(pool) == 2
+        pool.clear(Dep1)
+        assert len(pool) == 1
+        assert Dep2("cat/pkg") is d2
+
+    def test_pickle(self):
+        d1 = DepCachedLru("=cat/pkg-1-r2:0/2=[a,b,c]")
+        d2 = pickle.loads(pickle.dumps(d1))
+        assert d1 == d2
+        assert isinstance(d2, DepCachedLru)
@@ -215,3 +215,77 @@ class TestRevision:
         rev1 = Revision("1")
         rev2 = pickle.loads(pickle.dumps(rev1))
         assert rev1 == rev2
+
+
+class TestVersionIndex:
+    def test_creation(self):
+        # empty
+        idx = VersionIndex()
+        assert len(idx) == 0
+        assert not idx.matches(">=1")
+        assert idx.best(">=1") is None
+        assert repr(idx) == "<VersionIndex with 0 versions>"
+
+        # sorted and deduplicated
+        idx = VersionIndex(["2", Version("1-r1"), "1", "1-r0", "1.0"])
+        assert list(map(str, idx)) == ["1", "1-r1", "1.0", "2"]
+        assert list(map(str, reversed(idx))) == ["2", "1.0", "1-r1", "1"]
+        assert str(idx[-1]) == "2"
+        assert len(idx[1:3]) == 2
+        assert Version("1-r1") in idx
+        assert Version("3") not in idx
+        assert "1" in idx
+        assert "3" not in idx
+        assert ">=2" in idx
+        assert object() not in idx
+        with pytest.raises(InvalidVersion):
+            "a" in idx
+
+        # invalid
+        with pytest.raises(InvalidVersion):
+            VersionIndex(["a"])
+        with pytest.raises(ValueError):
+            VersionIndex([">=1"])
+
+    def test_matches(self):
+        versions = [
+            "0.9",
+            "1_alpha",
+            "1",
+            "1-r1",
+            "1-r2",
+            "1.0.1",
+            "1.1",
+            "1.10",
+            "1.2_p1",
+            "2",
+            "2-r1",
+            "10",
+        ]
+        idx = VersionIndex(versions)
+        queries = [
+            f"{op}{v}"
+            for op in ("<", "<=", "=", ">=", ">")
+            for v in ("0", "1", "1-r1", "1.1", "2", "11")
+        ]
+        queries += ["~1", "~2", "~3", "=1*", "=1.1*", "=2*", "=3*"]
+        for q in queries:
+            query = Version(q)
+            expected = [v for v in sorted(map(Version, versions)) if query.intersects(v)]
+            assert list(idx.matches(q)) == expected, f"failed query: {q}"
+            assert idx.best(q) == (expected[-1] if expected else None)
+
+        # unqualified versions match exactly
+        assert list(map(str, idx.matches("1-r1"))) == ["1-r1"]
+        assert list(map(str, idx.matches(Version("1")))) == ["1"]
+
+        # dependencies and cpvs
+        assert list(map(str, idx.matches(Dep("<cat/pkg-1")))) == ["0.9", "1_alpha"]
+        assert len(idx.matches(Dep("cat/pkg"))) == len(idx)
+        assert list(map(str, idx.matches(Cpv("cat/pkg-2-r1")))) == ["2-r1"]
+
+        # invalid
+        with pytest.raises(InvalidVersion):
+            idx.matches("a")
+        with pytest.raises(TypeError):
+            idx.matches(object())
@@ -279,6 +279,17 @@ class TestEbuildPkg(BasePkgTests):
         pkg = TEST_DATA.repos["metadata"]["required_use/inherit-8"]
         assert str(pkg.required_use) == "global ebuild eclass a b"
 
+    def test_required_use_solver(self, ebuild_repo):
+        pkg = ebuild_repo.create_pkg("cat/pkg-1", iuse="a +b c", required_use="^^ ( a b ) c? ( a )")
+        solver = pkg.required_use_solver
+        assert solver is pkg.required_use_solver
+        assert solver.flags == ("a", "b", "c")
+        assert solver.check()
+        assert not solver.check(["b", "c"])
+        assert solver.first_solution() == ["b"]
+        assert solver.first_solution(["c"]) == ["a", "c"]
+        assert solver.enumerate_solutions() == [["b"], ["a"], ["a", "c"]]
+
     def test_restrict(self):
         # none
         pkg = TEST_DATA.repos["metadata"]["optional/none-8"]
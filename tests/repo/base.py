@@ -220,3 +220,32 @@ class BaseRepoTests:
         # invalid restriction string
         with pytest.raises(InvalidRestrict):
             list(repo.iter("-"))
+
+    def test_iter_parallel_base(self, repo):
+        # empty repo
+        assert not list(repo.iter(jobs=2))
+        assert not list(repo.iter("cat/*", jobs=2))
+
+        pkgs = [
+            repo.create_pkg(cpv)
+            for cpv in ("cat1/a-1", "cat1/a-2", "cat1/b-1", "cat2/a-1", "cat2/c-1")
+        ]
+
+        # ordered iteration matches serial iteration
+        for jobs in (0, 2, 4):
+            assert list(repo.iter(jobs=jobs)) == pkgs
+            assert list(repo.iter("*/a", jobs=jobs)) == list(repo.iter("*/a"))
+            assert list(repo.iter(Dep(">=cat1/a-2"), jobs=jobs)) == [pkgs[1]]
+
+        # unordered iteration yields the same packages
+        assert sorted(repo.iter(jobs=2, ordered=False)) == pkgs
+        assert sorted(repo.iter("cat2/*", jobs=2, ordered=False)) == pkgs[3:]
+
+        # partial iteration
+        assert next(repo.iter(jobs=2)) == pkgs[0]
+
+        # invalid restrictions raise immediately
+        with pytest.raises(TypeError):
+            repo.iter(object(), jobs=2)
+        with pytest.raises(InvalidRestrict):
+            repo.iter("-", jobs=2)
@@ -0,0 +1,105 @@
+import os
+
+import pytest
+
+from pkgcraft.dep import Cpv
+from pkgcraft.repo import QueryCache, RepoSet
+from pkgcraft.restrict import Restrict
+
+
+class TestQueryCache:
+    def test_init(self, fake_repo):
+        # invalid repo types
+        for obj in (None, object()):
+            with pytest.raises(TypeError):
+                QueryCache(obj)
+
+        # invalid sizes
+        with pytest.raises(ValueError):
+            QueryCache(fake_repo, maxsize=0)
+
+        cache = QueryCache(fake_repo, maxsize=2)
+        assert cache.repo is fake_repo
+        assert cache.maxsize == 2
+        assert cache.check_interval == 1
+        assert len(cache) == 0
+        assert (cache.hits, cache.misses, cache.invalidations) == (0, 0, 0)
+        assert "0/2 entries" in repr(cache)
+
+    def test_query(self, fake_repo):
+        fake_repo.extend(["cat/a-1", "cat/b-1", "other/a-1"])
+        cache = QueryCache(fake_repo, maxsize=2)
+
+        r = Restrict("cat/*")
+        assert cache.query(r) == (Cpv("cat/a-1"), Cpv("cat/b-1"))
+        assert (cache.hits, cache.misses) == (0, 1)
+        assert r in cache and "cat/*" in cache
+
+        # equal restrictions share entries
+        assert cache.query("cat/*") == (Cpv("cat/a-1"), Cpv("cat/b-1"))
+        assert (cache.hits, cache.misses) == (1, 1)
+
+        # no matches
+        assert cache.query("a/b") == ()
+        assert (cache.hits, cache.misses) == (1, 2)
+
+        # least recently used entries are evicted
+        assert cache.query("cat/*")
+        assert cache.query("*/a") == (Cpv("cat/a-1"), Cpv("other/a-1"))
+        assert len(cache) == 2
+        assert "cat/*" in cache and "a/b" not in cache
+
+        # clearing resets entries and stats
+        cache.clear()
+        assert len(cache) == 0
+        assert (cache.hits, cache.misses, cache.invalidations) == (0, 0, 0)
+
+    def test_fake_repo_invalidation(self, fake_repo):
+        fake_repo.extend(["cat/a-1"])
+        cache = QueryCache(fake_repo, check_interval=0)
+        assert cache.query("cat/*") == (Cpv("cat/a-1"),)
+
+        fake_repo.extend(["cat/b-1"])
+        assert cache.query("cat/*") == (Cpv("cat/a-1"), Cpv("cat/b-1"))
+        assert (cache.hits, cache.misses, cache.invalidations) == (0, 2, 1)
+
+    def test_ebuild_repo_invalidation(self, ebuild_repo):
+        ebuild_repo.create_pkg("cat/a-1", slot="1")
+        cache = QueryCache(ebuild_repo, check_interval=0)
+        r = Restrict.pkg("slot == '1'")
+        assert cache.query(r) == (Cpv("cat/a-1"),)
+        assert cache.query(r) == (Cpv("cat/a-1"),)
+        assert cache.invalidations == 0
+
+        # added ebuilds
+        ebuild_repo.create_pkg("cat/b-1", slot="1")
+        assert cache.query(r) == (Cpv("cat/a-1"), Cpv("cat/b-1"))
+        assert cache.invalidations == 1
+
+        # modified ebuilds
+        path = ebuild_repo.create_ebuild("cat/a-1", slot="2")
+        mtime = os.stat(path).st_mtime_ns + 10**9
+        os.utime(path, ns=(mtime, mtime))
+        assert cache.query(r) == (Cpv("cat/b-1"),)
+        assert cache.invalidations == 2
+
+        # modified ebuilds with older modification times
+        path = ebuild_repo.create_ebuild("cat/a-1", slot="1", description="older")
+        os.utime(path, ns=(mtime - 10**10, mtime - 10**10))
+        assert cache.query(r) == (Cpv("cat/a-1"), Cpv("cat/b-1"))
+        assert cache.invalidations == 3
+
+        # modifications aren't detected until the check interval passes
+        cache = QueryCache(ebuild_repo, check_interval=3600)
+        assert cache.query(r) == (Cpv("cat/a-1"), Cpv("cat/b-1"))
+        ebuild_repo.create_pkg("cat/c-1", slot="1")
+        assert cache.query(r) == (Cpv("cat/a-1"), Cpv("cat/b-1"))
+        assert cache.invalidations == 0
+
+    def test_repo_set(self, make_fake_repo):
+        r1 = make_fake_repo(["cat/a-1"])
+        r2 = make_fake_repo(["cat/b-1"])
+        cache = QueryCache(RepoSet(r1, r2))
+        assert cache.query("cat/*") == (Cpv("cat/a-1"), Cpv("cat/b-1"))
+        assert cache.query("cat/*") == (Cpv("cat/a-1"), Cpv("cat/b-1"))
+        assert (cache.hits, cache.misses) == (1, 1)
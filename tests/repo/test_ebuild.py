@@ -3,9 +3,10 @@ from pathlib import Path
 
 import pytest
 
+from pkgcraft.dep import Cpv, Dep, DependencySet
 from pkgcraft.eapi import EAPI_LATEST_OFFICIAL
 from pkgcraft.error import InvalidRepo
-from pkgcraft.repo import EbuildRepo, Repo
+from pkgcraft.repo import EbuildRepo, Repo, RepoSet
 
 from ..misc import TEST_DATA
 from .base import BaseRepoTests
@@ -109,6 +110,183 @@ class TestEbuildRepo(BaseRepoTests):
         secondary = TEST_DATA.repos["secondary"]
         assert secondary.licenses == ["a", "b"]
 
+    def test_to_table(self, repo):
+        # empty repo
+        table = repo.to_table()
+        assert len(table) == 0
+        assert table.fields[0] == "cpv"
+        assert table.counts("eapi") == {}
+
+        repo.create_pkg("cat/a-1", slot="1", keywords=["amd64", "~arm64"], iuse=["x", "y"])
+        repo.create_pkg("cat/a-2", slot="2", keywords=["~amd64"], iuse=["x"])
+        repo.create_pkg("cat/b-1", eapi="7", depend="cat/a")
+
+        table = repo.to_table(["eapi", "slot", "depend", "keywords", "iuse"])
+        assert len(table) == 3
+        assert table.fields == ("cpv", "eapi", "slot", "depend", "keywords", "iuse")
+        assert "slot" in table
+        assert "description" not in table
+
+        # scalar columns
+        assert list(table["cpv"]) == ["cat/a-1", "cat/a-2", "cat/b-1"]
+        assert table["slot"][0] == "1"
+        assert table["slot"][-1] == "0"
+        assert table["depend"][2] == "cat/a"
+        assert table.counts("eapi") == {str(EAPI_LATEST_OFFICIAL): 2, "7": 1}
+        assert list(table.filter("eapi", "7")) == [2]
+        assert list(table.filter("eapi", "nonexistent")) == []
+        assert {k: list(v) for k, v in table.groupby("slot").items()} == {
+            "1": [0],
+            "2": [1],
+            "0": [2],
+        }
+        assert table.argsort("slot") == [2, 0, 1]
+        assert table.argsort("slot", reverse=True) == [1, 0, 2]
+
+        # multi-valued columns
+        assert table["keywords"][0] == ("amd64", "~arm64")
+        assert table["iuse"][-1] == ()
+        assert list(table["iuse"]) == [("x", "y"), ("x",), ()]
+        assert table.counts("iuse") == {"x": 2, "y": 1}
+        assert list(table.filter("iuse", "x")) == [0, 1]
+        assert {k: list(v) for k, v in table.groupby("iuse").items()} == {"x": [0, 1], "y": [0]}
+        with pytest.raises(TypeError):
+            table.argsort("iuse")
+        with pytest.raises(IndexError):
+            table["iuse"][3]
+
+        # rows
+        assert table.row(0)["slot"] == "1"
+        assert table.row(-1)["cpv"] == "cat/b-1"
+        with pytest.raises(IndexError):
+            table.row(3)
+
+        # Cpv and version columns are sorted using their native ordering
+        repo.create_pkg("cat/b-10")
+        repo.create_pkg("cat/b-1_rc1")
+        table = repo.to_table("version")
+        cpvs = ["cat/a-1", "cat/a-2", "cat/b-1_rc1", "cat/b-1", "cat/b-10"]
+        assert list(table["cpv"]) == cpvs
+        assert [table["cpv"][i] for i in table.argsort("cpv")] == cpvs
+        versions = [table["version"][i] for i in table.argsort("version")]
+        assert versions == ["1_rc1", "1", "1", "2", "10"]
+        assert [table["cpv"][i] for i in table.argsort("cpv", reverse=True)] == cpvs[::-1]
+
+        # single field string
+        table = repo.to_table("description")
+        assert table.fields == ("cpv", "description")
+
+        # invalid fields
+        with pytest.raises(ValueError, match="invalid field: nonexistent"):
+            repo.to_table(["nonexistent"])
+        with pytest.raises(KeyError):
+            table["slot"]
+
+    def test_index(self, make_raw_ebuild_repo, tmp_path, monkeypatch):
+        def touch(path, content=None):
+            """Write file content, forcing a modification time change."""
+            if content is not None:
+                path.write_text(content)
+            st = os.stat(path)
+            os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+        def cpvs(*args):
+            return [Cpv(x) for x in args]
+
+        cache_dir = tmp_path / "cache"
+        monkeypatch.setenv("XDG_CACHE_HOME", str(cache_dir))
+        raw_repo = make_raw_ebuild_repo()
+        path = raw_repo.path
+
+        # empty repo
+        index = EbuildRepo(path).index()
+        assert len(index) == 0
+        assert index.updated == 0
+        # index is stored in the user cache directory outside the repo
+        assert index.path.parent == cache_dir / "pkgcraft" / "index"
+        assert index.path.exists()
+        assert not (path / "metadata" / "pkgcraft-index.json").exists()
+        assert not index.dependents("cat/pkg")
+
+        eclass = path / "eclass" / "e1.eclass"
+        eclass.write_text('# stub eclass\nDEPEND="cat/dep"\n')
+        a = raw_repo.create_ebuild("cat/a-1", depend="cat/b !cat/c")
+        raw_repo.create_ebuild("cat/b-1", data="inherit e1")
+        raw_repo.create_ebuild("cat/c-1", depend="cat/b")
+        xml = path / "cat" / "c" / "metadata.xml"
+        xml.write_text("""<?xml version="1.0" encoding="UTF-8"?>
+            <pkgmetadata>
+                <maintainer type="person">
+                    <email>a.person@email.com</email>
+                </maintainer>
+            </pkgmetadata>
+            """)
+
+        # initial build
+        index = EbuildRepo(path).index()
+        assert len(index) == 3
+        assert index.updated == 3
+        assert "cat/a-1" in index
+        assert Cpv("cat/c-1") in index
+        assert "cat/z-1" not in index
+        assert index.dependents("cat/b") == cpvs("cat/a-1", "cat/c-1")
+        assert index.dependents(Cpv("cat/b-1").cpn) == cpvs("cat/a-1", "cat/c-1")
+        # blockers are ignored
+        assert not index.dependents("cat/c")
+        # eclass dependencies are included
+        assert index.dependents("cat/dep") == cpvs("cat/b-1")
+        assert index.inheriting("e1") == cpvs("cat/b-1")
+        assert not index.inheriting("e2")
+        assert index.maintained_by("a.person@email.com") == cpvs("cat/c-1")
+
+        # unmodified repo reuses all entries
+        index = EbuildRepo(path).index()
+        assert index.updated == 0
+        assert index.dependents("cat/b") == cpvs("cat/a-1", "cat/c-1")
+
+        # modified ebuild
+        touch(a, a.read_text().replace("cat/b !cat/c", "cat/c"))
+        index = EbuildRepo(path).index()
+        assert index.updated == 1
+        assert index.dependents("cat/b") == cpvs("cat/c-1")
+        assert index.dependents("cat/c") == cpvs("cat/a-1")
+
+        # modified eclass
+        touch(eclass, '# stub eclass\nDEPEND="cat/dep2"\n')
+        index = EbuildRepo(path).index()
+        assert index.updated == 1
+        assert not index.dependents("cat/dep")
+        assert index.dependents("cat/dep2") == cpvs("cat/b-1")
+
+        # modified metadata.xml
+        touch(xml, xml.read_text().replace("a.person", "b.person"))
+        index = EbuildRepo(path).index()
+        assert index.updated == 1
+        assert not index.maintained_by("a.person@email.com")
+        assert index.maintained_by("b.person@email.com") == cpvs("cat/c-1")
+
+        # removed ebuild
+        os.remove(path / "cat" / "c" / "c-1.ebuild")
+        index = EbuildRepo(path).index()
+        assert index.updated == 0
+        assert len(index) == 2
+        assert not index.maintained_by("b.person@email.com")
+
+        # forced rebuild
+        index = EbuildRepo(path).index(force=True)
+        assert index.updated == 2
+
+        # custom path
+        custom_path = tmp_path / "index.json"
+        index = EbuildRepo(path).index(path=custom_path)
+        assert index.path == custom_path
+        assert index.updated == 2
+        assert EbuildRepo(path).index(path=custom_path).updated == 0
+
+        # invalid data causes a rebuild
+        custom_path.write_text("{")
+        assert EbuildRepo(path).index(path=custom_path).updated == 2
+
     @pytest.mark.parallel
     def test_metadata_regen(self, tmpdir):
         def metadata_content(path):
@@ -125,6 +303,262 @@ class TestEbuildRepo(BaseRepoTests):
         data = sorted(metadata_content(tmpdir))
         assert data == sorted(metadata_content(repo.path.joinpath("metadata/md5-cache")))
 
+    def test_iter_dependencies(self, repo):
+        # empty repo
+        assert not list(repo.iter_dependencies())
+
+        repo.create_pkg("cat/a-1", depend="cat/b", rdepend="u? ( cat/b >=cat/c-1 ) cat/b", iuse="u")
+        repo.create_pkg("cat/b-1", eapi="7", bdepend="cat/c")
+        repo.create_pkg("cat/c-1")
+
+        # flattened, unique dependencies
+        rows = list(repo.iter_dependencies())
+        assert [(str(cpv), key, str(dep)) for (cpv, key, dep) in rows] == [
+            ("cat/a-1", "DEPEND", "cat/b"),
+            ("cat/a-1", "RDEPEND", "cat/b"),
+            ("cat/a-1", "RDEPEND", ">=cat/c-1"),
+            ("cat/b-1", "BDEPEND", "cat/c"),
+        ]
+        assert rows[0][0] == Cpv("cat/a-1")
+        assert rows[0][2] == Dep("cat/b")
+
+        # specific keys
+        rows = list(repo.iter_dependencies(["rdepend"]))
+        assert [(str(cpv), key, str(dep)) for (cpv, key, dep) in rows] == [
+            ("cat/a-1", "RDEPEND", "cat/b"),
+            ("cat/a-1", "RDEPEND", ">=cat/c-1"),
+        ]
+
+        # unflattened
+        rows = list(repo.iter_dependencies(flatten=False))
+        assert [(str(cpv), key) for (cpv, key, _) in rows] == [
+            ("cat/a-1", "DEPEND"),
+            ("cat/a-1", "RDEPEND"),
+            ("cat/b-1", "BDEPEND"),
+        ]
+        assert rows[1][2] == DependencySet("u? ( cat/b >=cat/c-1 ) cat/b")
+
+        # columnar batches
+        batches = list(repo.iter_dependencies(batch=3))
+        assert len(batches) == 2
+        cpvs, keys, deps = batches[0]
+        assert cpvs == [Cpv("cat/a-1")] * 3
+        assert keys == ["DEPEND", "RDEPEND", "RDEPEND"]
+        assert deps == [Dep("cat/b"), Dep("cat/b"), Dep(">=cat/c-1")]
+        assert batches[1] == ([Cpv("cat/b-1")], ["BDEPEND"], [Dep("cat/c")])
+
+        # invalid args
+        with pytest.raises(ValueError):
+            repo.iter_dependencies(["SLOT"])
+        with pytest.raises(ValueError):
+            repo.iter_dependencies(batch=0)
+
+    def test_iter_dependencies_raw(self, repo):
+        repo.create_pkg("cat/a-1", depend="cat/b", rdepend="u? ( cat/b )", iuse="u")
+        b = repo.create_ebuild("cat/b-1", bdepend="cat/c")
+        repo.metadata_regen()
+
+        rows = list(repo.iter_dependencies(raw=True))
+        assert rows == [
+            (Cpv("cat/a-1"), "DEPEND", "cat/b"),
+            (Cpv("cat/a-1"), "RDEPEND", "u? ( cat/b )"),
+            (Cpv("cat/b-1"), "BDEPEND", "cat/c"),
+        ]
+        assert list(repo.iter_dependencies(["rdepend"], raw=True)) == [rows[1]]
+        assert list(repo.iter_dependencies(raw=True, batch=2))[1] == (
+            [Cpv("cat/b-1")],
+            ["BDEPEND"],
+            ["cat/c"],
+        )
+
+        # values are pulled from valid cache entries with whitespace collapsed
+        entry = repo.path / "metadata" / "md5-cache" / "cat" / "b-1"
+        entry.write_text(entry.read_text().replace("BDEPEND=cat/c", "BDEPEND=cat/d\tcat/e "))
+        row = (Cpv("cat/b-1"), "BDEPEND", "cat/d cat/e")
+        assert list(repo.iter_dependencies(raw=True))[-1] == row
+
+        # packages are loaded for outdated cache entries
+        b.write_text(b.read_text() + "\n")
+        assert list(repo.iter_dependencies(raw=True))[-1] == (Cpv("cat/b-1"), "BDEPEND", "cat/c")
+
+        # only the dependency keys for a package's EAPI are used
+        repo.create_ebuild("cat/c-1", eapi="7", rdepend="cat/a")
+        repo.metadata_regen()
+        entry = repo.path / "metadata" / "md5-cache" / "cat" / "c-1"
+        entry.write_text(entry.read_text() + "IDEPEND=cat/z\n")
+        rows = list(repo.iter_dependencies(raw=True))
+        assert rows[-1] == (Cpv("cat/c-1"), "RDEPEND", "cat/a")
+        assert rows == [(cpv, k, str(v)) for (cpv, k, v) in repo.iter_dependencies(flatten=False)]
+
+    def test_iter_distfiles(self, repo):
+        # empty repo
+        assert not list(repo.iter_distfiles())
+
+        src_uri = (
+            "https://a.com/a.tar.gz u? ( https://b.com/a.tar.gz ) !u? ( https://a.com/z -> z.xz )"
+        )
+        repo.create_pkg("cat/a-1", src_uri=src_uri, iuse="u")
+        repo.create_pkg("cat/a-2", src_uri="https://c.com/a.tar.gz https://a.com/b.tar.gz")
+        repo.create_pkg("cat/b-1")
+
+        # all conditionals, unique filenames
+        assert list(repo.iter_distfiles()) == [
+            (Cpv("cat/a-1"), "a.tar.gz", ("https://a.com/a.tar.gz", "https://b.com/a.tar.gz")),
+            (Cpv("cat/a-1"), "z.xz", ("https://a.com/z",)),
+            (Cpv("cat/a-2"), "b.tar.gz", ("https://a.com/b.tar.gz",)),
+        ]
+
+        # duplicate filenames
+        assert list(repo.iter_distfiles(unique=False)) == [
+            (Cpv("cat/a-1"), "a.tar.gz", ("https://a.com/a.tar.gz", "https://b.com/a.tar.gz")),
+            (Cpv("cat/a-1"), "z.xz", ("https://a.com/z",)),
+            (Cpv("cat/a-2"), "a.tar.gz", ("https://c.com/a.tar.gz",)),
+            (Cpv("cat/a-2"), "b.tar.gz", ("https://a.com/b.tar.gz",)),
+        ]
+
+        # no conditionals
+        assert [x[:2] for x in repo.iter_distfiles(evaluate_use=False, unique=False)] == [
+            (Cpv("cat/a-1"), "a.tar.gz"),
+            (Cpv("cat/a-2"), "a.tar.gz"),
+            (Cpv("cat/a-2"), "b.tar.gz"),
+        ]
+
+        # enabled flags
+        assert list(repo.iter_distfiles(evaluate_use=["u"]))[0] == (
+            Cpv("cat/a-1"),
+            "a.tar.gz",
+            ("https://a.com/a.tar.gz", "https://b.com/a.tar.gz"),
+        )
+        assert list(repo.iter_distfiles(evaluate_use=[]))[:2] == [
+            (Cpv("cat/a-1"), "a.tar.gz", ("https://a.com/a.tar.gz",)),
+            (Cpv("cat/a-1"), "z.xz", ("https://a.com/z",)),
+        ]
+
+    def test_dependency_fingerprints(self, repo):
+        # empty repo
+        assert repo.dependency_fingerprints() == {}
+
+        repo.create_pkg("cat/a-1", depend="cat/c cat/b", rdepend="u? ( cat/b )", iuse="u")
+        repo.create_pkg("cat/a-2", depend="cat/b cat/c")
+        repo.create_pkg("cat/b-1")
+        fingerprints = repo.dependency_fingerprints()
+        assert list(fingerprints) == [Cpv("cat/a-1"), Cpv("cat/a-2"), Cpv("cat/b-1")]
+        a1, a2, b1 = fingerprints.values()
+        assert a1 == {
+            "DEPEND": DependencySet("cat/b cat/c").canonical_hash(),
+            "RDEPEND": DependencySet("u? ( cat/b )").canonical_hash(),
+        }
+        # dependency order is ignored
+        assert a1["DEPEND"] == a2["DEPEND"]
+        assert b1 == {}
+
+        # specific keys
+        fingerprints = repo.dependency_fingerprints(["rdepend"])
+        assert fingerprints[Cpv("cat/a-1")] == {"RDEPEND": a1["RDEPEND"]}
+        assert fingerprints[Cpv("cat/a-2")] == {}
+
+        # invalid keys
+        with pytest.raises(ValueError):
+            repo.dependency_fingerprints(["invalid"])
+
+    def test_intern_dependencies(self, repo):
+        repo.create_pkg("cat/a-1", depend="u? ( cat/b )", rdepend="u? ( cat/b )", iuse="u")
+        repo.create_pkg("cat/a-2", depend="u? ( cat/b )", iuse="u")
+
+        # disabled by default
+        assert not repo.intern_dependencies
+        pkg1, pkg2 = repo
+        assert pkg1.depend == pkg2.depend
+        assert pkg1.depend is not pkg2.depend
+
+        repo.intern_dependencies = True
+        for pkgs in (list(repo), list(repo.iter("cat/a")), list(repo.iter(jobs=2))):
+            pkg1, pkg2 = pkgs
+            assert pkg1.depend is pkg2.depend
+            assert pkg1.rdepend is pkg2.depend
+            assert pkg1.license is pkg2.license
+
+        # repo sets use the setting of their repos
+        pkg1, pkg2 = RepoSet(repo)
+        assert pkg1.depend is pkg2.depend
+        assert list(repo.iter_dependencies(flatten=False))[0][2] is pkg1.depend
+        for s in (RepoSet() | repo, RepoSet(repo) | RepoSet(), RepoSet(repo)[:]):
+            pkg1, pkg2 = s
+            assert pkg1.depend is pkg2.depend
+
+        # the setting only applies to the repo object
+        other = EbuildRepo(repo.path, id=repo.id)
+        assert not other.intern_dependencies
+        for pkgs in (list(other), list(RepoSet(other))):
+            pkg1, pkg2 = pkgs
+            assert pkg1.depend is not pkg2.depend
+
+        repo.intern_dependencies = False
+        assert not repo.intern_dependencies
+        pkg1, pkg2 = RepoSet(repo)
+        assert pkg1.depend is not pkg2.depend
+
+    def test_leaf_packages(self, repo):
+        # empty repo
+        assert not list(repo.leaf_packages())
+
+        repo.create_ebuild("a/lower-1")
+        repo.create_ebuild("a/lower-2")
+        repo.create_ebuild("a/lower-3")
+        repo.create_ebuild("a/upper-1")
+        repo.create_ebuild("a/upper-2")
+        repo.create_ebuild("a/exact-1")
+        repo.create_ebuild("a/exact-2")
+        repo.create_ebuild("a/any-1")
+        repo.create_ebuild("a/blocked-1")
+        repo.create_ebuild(
+            "b/pkg-1",
+            depend=">=a/lower-3 >a/lower-1 <=a/upper-1 !a/blocked",
+            rdepend="u? ( ~a/exact-2 a/any:0 )",
+            iuse="u",
+        )
+
+        leaves = repo.leaf_packages()
+        assert iter(leaves) is leaves
+        assert list(leaves) == [
+            Cpv("a/blocked-1"),
+            Cpv("a/exact-1"),
+            Cpv("a/lower-1"),
+            Cpv("a/upper-2"),
+            Cpv("b/pkg-1"),
+        ]
+
+    def test_metadata_outdated(self, make_ebuild_repo, tmp_path):
+        repo = make_ebuild_repo()
+        eclass = repo.path / "eclass" / "e1.eclass"
+        eclass.write_text("# stub eclass\n")
+        repo.create_ebuild("cat/a-1")
+        b = repo.create_ebuild("cat/b-1", data="inherit e1")
+        repo.create_ebuild("cat/c-1")
+        repo = EbuildRepo(repo.path)
+        cpvs = list(repo.iter_cpv())
+
+        # no cache entries exist
+        assert repo.metadata_outdated(path=tmp_path) == cpvs
+
+        repo.metadata_regen(path=tmp_path)
+        assert not repo.metadata_outdated(path=tmp_path)
+
+        # modified ebuild
+        b.write_text(b.read_text() + "IUSE=u\n")
+        assert repo.metadata_outdated(path=tmp_path) == [Cpv("cat/b-1")]
+        repo.metadata_regen(path=tmp_path)
+        assert not repo.metadata_outdated(path=tmp_path)
+
+        # modified eclass
+        eclass.write_text("# modified stub eclass\n")
+        repo = EbuildRepo(repo.path)
+        assert repo.metadata_outdated(path=tmp_path) == [Cpv("cat/b-1")]
+
+        # removed cache entry
+        os.remove(tmp_path / "cat" / "a-1")
+        assert repo.metadata_outdated(path=tmp_path) == [Cpv("cat/a-1"), Cpv("cat/b-1")]
+
 
 class TestEbuildRepoMetadata:
     def test_arches(self, make_ebuild_repo):
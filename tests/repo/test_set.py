@@ -258,6 +258,73 @@ class BaseTests:
         with pytest.raises(InvalidRestrict):
             list(s.iter("-"))
 
+    def test_iter_jobs(self, make_fake_repo):
+        # empty set
+        assert not list(self.cls().iter(jobs=2))
+        assert not list(self.cls().iter(jobs=2, merge=True))
+
+        r1 = make_fake_repo(["cat/pkg-1", "cat/pkg-3", "a/b-1"], id="r1")
+        r2 = make_fake_repo(["cat/pkg-2", "cat/pkg-3"], id="r2", priority=1)
+        r3 = make_fake_repo(id="r3")
+        s = self.cls(r1, r2, r3)
+
+        # packages are yielded in the native order for any number of jobs
+        expected = ["cat/pkg-2::r2", "cat/pkg-3::r2", "a/b-1::r1", "cat/pkg-1::r1", "cat/pkg-3::r1"]
+        assert list(map(str, s)) == expected
+        for jobs in (0, 1, 2, 8):
+            assert list(map(str, s.iter(jobs=jobs))) == expected
+        assert list(map(str, s.iter(jobs=2, buffer=1))) == expected
+
+        # merged packages are in Cpv order with ties in repo set order
+        expected = ["a/b-1::r1", "cat/pkg-1::r1", "cat/pkg-2::r2", "cat/pkg-3::r2", "cat/pkg-3::r1"]
+        for jobs in (0, 1, 2, 8):
+            assert list(map(str, s.iter(jobs=jobs, merge=True))) == expected
+        assert list(map(str, s.iter(jobs=2, merge=True, buffer=1))) == expected
+
+        # restrictions
+        expected = list(map(str, s.iter("cat/pkg-3")))
+        assert expected == ["cat/pkg-3::r2", "cat/pkg-3::r1"]
+        assert list(map(str, s.iter("cat/pkg-3", jobs=2))) == expected
+        assert list(map(str, s.iter("cat/pkg-3", jobs=2, merge=True))) == expected
+        assert not list(s.iter("nonexistent/pkg", jobs=2))
+        assert not list(s.iter("nonexistent/pkg", jobs=2, merge=True))
+
+        # early termination stops producers
+        it = s.iter(jobs=2, buffer=1)
+        assert str(next(it)) == "cat/pkg-2::r2"
+        it.close()
+        it = s.iter(jobs=2, merge=True, buffer=1)
+        assert str(next(it)) == "a/b-1::r1"
+        it.close()
+
+        # invalid args
+        with pytest.raises(TypeError):
+            s.iter(object(), jobs=2)
+        with pytest.raises(InvalidRestrict):
+            s.iter("-", jobs=2)
+        with pytest.raises(ValueError):
+            s.iter(jobs=2, buffer=0)
+
+    def test_leaf_packages(self, make_ebuild_repo, make_fake_repo):
+        # empty
+        assert not list(self.cls().leaf_packages())
+
+        r1 = make_ebuild_repo(id="r1")
+        r1.create_ebuild("cat/a-1", depend="cat/b")
+        r1.create_ebuild("cat/b-1")
+        r2 = make_ebuild_repo(id="r2")
+        r2.create_ebuild("cat/c-1", rdepend=">=cat/a-1 !cat/d")
+        r2.create_ebuild("cat/d-1")
+        r3 = make_fake_repo(["cat/e-1"], id="r3")
+
+        # dependencies across repos are considered
+        s = self.cls(r1, r2)
+        assert list(s.leaf_packages()) == [Cpv("cat/c-1"), Cpv("cat/d-1")]
+
+        # repos lacking dependency support only provide packages
+        s = self.cls(r1, r2, r3)
+        assert Cpv("cat/e-1") in list(s.leaf_packages())
+
     def test_set_ops(self, make_fake_repo):
         r1 = make_fake_repo(priority=1)
         r2 = make_fake_repo(priority=2)
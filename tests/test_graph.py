@@ -0,0 +1,96 @@
+import pytest
+
+from pkgcraft.dep import Cpn, Cpv, Dep, UseDep
+from pkgcraft.graph import DepGraph
+from pkgcraft.repo import RepoSet
+
+
+@pytest.fixture
+def graph(make_ebuild_repo):
+    r1 = make_ebuild_repo(id="r1")
+    r1.create_ebuild("cat/a-1", depend="cat/b", rdepend=">=cat/c-2")
+    r1.create_ebuild("cat/a-2", iuse="u", rdepend="u? ( cat/c ) !cat/d")
+    r1.create_ebuild("cat/b-1", bdepend="cat/c")
+    r2 = make_ebuild_repo(id="r2")
+    r2.create_ebuild("cat/c-1")
+    r2.create_ebuild("cat/c-2", rdepend="cat/e")
+    r2.create_ebuild("cat/d-1", pdepend="cat/a")
+    return DepGraph(RepoSet(r1, r2))
+
+
+class TestDepGraph:
+    def test_creation(self, graph, fake_repo):
+        assert len(graph) == 4
+        assert list(graph) == [Cpn(x) for x in ("cat/a", "cat/b", "cat/c", "cat/d")]
+        assert repr(graph) == "<DepGraph with 4 pkgs and 6 edges>"
+
+        # repos without dependencies
+        fake_repo.create_pkg("cat/pkg-1")
+        g = DepGraph(fake_repo)
+        assert len(g) == 1
+        assert not g.deps("cat/pkg")
+
+        # invalid
+        with pytest.raises(TypeError):
+            DepGraph(None)
+
+    def test_contains(self, graph):
+        assert "cat/a" in graph
+        assert Cpn("cat/a") in graph
+        assert Cpv("cat/a-2") in graph
+        assert Dep(">=cat/a-2") in graph
+        assert Cpv("cat/a-3") not in graph
+        assert Dep(">cat/a-2") not in graph
+        # dependency targets without packages aren't included
+        assert "cat/e" not in graph
+        # invalid
+        assert "-" not in graph
+        assert object() not in graph
+
+    def test_revdeps(self, graph):
+        assert not graph.revdeps("cat/nonexistent")
+
+        edges = graph.revdeps("cat/c")
+        assert [str(x) for x in edges] == [
+            "cat/a-1: RDEPEND: >=cat/c-2",
+            "cat/a-2: RDEPEND: u? cat/c",
+            "cat/b-1: BDEPEND: cat/c",
+        ]
+        edge = edges[1]
+        assert edge.pkg == Cpv("cat/a-2")
+        assert edge.dep == Dep("cat/c")
+        assert edge.key == "RDEPEND"
+        assert edge.conditionals == (UseDep("u?"),)
+        assert repr(edge) == "<Edge 'cat/a-2: RDEPEND: u? cat/c'>"
+
+        # versioned targets
+        assert [x.pkg for x in graph.revdeps("cat/c-1")] == [Cpv("cat/a-2"), Cpv("cat/b-1")]
+        assert [x.pkg for x in graph.revdeps(Dep("<cat/c-2"))] == [Cpv("cat/a-2"), Cpv("cat/b-1")]
+        assert len(graph.revdeps(Cpv("cat/c-2"))) == 3
+
+        # filtered by key
+        assert [x.pkg for x in graph.revdeps("cat/c", keys=["BDEPEND"])] == [Cpv("cat/b-1")]
+
+        # blockers are excluded
+        assert not graph.revdeps("cat/d")
+
+        # invalid
+        with pytest.raises(ValueError):
+            graph.revdeps("-")
+        with pytest.raises(TypeError):
+            graph.revdeps(object())
+
+    def test_deps(self, graph):
+        assert not graph.deps("cat/nonexistent")
+        assert [str(x.dep) for x in graph.deps("cat/a")] == ["cat/b", ">=cat/c-2", "cat/c"]
+        assert [str(x.dep) for x in graph.deps("cat/a-1")] == ["cat/b", ">=cat/c-2"]
+        assert [str(x.dep) for x in graph.deps(Dep(">=cat/a-2"))] == ["cat/c"]
+        assert [str(x.dep) for x in graph.deps("cat/a", keys=["DEPEND"])] == ["cat/b"]
+
+    def test_closure(self, graph):
+        assert graph.closure("cat/a") == [Cpn(x) for x in ("cat/b", "cat/c", "cat/e")]
+        assert graph.closure("cat/a", keys=["DEPEND"]) == [Cpn("cat/b")]
+        assert graph.closure("cat/c", reverse=True) == [Cpn(x) for x in ("cat/a", "cat/b", "cat/d")]
+        assert graph.closure("cat/e") == []
+        # cached results
+        assert graph.closure("cat/a") is graph.closure(Cpn("cat/a"))
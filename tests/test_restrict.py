@@ -1,6 +1,6 @@
 import pytest
 
-from pkgcraft.dep import Cpv, Dep
+from pkgcraft.dep import Cpn, Cpv, Dep
 from pkgcraft.error import InvalidRestrict
 from pkgcraft.restrict import Restrict
 
@@ -84,6 +84,38 @@ class TestRestrict:
             with pytest.raises(TypeError):
                 assert r.matches(obj)
 
+    def test_matches_many(self, fake_repo):
+        r = Restrict("cat/pkg")
+        pkg1 = fake_repo.create_pkg("cat/pkg-1")
+        pkg2 = fake_repo.create_pkg("a/b-1")
+
+        # empty
+        assert r.matches_many([]) == b""
+        assert r.matches_many([], as_="indices") == []
+
+        # homogeneous sequences
+        cpvs = [Cpv("cat/pkg-1"), Cpv("a/b-1"), Cpv("cat/pkg-2")]
+        assert r.matches_many(cpvs) == b"\x01\x00\x01"
+        assert r.matches_many(cpvs, as_="indices") == [0, 2]
+        assert r.matches_many(iter(cpvs), as_="indices") == [0, 2]
+        deps = (Dep("<a/b-1"), Dep(">=cat/pkg-1"))
+        assert r.matches_many(deps) == b"\x00\x01"
+        assert r.matches_many([pkg1, pkg2]) == b"\x01\x00"
+        assert r.matches_many([Cpn("a/b"), Cpn("cat/pkg")], as_="indices") == [1]
+
+        # mixed sequences
+        objs = [pkg2, Cpv("cat/pkg-1"), Dep("cat/pkg"), Cpn("a/b")]
+        assert r.matches_many(objs) == bytes(r.matches(x) for x in objs) == b"\x00\x01\x01\x00"
+
+        # invalid types
+        for objs in ([object()], [Cpv("cat/pkg-1"), None]):
+            with pytest.raises(TypeError):
+                r.matches_many(objs)
+
+        # invalid result type
+        with pytest.raises(ValueError):
+            r.matches_many(cpvs, as_="bits")
+
     def test_eq_and_hash(self, fake_repo):
         r1 = Restrict("cat/pkg-1")
         assert r1 == r1
@@ -143,3 +175,111 @@ class TestRestrict:
         assert list(fake_repo.iter(~(r1 & r2))) == [pkg1]
         assert not list(fake_repo.iter(~(r1 | r2)))
         assert list(fake_repo.iter(~(r1 ^ r2))) == [pkg2]
+
+    def test_compile(self, ebuild_repo):
+        pkg1 = ebuild_repo.create_pkg("cat/a-1", slot="1")
+        pkg2 = ebuild_repo.create_pkg("cat/b-1", slot="1")
+        pkg3 = ebuild_repo.create_pkg("cat/b-2")
+        ebuild_repo.create_pkg("other/b-1", slot="1")
+
+        # branches are flattened and ordered by cost
+        slot = Restrict.pkg("slot == '1'")
+        maintainers = Restrict.pkg("maintainers is none")
+        cpn = Restrict.dep("cat/*")
+        cpv = Restrict(">=cat/b-1")
+        r = maintainers & slot & cpv & cpn
+        c = r.compile()
+        assert c.explain() == (
+            "AND [metadata.xml]\n"
+            "  dep 'cat/*' [cpn]\n"
+            "  '>=cat/b-1' [cpv]\n"
+            "  pkg \"slot == '1'\" [metadata]\n"
+            "  pkg 'maintainers is none' [metadata.xml]\n"
+            "prefilter:\n"
+            "  AND [cpv]\n"
+            "    dep 'cat/*' [cpn]\n"
+            "    '>=cat/b-1' [cpv]"
+        )
+        assert r.prefilter is None
+        assert c.prefilter == cpn & cpv
+        assert list(ebuild_repo.iter(c)) == list(ebuild_repo.iter(r)) == [pkg2]
+
+        # OR prefilters require all branches to have one
+        r = (slot & cpn) | Restrict("cat/b-2")
+        c = r.compile()
+        assert c.prefilter == Restrict("cat/b-2") | cpn
+        assert list(ebuild_repo.iter(c)) == list(ebuild_repo.iter(r)) == [pkg1, pkg2, pkg3]
+        assert (slot | cpn).compile().prefilter is None
+
+        # nested branches of differing types are reordered separately
+        r = slot & (maintainers | cpn)
+        assert r.compile().explain() == (
+            "AND [metadata.xml]\n"
+            "  pkg \"slot == '1'\" [metadata]\n"
+            "  OR [metadata.xml]\n"
+            "    dep 'cat/*' [cpn]\n"
+            "    pkg 'maintainers is none' [metadata.xml]"
+        )
+
+        # Cpv-level restrictions are their own prefilters
+        r = cpn & cpv
+        c = r.compile()
+        assert c.prefilter is c
+        assert r.compile().explain() == "AND [cpv]\n  dep 'cat/*' [cpn]\n  '>=cat/b-1' [cpv]"
+        assert Restrict("cat/pkg").compile().explain() == "'cat/pkg' [cpn]"
+        assert Restrict("cat/pkg:0").compile().explain() == "'cat/pkg:0' [metadata]"
+
+        # compiled restrictions are new objects leaving the original unchanged
+        for r in (Restrict("cat/pkg"), cpn & cpv):
+            c = r.compile()
+            assert c is not r
+            assert c == r
+            assert c._compiled
+            assert not r._compiled
+            assert r.prefilter is None
+
+        # NOT and XOR branches retain their order
+        assert (~(slot & cpn)).compile().explain() == (
+            "NOT [metadata]\n"
+            "  AND [metadata]\n"
+            "    dep 'cat/*' [cpn]\n"
+            "    pkg \"slot == '1'\" [metadata]"
+        )
+        assert (slot ^ cpn).compile().explain() == (
+            "XOR [metadata]\n  pkg \"slot == '1'\" [metadata]\n  dep 'cat/*' [cpn]"
+        )
+
+    def test_pushdown(self, ebuild_repo):
+        pkg1 = ebuild_repo.create_pkg("cat/a-1", slot="1")
+        pkg2 = ebuild_repo.create_pkg("cat/b-1", slot="1")
+        pkg3 = ebuild_repo.create_pkg("cat/b-2")
+        ebuild_repo.create_pkg("other/b-1", slot="1")
+        ebuild_repo.create_pkg("other/c-1")
+
+        # uncompiled restrictions don't use pushdown
+        r = Restrict.dep("cat/*")
+        assert not hasattr(ebuild_repo.iter(r), "pruned")
+
+        # Cpn-level pruning
+        it = ebuild_repo.iter(Restrict.dep("cat/*").compile())
+        assert it.pruned is None
+        assert list(it) == [pkg1, pkg2, pkg3]
+        assert it.pruned == 2
+
+        # Cpv-level pruning
+        it = ebuild_repo.iter((Restrict.dep("*/b") & Restrict(">=cat/b-2")).compile())
+        assert list(it) == [pkg3]
+        assert it.pruned == 4
+
+        # packages are loaded for metadata restrictions
+        r = Restrict.pkg("slot == '1'") & Restrict.dep("*/b")
+        it = ebuild_repo.iter(r.compile())
+        assert [pkg.cpv for pkg in it] == [Cpv("cat/b-1"), Cpv("other/b-1")]
+        assert it.pruned == 2
+        it = ebuild_repo.iter(Restrict.pkg("slot == '1'").compile())
+        assert len(list(it)) == 3
+        assert it.pruned == 0
+
+        # parallel iteration skips packages rejected by Cpn-level restrictions
+        pkgs = ebuild_repo.iter(r.compile(), jobs=2)
+        assert [pkg.cpv for pkg in pkgs] == [Cpv("cat/b-1"), Cpv("other/b-1")]